@@ -0,0 +1,99 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# Linux onedir build of Frogger.
+#
+#   pyinstaller --noconfirm Frogger-linux.spec
+#
+# Result: dist/Frogger/Frogger (+ dist/Frogger/_internal).
+#
+# Unlike Frogger.spec (Windows onefile), nothing is unpacked to a temp
+# directory at launch, UPX is disabled (decompressing libSDL/numpy on every
+# start costs more than it saves on disk), bytecode is precompiled with
+# -OO and modules the game never imports are left out of the bundle.
+# Use tools/bench_startup.py to compare launch times of both layouts.
+
+import os
+
+project_dir = os.path.abspath(SPECPATH)
+
+# Standard library modules pulled in transitively that the game never uses.
+stdlib_excludes = [
+    'tkinter',
+    'turtle',
+    'turtledemo',
+    'idlelib',
+    'unittest',
+    'doctest',
+    'pydoc',
+    'pydoc_data',
+    'pdb',
+    'bdb',
+    'lib2to3',
+    'xmlrpc',
+    'ftplib',
+    'webbrowser',
+    'curses',
+    'sqlite3',
+    'ensurepip',
+    'venv',
+    'distutils',
+    'setuptools',
+    'pip',
+]
+
+# Optional pygame submodules and third party packages picked up by hooks.
+pygame_excludes = [
+    'pygame.examples',
+    'pygame.tests',
+    'pygame.docs',
+    'pygame.camera',
+    'pygame._camera_vidcapture',
+    'pygame._camera_opencv',
+    'pygame.midi',
+    'psutil',
+    'threadpoolctl',
+    'charset_normalizer',
+]
+
+a = Analysis(
+    [os.path.join(project_dir, 'Frogger.py')],
+    pathex=[project_dir],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=stdlib_excludes + pygame_excludes,
+    noarchive=False,
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Frogger',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=True,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=True,
+    upx=False,
+    upx_exclude=[],
+    name='Frogger',
+)
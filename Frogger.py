@@ -33,7 +33,25 @@ import random
 import json
 import os
 import math
-from typing import List, Tuple, Dict
+import time
+import heapq
+import queue
+import shlex
+import abc
+import argparse
+import threading
+import copy
+import socket
+import hashlib
+import struct
+import subprocess
+import array
+import itertools
+import gc
+import bisect
+import zlib
+from collections import deque
+from typing import List, Tuple, Dict, Optional, NamedTuple
 from datetime import datetime
 from pathlib import Path
 
@@ -46,6 +64,21 @@ SCREEN_HEIGHT = 700
 GRID_SIZE = 50
 FPS = 60
 
+# Pomiar czasu startu (tools/bench_startup.py): zakończ po pierwszej klatce
+STARTUP_PROBE = os.environ.get('FROGGER_STARTUP_PROBE') == '1'
+
+# Poziomy jakości grafiki (sterowane przez QualityGovernor)
+QUALITY_LOW = 0
+QUALITY_MEDIUM = 1
+QUALITY_HIGH = 2
+QUALITY_NAMES = {QUALITY_LOW: "low", QUALITY_MEDIUM: "medium", QUALITY_HIGH: "high"}
+QUALITY_PRESETS = ["auto", "high", "medium", "low"]  # Kolejność w menu
+
+# Parametry efektów dla poszczególnych poziomów
+PARTICLE_CAPS = {QUALITY_LOW: 60, QUALITY_MEDIUM: 200, QUALITY_HIGH: 600}
+GRADIENT_STEPS = {QUALITY_LOW: 0, QUALITY_MEDIUM: 2, QUALITY_HIGH: 1}  # 0 = jednolity kolor
+GLOW_PASSES = {QUALITY_LOW: 0, QUALITY_MEDIUM: 2, QUALITY_HIGH: 5}
+
 # Kolory
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -65,6 +98,72 @@ GOLD = (255, 215, 0)
 SILVER = (192, 192, 192)
 BRONZE = (205, 127, 50)
 
+# Pasy ruchu: pozycja Y, prędkość, kierunek, kolor i szerokość obiektów
+VEHICLE_LANES = [
+    {'y': 600, 'speed': 2, 'direction': 1, 'color': (220, 20, 60), 'width': 80},
+    {'y': 550, 'speed': 3, 'direction': -1, 'color': (30, 144, 255), 'width': 80},
+    {'y': 500, 'speed': 1.5, 'direction': 1, 'color': (255, 215, 0), 'width': 100},
+    {'y': 450, 'speed': 2.5, 'direction': -1, 'color': (138, 43, 226), 'width': 70},
+    {'y': 400, 'speed': 2, 'direction': 1, 'color': (0, 206, 209), 'width': 90}
+]
+LOG_LANES = [
+    {'y': 200, 'speed': 1.5, 'direction': 1, 'color': (139, 69, 19), 'width': 150},
+    {'y': 150, 'speed': 2, 'direction': -1, 'color': (160, 82, 45), 'width': 120},
+    {'y': 100, 'speed': 1, 'direction': 1, 'color': (139, 69, 19), 'width': 180},
+    {'y': 50, 'speed': 2.5, 'direction': -1, 'color': (160, 82, 45), 'width': 130}
+]
+VEHICLES_PER_LANE = 3
+LOGS_PER_LANE = 2
+LANE_OBJECT_HEIGHT = 40  # Wysokość pojazdów i kłód (rząd siatki to GRID_SIZE)
+
+# Wysokie plansze (tall_level): wysokość odcinka (ekran bez rzędu startu)
+# i część drogi do żaby, jaką kamera pokonuje w jednym ticku
+LEVEL_SECTION = SCREEN_HEIGHT - GRID_SIZE
+CAMERA_FOLLOW = 0.2
+
+# Poziomy trudności (ustawienie 'difficulty'): mnożniki prędkości i gęstości
+# pasów na poziomie 1 oraz ich przyrost z każdym kolejnym poziomem
+DIFFICULTIES = {
+    'easy': {'speed': 0.8, 'density': 0.8, 'speed_step': 0.05, 'density_step': 0.03},
+    'normal': {'speed': 1.0, 'density': 1.0, 'speed_step': 0.08, 'density_step': 0.05},
+    'hard': {'speed': 1.2, 'density': 1.2, 'speed_step': 0.12, 'density_step': 0.08},
+}
+MAX_LEVEL = 10  # Od tego poziomu parametry pasów już nie rosną
+
+# Co ile ticków agent w trybie headless podejmuje decyzję (~10 ruchów/s)
+AGENT_MOVE_INTERVAL = 6
+
+# Po ilu ms bezczynności w menu startuje tryb demo (autopilot)
+ATTRACT_DELAY_MS = 20000
+
+# Bezczynność poza rozgrywką: po ilu ms bez klawisza animowane menu główne
+# zwalnia do IDLE_MENU_FPS, a ekrany statyczne i ukryte okno czekają na
+# zdarzenie najwyżej IDLE_WAIT_MS
+MENU_IDLE_MS = 3000
+IDLE_MENU_FPS = 15
+IDLE_WAIT_MS = 1000
+
+# Wejście: ile ruchów może czekać w buforze (nadmiar jest odrzucany) i cel
+# opóźnienia klawisz -> wyświetlona klatka (p95, bez dodatkowego obciążenia)
+INPUT_BUFFER_SIZE = 4
+INPUT_LATENCY_TARGET_MS = 2 * 1000 / FPS
+
+# Odśmiecanie (GCController, --gc tuned/manual): progi generacji i ile ms
+# zapasu klatki potrzeba na zaplanowane zbieranie młodej generacji
+GC_THRESHOLDS = (10000, 20, 100)
+GC_MIN_SLACK_MS = 2.0
+
+# Gra sieciowa (--host / --join): port domyślny, co ile ticków gospodarz
+# wysyła migawkę, zapas ticków wyprzedzenia klienta, ile ostatnich ruchów
+# powtarza każdy pakiet wejścia, ile ticków historii trzymać i po ilu
+# sekundach ciszy uznać drugiego gracza za rozłączonego
+NET_PORT = 47800
+NET_SNAPSHOT_INTERVAL = 2
+NET_INPUT_MARGIN = 2
+NET_INPUT_REDUNDANCY = 8
+NET_HISTORY = 128
+NET_TIMEOUT = 3.0
+
 # Konfiguracja ścieżek
 def get_config_path() -> Path:
     """
@@ -87,15 +186,71 @@ def get_config_path() -> Path:
 CONFIG_FILE = get_config_path()
 
 
+class SurfacePool:
+    """
+    Pula powierzchni pomocniczych (cienie, nakładki, panele, cząsteczki).
+    
+    Powierzchnie są tworzone raz dla danego klucza (rozmiar, flagi i to,
+    co jest na nich narysowane) i potem tylko blitowane, więc w stanie
+    ustalonym rysowanie klatki nie alokuje nowych powierzchni SRCALPHA.
+    Liczniki `allocations` i `hits` odczytuje FrameProfiler.
+    """
+    
+    MAX_ENTRIES = 4096  # Zabezpieczenie przed nieograniczonym wzrostem
+    
+    def __init__(self):
+        self._surfaces = {}
+        self.allocations = 0
+        self.hits = 0
+    
+    def cached(self, key, size: Tuple[int, int], paint, flags: int = pygame.SRCALPHA) -> pygame.Surface:
+        """
+        Zwraca gotową powierzchnię dla klucza, tworząc ją przy pierwszym użyciu.
+        
+        Args:
+            key: Opis zawartości (np. ('shadow', w, h)); rozmiar i flagi
+                 są dołączane do klucza automatycznie
+            size: Rozmiar powierzchni
+            paint: Funkcja paint(surface) rysująca zawartość na pustej powierzchni
+            flags: Flagi powierzchni (domyślnie SRCALPHA)
+        """
+        full_key = (key, size, flags)
+        surface = self._surfaces.get(full_key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        
+        if len(self._surfaces) >= self.MAX_ENTRIES:
+            self._surfaces.clear()
+        surface = pygame.Surface(size, flags)
+        paint(surface)
+        self._surfaces[full_key] = surface
+        self.allocations += 1
+        return surface
+    
+    def clear(self):
+        """Usuwa wszystkie powierzchnie z puli."""
+        self._surfaces.clear()
+
+
+# Wspólna pula powierzchni dla wszystkich klas rysujących
+SURFACE_POOL = SurfacePool()
+
+
 class ParticleSystem:
     """System cząsteczek dla efektów wizualnych."""
     
     def __init__(self):
         self.particles = []
+        self.max_particles = PARTICLE_CAPS[QUALITY_HIGH]
+    
+    def _room(self, count: int) -> int:
+        """Zwraca ile z `count` cząsteczek zmieści się w limicie."""
+        return max(0, min(count, self.max_particles - len(self.particles)))
     
     def add_splash(self, x: float, y: float):
         """Dodaje efekt rozchlapania wody."""
-        for _ in range(15):
+        for _ in range(self._room(15)):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(2, 6)
             self.particles.append({
@@ -111,7 +266,7 @@ class ParticleSystem:
     
     def add_hop(self, x: float, y: float):
         """Dodaje efekt pyłu przy skoku."""
-        for _ in range(5):
+        for _ in range(self._room(5)):
             self.particles.append({
                 'x': x + random.randint(-10, 10),
                 'y': y + random.randint(-5, 5),
@@ -125,7 +280,7 @@ class ParticleSystem:
     
     def add_crash(self, x: float, y: float):
         """Dodaje efekt zderzenia."""
-        for _ in range(20):
+        for _ in range(self._room(20)):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(3, 8)
             self.particles.append({
@@ -150,27 +305,48 @@ class ParticleSystem:
             if particle['life'] <= 0:
                 self.particles.remove(particle)
     
+    def snapshot(self) -> tuple:
+        """Niezmienna kopia cząsteczek: krotki (x, y, type, life, max_life, size)."""
+        return tuple((p['x'], p['y'], p['type'], p['life'], p['max_life'], p['size'])
+                     for p in self.particles)
+    
     def draw(self, screen: pygame.Surface):
         """Rysuje wszystkie cząsteczki."""
         for particle in self.particles:
-            alpha = int(255 * (particle['life'] / particle['max_life']))
-            
-            if particle['type'] == 'splash':
-                color = (100, 150, 255, alpha)
-            elif particle['type'] == 'dust':
-                color = (200, 200, 150, alpha)
-            elif particle['type'] == 'crash':
-                color = (255, 100, 0, alpha)
-            else:
-                color = (255, 255, 255, alpha)
-            
-            # Pygame nie wspiera alpha bezpośrednio w draw.circle,
-            # więc używamy powierzchni z alpha
-            size = int(particle['size'] * (particle['life'] / particle['max_life']))
-            if size > 0:
-                surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(surf, color[:3] + (alpha,), (size, size), size)
-                screen.blit(surf, (int(particle['x'] - size), int(particle['y'] - size)))
+            self.draw_particle(screen, particle['x'], particle['y'], particle['type'],
+                               particle['life'], particle['max_life'], particle['size'])
+    
+    @staticmethod
+    def draw_snapshot(screen: pygame.Surface, particles: tuple):
+        """Rysuje cząsteczki z snapshot()."""
+        for particle in particles:
+            ParticleSystem.draw_particle(screen, *particle)
+    
+    @staticmethod
+    def draw_particle(screen: pygame.Surface, x: float, y: float, kind: str,
+                      life: int, max_life: int, size: int):
+        """Rysuje jedną cząsteczkę."""
+        alpha = int(255 * (life / max_life))
+        
+        if kind == 'splash':
+            color = (100, 150, 255, alpha)
+        elif kind == 'dust':
+            color = (200, 200, 150, alpha)
+        elif kind == 'crash':
+            color = (255, 100, 0, alpha)
+        else:
+            color = (255, 255, 255, alpha)
+        
+        # Pygame nie wspiera alpha bezpośrednio w draw.circle,
+        # więc używamy powierzchni z alpha (z puli - kombinacji rozmiaru
+        # i przezroczystości jest niewiele)
+        size = int(size * (life / max_life))
+        if size > 0:
+            surf = SURFACE_POOL.cached(
+                ('particle', color), (size * 2, size * 2),
+                lambda s: pygame.draw.circle(s, color, (size, size), size)
+            )
+            screen.blit(surf, (int(x - size), int(y - size)))
 
 
 class WaterEffect:
@@ -185,25 +361,520 @@ class WaterEffect:
         self.time += 0.05
         self.wave_offset = math.sin(self.time) * 3
     
-    def draw(self, screen: pygame.Surface, rect: pygame.Rect):
+    def draw(self, screen: pygame.Surface, rect: pygame.Rect, quality: int = QUALITY_HIGH):
         """Rysuje animowaną wodę."""
-        # Gradient wody
-        for i in range(rect.height):
+        # Gradient wody (na niższej jakości pasami zamiast linia po linii)
+        step = GRADIENT_STEPS[quality] or 8
+        for i in range(0, rect.height, step):
             color_value = 65 + int(40 * math.sin(self.time + i * 0.1))
             color = (0, color_value, 150 + int(30 * math.sin(self.time + i * 0.05)))
-            pygame.draw.line(screen, color, 
-                           (rect.x, rect.y + i), 
-                           (rect.x + rect.width, rect.y + i))
+            if step == 1:
+                pygame.draw.line(screen, color, 
+                               (rect.x, rect.y + i), 
+                               (rect.x + rect.width, rect.y + i))
+            else:
+                pygame.draw.rect(screen, color, 
+                               (rect.x, rect.y + i, rect.width + 1, min(step, rect.height - i)))
         
         # Fale
+        if quality == QUALITY_LOW:
+            return
+        wave_spacing = 30 if quality == QUALITY_HIGH else 60
         for y in range(rect.y, rect.y + rect.height, 20):
-            for x in range(0, rect.width, 30):
+            for x in range(0, rect.width, wave_spacing):
                 wave_y = y + int(self.wave_offset * math.sin((x + self.time * 50) * 0.1))
                 if rect.y <= wave_y < rect.y + rect.height:
                     pygame.draw.circle(screen, (100, 150, 255, 100), 
                                      (rect.x + x, wave_y), 3, 1)
 
 
+class QualityGovernor:
+    """
+    Adaptacyjne skalowanie jakości grafiki.
+    
+    Obserwuje czasy ostatnich klatek (bez czekania w clock.tick) i obniża
+    poziom efektów, gdy klatka nie mieści się w budżecie 1000 / FPS ms,
+    a podnosi go z powrotem, gdy pojawi się zapas. Progi są rozsunięte
+    (histereza), a po każdej zmianie obowiązuje okres karencji, żeby
+    poziom nie przeskakiwał co kilka klatek.
+    
+    Preset inny niż "auto" ustawia stały poziom i wyłącza adaptację.
+    """
+    
+    WINDOW = 30            # Liczba klatek do uśrednienia
+    DOWN_RATIO = 0.9       # Obniż jakość powyżej 90% budżetu
+    UP_RATIO = 0.5         # Podnieś jakość poniżej 50% budżetu
+    COOLDOWN = 90          # Klatki karencji po zmianie poziomu
+    
+    def __init__(self, preset: str = "auto", budget_ms: float = 1000 / FPS):
+        self.budget_ms = budget_ms
+        self.frame_times = deque(maxlen=self.WINDOW)
+        self.cooldown = 0
+        self.level = QUALITY_HIGH
+        self.preset = "auto"
+        self.set_preset(preset)
+    
+    def set_preset(self, preset: str):
+        """Ustawia preset: auto, high, medium lub low."""
+        if preset not in QUALITY_PRESETS:
+            preset = "auto"
+        self.preset = preset
+        if preset != "auto":
+            self.level = next(level for level, name in QUALITY_NAMES.items()
+                              if name == preset)
+        self.frame_times.clear()
+        self.cooldown = 0
+    
+    def next_preset(self) -> str:
+        """Zwraca preset następny po bieżącym (do przełączania w menu)."""
+        index = QUALITY_PRESETS.index(self.preset)
+        return QUALITY_PRESETS[(index + 1) % len(QUALITY_PRESETS)]
+    
+    @property
+    def label(self) -> str:
+        """Opis do wyświetlenia w menu, np. "AUTO (HIGH)"."""
+        if self.preset == "auto":
+            return f"AUTO ({QUALITY_NAMES[self.level].upper()})"
+        return self.preset.upper()
+    
+    def record(self, frame_ms: float):
+        """Rejestruje czas pracy klatki i w razie potrzeby zmienia poziom."""
+        if self.preset != "auto":
+            return
+        
+        self.frame_times.append(frame_ms)
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+        if len(self.frame_times) < self.WINDOW:
+            return
+        
+        average = sum(self.frame_times) / len(self.frame_times)
+        if average > self.budget_ms * self.DOWN_RATIO and self.level > QUALITY_LOW:
+            self._change_level(self.level - 1)
+        elif average < self.budget_ms * self.UP_RATIO and self.level < QUALITY_HIGH:
+            self._change_level(self.level + 1)
+    
+    def _change_level(self, level: int):
+        self.level = level
+        self.frame_times.clear()
+        self.cooldown = self.COOLDOWN
+
+
+class FrameProfiler:
+    """
+    Lekki profiler klatek: czasy pracy klatki i liczniki na klatkę.
+    
+    Liczniki skumulowane (np. SURFACE_POOL.allocations) rejestruje się przez
+    track(); profiler zapisuje ich przyrost w każdej klatce, dzięki czemu
+    widać np. czy w stanie ustalonym klatka alokuje powierzchnie.
+    Nakładkę ze statystykami przełącza klawisz F3.
+    """
+    
+    def __init__(self, window: int = 120):
+        self.window = window
+        self.frames = 0
+        self.frame_times = deque(maxlen=window)
+        self.max_frame_ms = 0.0
+        self.history = {}   # nazwa -> deque przyrostów w ostatnich klatkach
+        self.totals = {}    # nazwa -> suma od startu
+        self._sources = {}  # nazwa -> (getter, ostatnia wartość)
+        self.visible = False
+    
+    def track(self, name: str, getter):
+        """Rejestruje licznik skumulowany odczytywany funkcją getter()."""
+        self._sources[name] = (getter, getter())
+        self.history[name] = deque(maxlen=self.window)
+        self.totals[name] = 0
+    
+    def end_frame(self, frame_ms: float):
+        """Zapisuje czas pracy klatki i przyrosty liczników."""
+        self.frames += 1
+        self.frame_times.append(frame_ms)
+        self.max_frame_ms = max(self.max_frame_ms, frame_ms)
+        
+        for name, (getter, last) in self._sources.items():
+            value = getter()
+            self.history[name].append(value - last)
+            self.totals[name] += value - last
+            self._sources[name] = (getter, value)
+    
+    def stats(self) -> Dict:
+        """Zwraca statystyki z ostatniego okna klatek."""
+        times = self.frame_times
+        result = {
+            'frames': self.frames,
+            'avg_frame_ms': sum(times) / len(times) if times else 0.0,
+            'window_max_ms': max(times) if times else 0.0,
+            'max_frame_ms': self.max_frame_ms,
+        }
+        for name, values in self.history.items():
+            result[f'{name}_per_frame'] = sum(values) / len(values) if values else 0.0
+            result[f'{name}_last'] = values[-1] if values else 0
+            result[f'{name}_total'] = self.totals[name]
+        return result
+    
+    def summary(self) -> str:
+        """Jednolinijkowe podsumowanie do wypisania na konsolę."""
+        stats = self.stats()
+        parts = [f"{stats['frames']} frames",
+                 f"avg {stats['avg_frame_ms']:.2f} ms",
+                 f"max {stats['max_frame_ms']:.2f} ms"]
+        for name in self.history:
+            parts.append(f"{name} {stats[f'{name}_per_frame']:.2f}/frame "
+                         f"(total {stats[f'{name}_total']})")
+        return "Frame profile: " + ", ".join(parts)
+    
+    def draw(self, screen: pygame.Surface, font: pygame.font.Font):
+        """Rysuje nakładkę ze statystykami (F3)."""
+        if not self.visible:
+            return
+        stats = self.stats()
+        lines = [f"frame {stats['avg_frame_ms']:.2f} ms (max {stats['window_max_ms']:.2f})"]
+        for name in self.history:
+            lines.append(f"{name}: {stats[f'{name}_last']} "
+                         f"(avg {stats[f'{name}_per_frame']:.2f})")
+        y = 50
+        for line in lines:
+            text = font.render(line, True, YELLOW, BLACK)
+            screen.blit(text, (SCREEN_WIDTH - text.get_width() - 10, y))
+            y += text.get_height() + 2
+
+
+class ProfileSession:
+    """
+    Profilowanie wybranych klatek przez cProfile i tracemalloc (--profile, --trace-alloc).
+    
+    Game woła begin_frame(state) i end_frame() wokół każdej klatki (także
+    przy odtwarzaniu replayu bez okna). Próbkowane są tylko klatki w stanach
+    `states` (None - wszystkie), najwyżej `frames` klatek (0 - bez limitu);
+    klawisz F9 wstrzymuje i wznawia próbkowanie (toggle()).
+    
+    Wyniki zapisuje save() (po ostatniej klatce lub przy zamknięciu gry):
+        profile_path      - statystyki pstats (python -m pstats, snakeviz)
+        profile_path + .collapsed - stosy dla flamegraph.pl / speedscope
+        alloc_path        - raport tekstowy: bajty chwilowe na klatkę
+                            (szczyt tracemalloc w klatce) i miejsca alokacji
+                            z największym przyrostem pamięci
+    
+    tracemalloc widzi tylko pamięć Pythona (obiekty, krotki, Recty) -
+    piksele powierzchni pygame alokuje SDL, te liczy SURFACE_POOL.
+    """
+    
+    def __init__(self, profile_path: Path = None, alloc_path: Path = None, frames: int = 0,
+                 states: List[str] = None, paused: bool = False, top: int = 25):
+        if profile_path is None and alloc_path is None:
+            raise ValueError("ProfileSession requires a profile or an allocation report path")
+        # Profilowanie jest opcjonalne - moduły ładowane dopiero tutaj
+        import cProfile
+        import tracemalloc
+        self._cprofile = cProfile
+        self._tracemalloc = tracemalloc
+        self.profile_path = Path(profile_path) if profile_path else None
+        self.alloc_path = Path(alloc_path) if alloc_path else None
+        self.frames = max(0, frames)
+        self.states = set(states) if states else None
+        self.sampling = not paused
+        self.top = top
+        
+        self.sampled = 0      # Sprofilowane klatki
+        self.saved = False
+        self.transient = array.array('q')  # Bajty zaalokowane i zwolnione w klatce
+        self.profiler = cProfile.Profile() if self.profile_path else None
+        self._active = False
+        self._base = 0
+        self._first = None    # Migawki tracemalloc: pierwsza i ostatnia próbkowana klatka
+        self._last = None
+        self._tracing = bool(self.alloc_path) and not self._tracemalloc.is_tracing()
+        if self._tracing:
+            self._tracemalloc.start()
+    
+    @property
+    def done(self) -> bool:
+        return bool(self.frames) and self.sampled >= self.frames
+    
+    def toggle(self):
+        """Wstrzymuje / wznawia próbkowanie (F9)."""
+        self.sampling = not self.sampling
+        if not self.sampling and self.alloc_path and self.sampled:
+            self._last = self._tracemalloc.take_snapshot()
+        print(f"Profiling {'resumed' if self.sampling else 'paused'} "
+              f"({self.sampled} frames sampled)")
+    
+    def begin_frame(self, state: str):
+        """Włącza pomiar, jeśli ta klatka ma być próbkowana."""
+        self._active = (self.sampling and not self.done and not self.saved
+                        and (self.states is None or state in self.states))
+        if not self._active:
+            return
+        if self.alloc_path:
+            if self._first is None:
+                self._first = self._tracemalloc.take_snapshot()
+            self._tracemalloc.reset_peak()
+            self._base = self._tracemalloc.get_traced_memory()[0]
+        if self.profiler:
+            self.profiler.enable()
+    
+    def end_frame(self):
+        """Wyłącza pomiar klatki; po ostatniej klatce zapisuje wyniki."""
+        if not self._active:
+            return
+        if self.profiler:
+            self.profiler.disable()
+        if self.alloc_path:
+            current, peak = self._tracemalloc.get_traced_memory()
+            self.transient.append(peak - max(self._base, current))
+        self._active = False
+        self.sampled += 1
+        if self.done:
+            self.save()
+    
+    @staticmethod
+    def label(func: tuple) -> str:
+        """Nazwa funkcji w stosie: plik:linia(funkcja) albo nazwa funkcji wbudowanej."""
+        filename, line, name = func
+        if filename == '~':
+            return name
+        return f"{os.path.basename(filename)}:{line}({name})"
+    
+    @classmethod
+    def collapsed_stacks(cls, stats: 'pstats.Stats', min_us: float = 1.0) -> Dict[str, float]:
+        """
+        Stosy wywołań w formacie "collapsed" (stos -> mikrosekundy czasu własnego).
+        
+        cProfile zapisuje tylko krawędzie wywołujący -> wywoływany, więc czas
+        funkcji jest dzielony między stosy proporcjonalnie do czasu krawędzi.
+        Rekurencja jest ucinana, a gałęzie krótsze niż min_us pomijane.
+        """
+        entries = stats.stats  # func -> (cc, nc, tt, ct, {caller: (cc, nc, tt, ct)})
+        callees = {}
+        for func, (_, _, _, _, callers) in entries.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((func, edge[3]))
+        
+        stacks = {}
+        pending = [(func, entry[3], ()) for func, entry in entries.items() if not entry[4]]
+        while pending:
+            func, seconds, path = pending.pop()
+            _, _, tt, ct, _ = entries[func]
+            path = path + (func,)
+            if ct <= 0:
+                continue
+            own = seconds * tt / ct
+            for callee, edge_ct in callees.get(func, ()):
+                share = seconds * edge_ct / ct
+                if callee in path:
+                    own += share  # Rekurencja - czas zostaje w wywołującym
+                elif share * 1e6 >= min_us:
+                    pending.append((callee, share, path))
+            if own * 1e6 >= min_us:
+                key = ";".join(cls.label(f) for f in path)
+                stacks[key] = stacks.get(key, 0.0) + own * 1e6
+        return stacks
+    
+    def save(self):
+        """Zapisuje pstats, stosy do flamegraphu i raport alokacji."""
+        if self.saved:
+            return
+        self.saved = True
+        if self._active and self.profiler:
+            self.profiler.disable()
+        if not self.sampled:
+            print("Profiling: no frames sampled")
+            if self._tracing:
+                self._tracemalloc.stop()
+            return
+        
+        if self.profile_path:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            self.profiler.dump_stats(str(self.profile_path))
+            import pstats
+            stats = pstats.Stats(self.profiler)
+            collapsed = self.profile_path.with_name(self.profile_path.name + ".collapsed")
+            with open(collapsed, 'w', encoding='utf-8') as f:
+                for stack, us in sorted(self.collapsed_stacks(stats).items()):
+                    f.write(f"{stack} {round(us)}\n")
+            print(f"Profile: {self.sampled} frames -> {self.profile_path} (pstats), {collapsed} (collapsed stacks)")
+            print(self.profile_summary(stats))
+        
+        if self.alloc_path:
+            if self._last is None:
+                self._last = self._tracemalloc.take_snapshot()
+            self.alloc_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.alloc_path, 'w', encoding='utf-8') as f:
+                f.write(self.alloc_report())
+            print(f"Allocation report: {self.sampled} frames -> {self.alloc_path}")
+            if self._tracing:
+                self._tracemalloc.stop()  # Reszta gry bez narzutu śledzenia
+    
+    def profile_summary(self, stats: 'pstats.Stats') -> str:
+        """Funkcje z największym czasem własnym: wywołania i ms na klatkę."""
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:self.top]
+        lines = [f"{'calls/frame':>12} {'own ms/frame':>13} {'cum ms/frame':>13}  function"]
+        for func, (_, nc, tt, ct, _) in rows:
+            lines.append(f"{nc / self.sampled:>12.1f} {tt * 1000 / self.sampled:>13.3f} "
+                         f"{ct * 1000 / self.sampled:>13.3f}  {self.label(func)}")
+        return "\n".join(lines)
+    
+    def alloc_filters(self) -> tuple:
+        """Filtry raportu alokacji: narzuty samego pomiaru i importów."""
+        tracemalloc = self._tracemalloc
+        return (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, self._cprofile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        )
+    
+    def alloc_report(self) -> str:
+        """Raport tekstowy z migawek tracemalloc pierwszej i ostatniej próbkowanej klatki."""
+        transient = sorted(self.transient)
+        filters = self.alloc_filters()
+        first = self._first.filter_traces(filters)
+        last = self._last.filter_traces(filters)
+        lines = [
+            f"Frames sampled: {self.sampled}",
+            f"Transient bytes per frame (allocated and freed within the frame): "
+            f"p50 {transient[len(transient) // 2]}, max {transient[-1]}",
+            "",
+            f"Top {self.top} allocation sites by growth over the sampled frames:",
+        ]
+        for stat in last.compare_to(first, 'lineno')[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff:>+10} B {stat.count_diff:>+8} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        lines += ["", f"Top {self.top} allocation sites by live memory at the end:"]
+        for stat in last.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size:>10} B {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+
+class GCController:
+    """
+    Sterowanie odśmiecaniem (gc) dla równych czasów klatek (--gc).
+    
+    Klatka tworzy dużo krótko żyjących obiektów (krotki kolorów, Recty,
+    cząsteczki), więc automatyczne odśmiecanie wpada w losowe klatki.
+    Tryby:
+        default - odśmiecanie Pythona bez zmian (tylko pomiar przerw)
+        tuned   - progi GC_THRESHOLDS i gc.freeze() po starcie i po
+                  wczytaniu gry/poziomu: obiekty długożyjące (świat, pasy,
+                  czcionki, pule powierzchni) nie są już skanowane
+        manual  - jak tuned, ale w stanie 'playing' automatyczne odśmiecanie
+                  jest wyłączone; młoda generacja jest zbierana w zapasie
+                  klatki (use_slack()), pełne odśmiecanie przy zmianie stanu
+    
+    Każde odśmiecanie (też automatyczne) jest mierzone przez gc.callbacks;
+    FrameProfiler śledzi liczniki 'gc_collections' i 'gc_ms'.
+    """
+    
+    MODES = ("default", "tuned", "manual")
+    
+    def __init__(self, mode: str = "default"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown GC mode: {mode}")
+        self.mode = mode
+        self.collections = [0, 0, 0]  # Liczba odśmieceń na generację
+        self.pause_ms = 0.0           # Suma przerw
+        self.max_pause_ms = 0.0
+        self.pauses = deque(maxlen=600)  # Ostatnie przerwy (ms)
+        self.scheduled = 0            # Odśmiecania w zapasie klatki
+        self.forced = 0               # Odśmiecania bez zapasu (za dużo obiektów)
+        self._young = 0               # Odśmiecania młodej generacji od ostatniego gen 1
+        self._started = 0.0
+        self._state = None
+        self._world = None
+        self._level = None
+        self._thresholds = gc.get_threshold()
+        gc.callbacks.append(self._callback)
+        if mode != "default":
+            gc.set_threshold(*GC_THRESHOLDS)
+            self.load()
+    
+    @property
+    def total(self) -> int:
+        return sum(self.collections)
+    
+    def _callback(self, phase: str, info: Dict):
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        elapsed = (time.perf_counter() - self._started) * 1000
+        self.collections[info['generation']] += 1
+        self.pause_ms += elapsed
+        self.max_pause_ms = max(self.max_pause_ms, elapsed)
+        self.pauses.append(elapsed)
+    
+    def load(self):
+        """Pełne odśmiecanie i zamrożenie ocalałych obiektów (start, nowa gra)."""
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+    
+    def update(self, state: str, world: 'World'):
+        """Raz na klatkę: reaguje na zmianę stanu gry, świata i poziomu."""
+        if self.mode == "default":
+            return
+        playing = state == "playing"
+        if world is not self._world and playing:
+            # Nowa gra - poprzedni świat to już śmieci
+            self.load()
+            self._world, self._level = world, world.level
+        elif playing and world.level != self._level:
+            # Zmiana poziomu w trakcie gry: freeze() nic nie skanuje, więc nie zacina klatki
+            self._level = world.level
+            gc.freeze()
+        
+        if playing != (self._state == "playing") and self.mode == "manual":
+            if playing:
+                gc.disable()
+            else:
+                gc.enable()
+                self.load()
+        self._state = state
+    
+    def use_slack(self, slack_ms: float):
+        """
+        Tryb manual: zbiera młodą generację, jeśli do terminu klatki zostało
+        co najmniej GC_MIN_SLACK_MS albo obiektów jest za dużo, by czekać.
+        """
+        if self.mode != "manual" or gc.isenabled():
+            return
+        count = gc.get_count()[0]
+        if count < GC_THRESHOLDS[0]:
+            return
+        if slack_ms < GC_MIN_SLACK_MS and count < GC_THRESHOLDS[0] * 4:
+            return
+        if slack_ms < GC_MIN_SLACK_MS:
+            self.forced += 1
+        else:
+            self.scheduled += 1
+        self._young += 1
+        if self._young >= GC_THRESHOLDS[1]:
+            self._young = 0
+            gc.collect(1)
+        else:
+            gc.collect(0)
+    
+    def summary(self) -> str:
+        """Jednolinijkowe podsumowanie przerw odśmiecania."""
+        pauses = sorted(self.pauses)
+        p99 = pauses[min(len(pauses) - 1, int(len(pauses) * 0.99))] if pauses else 0.0
+        return (f"GC ({self.mode}): {self.total} collections "
+                f"(gen0/1/2 {'/'.join(map(str, self.collections))}), "
+                f"pauses total {self.pause_ms:.1f} ms, p99 {p99:.2f} ms, max {self.max_pause_ms:.2f} ms, "
+                f"{self.scheduled} in frame slack, {self.forced} forced")
+    
+    def close(self):
+        """Przywraca domyślne odśmiecanie i usuwa pomiar."""
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+        gc.enable()
+        gc.set_threshold(*self._thresholds)
+        gc.unfreeze()
+
+
 class ConfigManager:
     """
     Klasa zarządzająca konfiguracją gry i wynikami.
@@ -232,6 +903,9 @@ class ConfigManager:
         self.filename = filename
         self.config = self.load_config()
         
+        # Opcjonalny executor (concurrent.futures): zapis pliku poza pętlą gry
+        self.io_executor = None
+        
         # Inicjalizuj domyślne ustawienia jeśli nie istnieją
         if 'settings' not in self.config:
             self.config['settings'] = {
@@ -263,10 +937,23 @@ class ConfigManager:
         return {}
     
     def save_config(self):
-        """Saves configuration to JSON file."""
+        """
+        Saves configuration to JSON file.
+        
+        With io_executor set, the configuration is serialized on the calling
+        thread (a consistent snapshot) and only the file write is queued.
+        """
+        data = json.dumps(self.config, indent=4, ensure_ascii=False)
+        if self.io_executor is not None:
+            self.io_executor.submit(self._write_config, data)
+        else:
+            self._write_config(data)
+    
+    def _write_config(self, data: str):
+        """Writes serialized configuration to the file."""
         try:
             with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
+                f.write(data)
             print(f"Configuration saved: {self.filename}")
         except Exception as e:
             print(f"Error saving configuration: {e}")
@@ -348,9 +1035,14 @@ class ScoreManager:
     Używa ConfigManager do zarządzania wynikami.
     """
     
-    def __init__(self):
-        """Inicjalizuje menedżera wyników."""
-        self.config_manager = ConfigManager()
+    def __init__(self, config_manager: ConfigManager = None):
+        """
+        Inicjalizuje menedżera wyników.
+        
+        Args:
+            config_manager: Wspólny ConfigManager (domyślnie tworzony nowy)
+        """
+        self.config_manager = config_manager or ConfigManager()
     
     def load_scores(self) -> List[Dict]:
         """Wczytuje wyniki."""
@@ -380,7 +1072,7 @@ class Menu:
     Handles navigation between options and displaying different screens.
     """
     
-    def __init__(self, screen: pygame.Surface):
+    def __init__(self, screen: pygame.Surface, score_manager: ScoreManager = None):
         """Initializes the menu."""
         self.screen = screen
         self.font_large = pygame.font.Font(None, 72)
@@ -388,20 +1080,25 @@ class Menu:
         self.font_small = pygame.font.Font(None, 32)
         self.font_tiny = pygame.font.Font(None, 24)
         
-        self.options = ["NEW GAME", "TOP 5", "HELP", "EXIT"]
+        self.options = ["NEW GAME", "TOP 5", "HELP", "QUALITY", "DIFFICULTY", "EXIT"]
         self.selected = 0
         self.state = "main"  # main, top5, help
         
-        self.score_manager = ScoreManager()
+        self.score_manager = score_manager or ScoreManager()
         self.pulse = 0  # For animation
+        
+        # Set by Game from its QualityGovernor every frame
+        self.quality = QUALITY_HIGH
+        self.quality_label = "AUTO"
+        self.difficulty_label = "NORMAL"
     
     def draw_title(self):
         """Draws the game title with enhanced graphics."""
-        self.pulse += 0.05
+        self.pulse = pygame.time.get_ticks() * 0.003  # Od czasu - tempo nie zależy od FPS
         pulse_offset = int(math.sin(self.pulse) * 3)
         
         # Multi-layer shadow for depth
-        for offset in range(5, 0, -1):
+        for offset in range(GLOW_PASSES[self.quality], 0, -1):
             shadow_color = (20 + offset * 5, 20 + offset * 5, 20 + offset * 5)
             title_shadow = self.font_large.render("FROGGER", True, shadow_color)
             self.screen.blit(title_shadow, 
@@ -450,12 +1147,16 @@ class Menu:
         
         # Menu options with glow effect
         start_y = 250
-        spacing = 80
+        spacing = 60
         
         for i, option in enumerate(self.options):
+            if option == "QUALITY":
+                option = f"QUALITY: {self.quality_label}"
+            elif option == "DIFFICULTY":
+                option = f"DIFFICULTY: {self.difficulty_label}"
             if i == self.selected:
                 # Glow effect
-                for glow_size in range(5, 0, -1):
+                for glow_size in range(GLOW_PASSES[self.quality], 0, -1):
                     glow_color = (255 - glow_size * 30, 255 - glow_size * 30, 0)
                     glow_text = self.font_medium.render(f"> {option} <", True, glow_color)
                     glow_rect = glow_text.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * spacing))
@@ -500,7 +1201,7 @@ class Menu:
                 pygame.draw.rect(self.screen, color, (i, j, 45, 45), 1)
         
         # Title with shadow
-        for offset in range(3, 0, -1):
+        for offset in range(min(3, GLOW_PASSES[self.quality]), 0, -1):
             title_shadow = self.font_large.render("TOP 5 SCORES", True, (100, 100, 0))
             self.screen.blit(title_shadow, 
                            (SCREEN_WIDTH // 2 - title_shadow.get_width() // 2 + offset, 50 + offset))
@@ -574,7 +1275,7 @@ class Menu:
                 pygame.draw.rect(self.screen, color, (i, j, 45, 45), 1)
         
         # Title
-        for offset in range(3, 0, -1):
+        for offset in range(min(3, GLOW_PASSES[self.quality]), 0, -1):
             title_shadow = self.font_large.render("HELP", True, (0, 100, 100))
             self.screen.blit(title_shadow, 
                            (SCREEN_WIDTH // 2 - title_shadow.get_width() // 2 + offset, 30 + offset))
@@ -622,7 +1323,7 @@ class Menu:
         Handles user input in the menu.
         
         Returns:
-            Action to perform: 'start', 'quit', None
+            Action to perform: 'start', 'quality', 'difficulty', 'quit', None
         """
         if event.type == pygame.KEYDOWN:
             if self.state == "main":
@@ -637,7 +1338,11 @@ class Menu:
                         self.state = 'top5'
                     elif self.selected == 2:  # Help
                         self.state = 'help'
-                    elif self.selected == 3:  # Exit
+                    elif self.selected == 3:  # Quality preset
+                        return 'quality'
+                    elif self.selected == 4:  # Difficulty
+                        return 'difficulty'
+                    elif self.selected == 5:  # Exit
                         return 'quit'
             
             elif self.state in ['top5', 'help']:
@@ -692,21 +1397,28 @@ class Vehicle:
         elif self.direction < 0 and self.x < -self.width:
             self.x = SCREEN_WIDTH
     
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, quality: int = QUALITY_HIGH):
         """Rysuje pojazd na ekranie z ulepszoną grafiką."""
         # Cień
-        shadow_surf = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surf, (0, 0, 0, 80), 
-                          shadow_surf.get_rect())
-        screen.blit(shadow_surf, (self.x - 5, self.y + self.height - 5))
+        if quality > QUALITY_LOW:
+            shadow_surf = SURFACE_POOL.cached(
+                'vehicle_shadow', (self.width + 10, self.height + 10),
+                lambda s: pygame.draw.ellipse(s, (0, 0, 0, 80), s.get_rect())
+            )
+            screen.blit(shadow_surf, (self.x - 5, self.y + self.height - 5))
         
         # Główne ciało pojazdu z gradientem (symulowane)
-        for i in range(self.height):
+        step = GRADIENT_STEPS[quality] or self.height
+        for i in range(0, self.height, step):
             shade = int(i / self.height * 40)
             adjusted_color = tuple(max(0, min(255, c - shade)) for c in self.color)
-            pygame.draw.line(screen, adjusted_color, 
-                           (self.x, self.y + i), 
-                           (self.x + self.width, self.y + i))
+            if step == 1:
+                pygame.draw.line(screen, adjusted_color, 
+                               (self.x, self.y + i), 
+                               (self.x + self.width, self.y + i))
+            else:
+                pygame.draw.rect(screen, adjusted_color, 
+                               (self.x, self.y + i, self.width + 1, min(step, self.height - i)))
         
         # Obramowanie
         pygame.draw.rect(screen, tuple(max(0, c - 50) for c in self.color), 
@@ -767,7 +1479,8 @@ class Log:
     """
     
     def __init__(self, x: float, y: int, width: int, height: int, 
-                 speed: float, direction: int, color: Tuple[int, int, int]):
+                 speed: float, direction: int, color: Tuple[int, int, int],
+                 rng: random.Random = None):
         self.x = x
         self.y = y
         self.width = width
@@ -778,10 +1491,11 @@ class Log:
         self.wood_rings = []
         
         # Generuj losowe słoje drewna
-        for _ in range(random.randint(2, 4)):
+        rng = rng or random
+        for _ in range(rng.randint(2, 4)):
             self.wood_rings.append({
-                'x': random.randint(10, width - 10),
-                'size': random.randint(5, 10)
+                'x': rng.randint(10, width - 10),
+                'size': rng.randint(5, 10)
             })
     
     def update(self):
@@ -794,21 +1508,31 @@ class Log:
         elif self.direction < 0 and self.x < -self.width:
             self.x = SCREEN_WIDTH
     
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, quality: int = QUALITY_HIGH):
         """Rysuje kłodę na ekranie z ulepszoną grafiką."""
         # Cień w wodzie
-        shadow_surf = pygame.Surface((self.width, self.height + 5), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surf, (0, 0, 50, 100), 
-                          shadow_surf.get_rect())
-        screen.blit(shadow_surf, (self.x, self.y + 5))
+        if quality > QUALITY_LOW:
+            shadow_surf = SURFACE_POOL.cached(
+                'log_shadow', (self.width, self.height + 5),
+                lambda s: pygame.draw.ellipse(s, (0, 0, 50, 100), s.get_rect())
+            )
+            screen.blit(shadow_surf, (self.x, self.y + 5))
         
         # Główna część kłody z gradientem
-        for i in range(self.height):
-            shade = int(abs(i - self.height // 2) / (self.height // 2) * 30)
-            adjusted_color = tuple(max(0, c - shade) for c in self.color)
-            pygame.draw.line(screen, adjusted_color, 
-                           (self.x, self.y + i), 
-                           (self.x + self.width, self.y + i))
+        step = GRADIENT_STEPS[quality]
+        if step:
+            for i in range(0, self.height, step):
+                shade = int(abs(i - self.height // 2) / (self.height // 2) * 30)
+                adjusted_color = tuple(max(0, c - shade) for c in self.color)
+                if step == 1:
+                    pygame.draw.line(screen, adjusted_color, 
+                                   (self.x, self.y + i), 
+                                   (self.x + self.width, self.y + i))
+                else:
+                    pygame.draw.rect(screen, adjusted_color, 
+                                   (self.x, self.y + i, self.width + 1, min(step, self.height - i)))
+        else:
+            pygame.draw.rect(screen, self.color, (self.x, self.y, self.width + 1, self.height))
         
         # Zaokrąglone końce
         end_color = tuple(max(0, c - 40) for c in self.color)
@@ -840,8 +1564,10 @@ class Log:
                                  size, 1)
         
         # Highlight na górze
-        highlight_surf = pygame.Surface((self.width, 5), pygame.SRCALPHA)
-        pygame.draw.rect(highlight_surf, (*self.color, 100), highlight_surf.get_rect())
+        highlight_surf = SURFACE_POOL.cached(
+            ('log_highlight', self.color), (self.width, 5),
+            lambda s: pygame.draw.rect(s, (*self.color, 100), s.get_rect())
+        )
         screen.blit(highlight_surf, (self.x, self.y))
     
     def get_rect(self) -> pygame.Rect:
@@ -862,6 +1588,8 @@ class Frog:
         direction (str): Kierunek patrzenia żaby
     """
     
+    DIRECTIONS = ("up", "down", "left", "right")
+    
     def __init__(self, x: int, y: int, size: int):
         self.start_x = x
         self.start_y = y
@@ -873,6 +1601,7 @@ class Frog:
         self.direction = "up"  # up, down, left, right
         self.hop_animation = 0
         self.hop_height = 0
+        self.max_y = SCREEN_HEIGHT - size  # Najniższy rząd (wysokie poziomy: niżej)
     
     def move(self, dx: int, dy: int):
         """Przesuwa żabę o określoną wartość."""
@@ -895,7 +1624,7 @@ class Frog:
         
         # Ogranicz ruch do ekranu
         self.x = max(0, min(self.x, SCREEN_WIDTH - self.size))
-        self.y = max(0, min(self.y, SCREEN_HEIGHT - self.size))
+        self.y = max(0, min(self.y, self.max_y))
         
         # Punkty za ruch do przodu
         if dy < 0 and self.y < old_y:
@@ -917,15 +1646,18 @@ class Frog:
         else:
             self.hop_height = 0
     
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, quality: int = QUALITY_HIGH):
         """Rysuje żabę na ekranie z ulepszoną grafiką."""
         draw_x = self.x
         draw_y = self.y - self.hop_height
         
         # Cień
-        shadow_surf = pygame.Surface((self.size, self.size // 3), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surf, (0, 0, 0, 100), shadow_surf.get_rect())
-        screen.blit(shadow_surf, (draw_x, self.y + self.size - 10))
+        if quality > QUALITY_LOW:
+            shadow_surf = SURFACE_POOL.cached(
+                'frog_shadow', (self.size, self.size // 3),
+                lambda s: pygame.draw.ellipse(s, (0, 0, 0, 100), s.get_rect())
+            )
+            screen.blit(shadow_surf, (draw_x, self.y + self.size - 10))
         
         # Ciało żaby z gradientem
         body_center_x = draw_x + self.size // 2
@@ -933,7 +1665,8 @@ class Frog:
         body_radius = self.size // 2 - 5
         
         # Gradient ciała (symulowany z kręgami)
-        for i in range(body_radius, 0, -2):
+        ring_step = 2 * (GRADIENT_STEPS[quality] or body_radius)
+        for i in range(body_radius, 0, -ring_step):
             shade = int((body_radius - i) / body_radius * 100)
             color = (50 + shade, 220 - shade // 2, 50 + shade)
             pygame.draw.circle(screen, color, (body_center_x, body_center_y), i)
@@ -988,12 +1721,13 @@ class Frog:
         eye_y = draw_y + 15 + eye_offset_y
         
         # Większe oczy z gradientem
-        for i in range(7, 0, -1):
-            shade = int(i / 7 * 255)
-            pygame.draw.circle(screen, (shade, shade, shade), 
-                             (left_eye_x, eye_y), i)
-            pygame.draw.circle(screen, (shade, shade, shade), 
-                             (right_eye_x, eye_y), i)
+        if quality == QUALITY_HIGH:
+            for i in range(7, 0, -1):
+                shade = int(i / 7 * 255)
+                pygame.draw.circle(screen, (shade, shade, shade), 
+                                 (left_eye_x, eye_y), i)
+                pygame.draw.circle(screen, (shade, shade, shade), 
+                                 (right_eye_x, eye_y), i)
         
         pygame.draw.circle(screen, WHITE, (left_eye_x, eye_y), 7)
         pygame.draw.circle(screen, WHITE, (right_eye_x, eye_y), 7)
@@ -1033,208 +1767,3738 @@ class Frog:
         return pygame.Rect(self.x, self.y, self.size, self.size)
 
 
-class Game:
+def predict_x(x: float, width: int, speed: float, direction: int, ticks: int) -> float:
     """
-    Główna klasa gry Frogger.
+    Analitycznie wyznacza pozycję X obiektu (pojazdu lub kłody) po `ticks`
+    wywołaniach update(), z uwzględnieniem zawijania na krawędziach ekranu.
     
-    Zarządza logiką gry, kolizjami i renderowaniem.
+    Po pierwszym zawinięciu ruch jest okresowy: obiekt startuje od -width
+    (w prawo) lub od SCREEN_WIDTH (w lewo) i zawija się co
+    floor((SCREEN_WIDTH + width) / speed) + 1 ticków.
     """
+    if ticks <= 0 or speed == 0:
+        return x
     
-    def __init__(self):
-        """Inicjalizuje grę."""
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(
-            f"Frogger Enhanced - polsoft.ITS™ London © 2026 Sebastian Januchowski"
-        )
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.input_font = pygame.font.Font(None, 48)
-        self.font_tiny = pygame.font.Font(None, 18)
-        
-        # Menu i wyniki
-        self.menu = Menu(self.screen)
-        self.score_manager = ScoreManager()
-        self.config_manager = ConfigManager()
-        
-        # Efekty
-        self.particle_system = ParticleSystem()
-        self.water_effect = WaterEffect()
-        
-        # Stan gry
-        self.state = "menu"  # menu, playing, game_over, enter_name
-        self.player_name = ""
-        self.input_active = False
-        
-        # Inicjalizacja obiektów gry
-        self.frog = None
-        self.vehicles = []
-        self.logs = []
-        
-        self.running = True
-        
-        # Display configuration file location
-        print(f"\n{'='*60}")
-        print(f"Configuration file: {CONFIG_FILE}")
-        print(f"{'='*60}\n")
+    period = int((SCREEN_WIDTH + width) / speed) + 1
+    if direction > 0:
+        first_wrap = max(1, int((SCREEN_WIDTH - x) / speed) + 1)
+        if ticks < first_wrap:
+            return x + speed * ticks
+        return -width + speed * ((ticks - first_wrap) % period)
     
-    def start_new_game(self):
-        """Rozpoczyna nową grę."""
-        self.frog = Frog(SCREEN_WIDTH // 2 - 25, SCREEN_HEIGHT - GRID_SIZE, GRID_SIZE)
-        self.vehicles = self._create_vehicles()
-        self.logs = self._create_logs()
-        self.state = "playing"
-        self.player_name = ""
-        self.particle_system = ParticleSystem()
-        
-        # Aktualizuj czas ostatniej gry
-        self.config_manager.update_last_played()
+    first_wrap = max(1, int((x + width) / speed) + 1)
+    if ticks < first_wrap:
+        return x - speed * ticks
+    return SCREEN_WIDTH - speed * ((ticks - first_wrap) % period)
+
+
+def next_overlap_tick(x: float, width: int, speed: float, direction: int,
+                      left: int, right: int) -> Optional[int]:
+    """
+    Zwraca najmniejsze k >= 1, dla którego obiekt po k aktualizacjach
+    (pozycja jak w predict_x) nachodzi na przedział pikseli [left, right),
+    albo None, jeśli to nigdy nie nastąpi.
     
-    def _create_vehicles(self) -> List[Vehicle]:
-        """Tworzy listę pojazdów."""
-        vehicles = []
-        
-        # 5 pasów ruchu
-        lanes = [
-            {'y': 600, 'speed': 2, 'direction': 1, 'color': (220, 20, 60), 'width': 80},
-            {'y': 550, 'speed': 3, 'direction': -1, 'color': (30, 144, 255), 'width': 80},
-            {'y': 500, 'speed': 1.5, 'direction': 1, 'color': (255, 215, 0), 'width': 100},
-            {'y': 450, 'speed': 2.5, 'direction': -1, 'color': (138, 43, 226), 'width': 70},
-            {'y': 400, 'speed': 2, 'direction': 1, 'color': (0, 206, 209), 'width': 90}
-        ]
-        
-        for lane in lanes:
-            for i in range(3):
-                x = i * (SCREEN_WIDTH / 2) + random.randint(0, 100)
-                vehicles.append(Vehicle(
-                    x, lane['y'], lane['width'], 40,
-                    lane['speed'], lane['direction'], lane['color']
-                ))
-        
-        return vehicles
+    Ruch jest liniowy między zawinięciami, więc przedział wejścia jest
+    liczony w postaci zamkniętej; dokładny warunek (obcięcie do int jak
+    w pygame.Rect) sprawdzany jest tylko dla kilku ticków wokół wyniku.
+    Wystarczy zbadać odcinek przed pierwszym zawinięciem i jeden pełny
+    okres - kolejne okresy są identyczne.
+    """
+    if speed == 0:
+        return 1 if left - width < int(x) < right else None
     
-    def _create_logs(self) -> List[Log]:
-        """Tworzy listę kłód."""
-        logs = []
-        
-        # 4 rzędy kłód
-        lanes = [
-            {'y': 200, 'speed': 1.5, 'direction': 1, 'color': (139, 69, 19), 'width': 150},
-            {'y': 150, 'speed': 2, 'direction': -1, 'color': (160, 82, 45), 'width': 120},
-            {'y': 100, 'speed': 1, 'direction': 1, 'color': (139, 69, 19), 'width': 180},
-            {'y': 50, 'speed': 2.5, 'direction': -1, 'color': (160, 82, 45), 'width': 130}
-        ]
-        
-        for lane in lanes:
-            for i in range(2):
-                x = i * (SCREEN_WIDTH / 1.5) + random.randint(0, 150)
-                logs.append(Log(
-                    x, lane['y'], lane['width'], 40,
-                    lane['speed'], lane['direction'], lane['color']
-                ))
-        
-        return logs
+    period = int((SCREEN_WIDTH + width) / speed) + 1
+    if direction > 0:
+        first_wrap = max(1, int((SCREEN_WIDTH - x) / speed) + 1)
+        segments = [(1, first_wrap - 1, x + speed, 1), (first_wrap, first_wrap + period - 1, -width, 0)]
+    else:
+        first_wrap = max(1, int((x + width) / speed) + 1)
+        segments = [(1, first_wrap - 1, x - speed, 1), (first_wrap, first_wrap + period - 1, SCREEN_WIDTH, 0)]
     
-    def draw_background(self):
-        """Rysuje tło gry z ulepszoną grafiką."""
-        # Rzeka z animacją
-        water_rect = pygame.Rect(0, 50, SCREEN_WIDTH, 200)
-        self.water_effect.draw(self.screen, water_rect)
+    for start, end, base, offset in segments:
+        if end < start:
+            continue
+        # Pozycja w ticku k: base ± speed * (k - start); dla pierwszego odcinka
+        # liczona jak w predict_x: x ± speed * k
+        if direction > 0:
+            j = max(0, math.ceil((left - width - base) / speed) - 1)
+        else:
+            j = max(0, math.floor((base - right) / speed) - 1)
+        while start + j <= end:
+            k = start + j
+            if offset:
+                position = x + speed * k if direction > 0 else x - speed * k
+            else:
+                position = base + speed * j if direction > 0 else base - speed * j
+            if direction > 0 and position >= right + 1:
+                break
+            if direction < 0 and position <= left - width - 1:
+                break
+            if left - width < int(position) < right:
+                return k
+            j += 1
+    return None
+
+
+class LaneTable:
+    """
+    Okresowa tabela zajętości jednego pasa (ruch 'wrap').
+    
+    Obiekt po zawinięciu startuje zawsze z tej samej pozycji (-width albo
+    SCREEN_WIDTH) i wykonuje te same dodawania, więc od pierwszego
+    zawinięcia jego ruch jest dokładnie okresowy - także w arytmetyce
+    zmiennoprzecinkowej. Od ticku `transient` (ostatnie pierwsze zawinięcie
+    na pasie) cały pas powtarza się co `period` ticków (NWW okresów
+    obiektów - obiekty jednego pasa mają zwykle ten sam). Tabela ma `length`
+    wierszy, po jednym na każdy tick z przedziału [0, transient + period):
+    bitmapę zajętych pikseli (int, bit i to kolumna x = i) i pozycje
+    obiektów. Pytanie o dowolny tick to wybór wiersza (row()) i przesunięcie
+    bitów.
+    
+    Wiersze są liczone przy pierwszym pytaniu o nie (positions(), mask()),
+    więc budowa tabeli to tylko ruch obiektów do końca pierwszego okresu;
+    okres po zawinięciu zależy tylko od szerokości i kroku, więc obiekty
+    pasa liczą go raz. Tryb kolizji 'table' pyta o jeden wiersz na tick,
+    a nie o cały okres każdego pasa po każdej zmianie poziomu.
+    
+    Pozycje są liczone krok po kroku jak w Vehicle.update / Log.update
+    i obcinane do int jak w pygame.Rect, więc wynik jest ten sam co
+    colliderect z obiektami świata.
+    """
+    
+    def __init__(self, objects: List[Tuple[float, int, float, int]]):
+        """
+        Args:
+            objects: Krotki (x w ticku 0, szerokość, prędkość, kierunek)
+        """
+        self.objects = objects
+        self.velocities = tuple(speed * direction for _, _, speed, direction in objects)
+        loops = {}
+        self._cycles = [self.cycle(*obj, loops) for obj in objects]
+        self.transient = max((len(approach) for approach, _ in self._cycles), default=0)
+        self.period = math.lcm(*(len(loop) for _, loop in self._cycles)) if objects else 1
+        self.length = self.transient + self.period
+        self._blocks = [(1 << width) - 1 for _, width, _, _ in objects]
+        self._positions = [None] * self.length
+        self._masks = [None] * self.length
+    
+    @staticmethod
+    def cycle(x: float, width: int, speed: float, direction: int,
+              loops: dict = None) -> Tuple[List[float], List[float]]:
+        """
+        Pozycje obiektu krok po kroku (jak update()): przed pierwszym
+        zawinięciem i w pierwszym pełnym okresie po nim.
         
-        # Droga z teksturą
-        for i in range(250):
-            shade = int(i / 250 * 30)
-            road_color = (68 + shade, 68 + shade, 68 + shade)
-            pygame.draw.line(self.screen, road_color, 
-                           (0, 400 + i), (SCREEN_WIDTH, 400 + i))
+        Args:
+            loops: Okresy już policzone dla (szerokość, krok) - wspólne
+                   dla obiektów pasa
         
-        # Bezpieczne strefy z teksturą trawy
-        # Start
-        for i in range(GRID_SIZE):
-            grass_shade = random.randint(-10, 10)
-            grass_color = (
-                max(0, min(255, 34 + grass_shade)),
-                max(0, min(255, 139 + grass_shade)),
-                max(0, min(255, 34 + grass_shade))
-            )
-            for x in range(0, SCREEN_WIDTH, 20):
-                if random.random() > 0.3:
-                    pygame.draw.line(self.screen, grass_color, 
-                                   (x + random.randint(-5, 5), 650 + i), 
-                                   (x + random.randint(-3, 3), 650 + i + random.randint(5, 15)), 1)
+        Returns:
+            (pozycje w tickach 0..zawinięcie-1, pozycje w okresie od zawinięcia)
+        """
+        if speed == 0:
+            return [], [x]
+        step = speed * direction
+        approach = [x]
+        while True:
+            x += step
+            if x > SCREEN_WIDTH if direction > 0 else x < -width:
+                break
+            approach.append(x)
         
-        # Środek
-        for i in range(GRID_SIZE):
-            grass_shade = random.randint(-10, 10)
-            grass_color = (
-                max(0, min(255, 34 + grass_shade)),
-                max(0, min(255, 139 + grass_shade)),
-                max(0, min(255, 34 + grass_shade))
-            )
-            for x in range(0, SCREEN_WIDTH, 20):
-                if random.random() > 0.3:
-                    pygame.draw.line(self.screen, grass_color, 
-                                   (x + random.randint(-5, 5), 350 + i), 
-                                   (x + random.randint(-3, 3), 350 + i + random.randint(5, 15)), 1)
+        loop = loops.get((width, step)) if loops is not None else None
+        if loop is None:
+            x = -width if direction > 0 else SCREEN_WIDTH
+            loop = [x]
+            while True:
+                x += step
+                if x > SCREEN_WIDTH if direction > 0 else x < -width:
+                    break
+                loop.append(x)
+            if loops is not None:
+                loops[width, step] = loop
+        return approach, loop
+    
+    def row(self, tick: int) -> int:
+        """Indeks wiersza tabeli dla stanu po `tick` aktualizacjach."""
+        if tick < self.length:
+            return max(0, tick)
+        return self.transient + (tick - self.transient) % self.period
+    
+    def positions(self, row: int) -> tuple:
+        """Pozycje x obiektów w wierszu `row`."""
+        xs = self._positions[row]
+        if xs is None:
+            xs = self._positions[row] = tuple(
+                approach[row] if row < len(approach) else loop[(row - len(approach)) % len(loop)]
+                for approach, loop in self._cycles)
+        return xs
+    
+    def mask(self, row: int) -> int:
+        """Bitmapa zajętych pikseli w wierszu `row`."""
+        mask = self._masks[row]
+        if mask is None:
+            mask = 0
+            for ex, block in zip(self.positions(row), self._blocks):
+                ex = int(ex)
+                mask |= block << ex if ex >= 0 else block >> -ex
+            mask = self._masks[row] = mask & ((1 << SCREEN_WIDTH) - 1)
+        return mask
+    
+    def overlap(self, x: int, size: int, tick: int) -> Optional[int]:
+        """Indeks pierwszego obiektu nachodzącego na piksele [x, x + size) albo None."""
+        row = self.row(tick)
+        mask = self._masks[row]
+        if mask is None:
+            mask = self.mask(row)
+        if not (mask >> x) & ((1 << size) - 1):
+            return None
+        for i, ex in enumerate(self.positions(row)):
+            ex = int(ex)
+            if ex < x + size and x < ex + self.objects[i][1]:
+                return i
+        return None
+
+
+class OccupancyTable:
+    """
+    Tabele LaneTable rzędów świata z ruchem 'wrap' - kolizje bez prostokątów.
+    
+    Budowana ze stanu pasów w ticku `base_tick` (rząd y -> lista (x, szerokość,
+    prędkość, kierunek)); tabela rzędu jest liczona przy pierwszym pytaniu
+    o ten rząd. Ticki w zapytaniach są bezwzględne: stan świata po `tick`
+    aktualizacjach (world.tick == tick). Tabela obowiązuje, dopóki nie
+    zmienią się prędkości ani zbiór obiektów (World.layout_version).
+    
+    Z `previous` tabele rzędów, które nadal zgadzają się z nowym stanem
+    (te same parametry, przewidziane pozycje równe bieżącym), są przejmowane
+    zamiast liczone od nowa - np. gdy na wysokiej planszy zmienia się tylko
+    zakres znanych pasów albo gdy zmiana poziomu nie zmieniła prędkości pasa.
+    """
+    
+    def __init__(self, rows: Dict[int, list], water_rows: frozenset = frozenset(),
+                 base_tick: int = 0, version: int = 0, previous: 'OccupancyTable' = None):
+        self.base_tick = base_tick
+        self.version = version
+        self.water_rows = water_rows
+        self._sources = rows
+        self._lanes = {}    # y -> (LaneTable, tick bazowy tabeli)
+        # Także tabele przejęte przez `previous`, o które jeszcze nie pytano
+        self._previous = {}
+        if previous is not None:
+            self._previous = {y: entry for y, entry in (*previous._previous.items(),
+                                                        *previous._lanes.items())
+                              if y in rows}
+    
+    @classmethod
+    def from_world(cls, world: 'World', previous: 'OccupancyTable' = None) -> 'OccupancyTable':
+        """Tabela dla bieżącego stanu świata (tylko traffic='wrap')."""
+        if world.traffic != "wrap":
+            raise ValueError("OccupancyTable requires traffic='wrap'")
+        rows = {}
+        for entity, x in world.entity_positions():
+            rows.setdefault(entity.y, []).append((x, entity.width, entity.speed, entity.direction))
+        return cls(rows, world.water_rows, world.tick, world.layout_version, previous)
+    
+    def lane(self, y: int) -> Tuple[Optional[LaneTable], int]:
+        """(tabela rzędu y albo None, jeśli nic w nim nie jeździ; jej tick bazowy)."""
+        entry = self._lanes.get(y)
+        if entry is None:
+            objects = self._sources.get(y)
+            if objects is None:
+                return None, 0
+            entry = self._previous.get(y)
+            if entry is not None:
+                lane, base = entry
+                if (base > self.base_tick or
+                        [obj[1:] for obj in lane.objects] != [obj[1:] for obj in objects] or
+                        lane.positions(lane.row(self.base_tick - base)) != tuple(x for x, *_ in objects)):
+                    entry = None
+            if entry is None:
+                entry = (LaneTable(objects), self.base_tick)
+            self._lanes[y] = entry
+        return entry
+    
+    def overlap(self, x: float, y: int, size: int, tick: int) -> Optional[int]:
+        """Indeks obiektu rzędu y nachodzącego na żabę w (x, y) w ticku `tick` albo None."""
+        lane, base = self.lane(y)
+        return None if lane is None else lane.overlap(int(x), size, tick - base)
+    
+    def log_at(self, x: float, y: int, size: int, tick: int) -> Optional[Tuple[float, float]]:
+        """(x kłody, prędkość ze znakiem) kłody pod żabą w (x, y) w ticku `tick` albo None."""
+        i = self.overlap(x, y, size, tick)
+        if i is None:
+            return None
+        lane, base = self._lanes[y]
+        return lane.positions(lane.row(tick - base))[i], lane.velocities[i]
+    
+    def positions(self, y: int, tick: int) -> tuple:
+        """Pozycje x obiektów rzędu y w ticku `tick`."""
+        lane, base = self.lane(y)
+        return () if lane is None else lane.positions(lane.row(tick - base))
+    
+    def deadly(self, col: int, row: int, tick: int) -> bool:
+        """Czy żaba w komórce siatki (col, row) ginie w ticku `tick`."""
+        y = row * GRID_SIZE
+        return (self.overlap(col * GRID_SIZE, y, GRID_SIZE, tick) is None) == (y in self.water_rows)
+
+
+class LaneSpawner:
+    """
+    Strumień ruchu jednego pasa (tryb World traffic='stream').
+    
+    Obiekty wjeżdżają zza krawędzi ekranu w odstępach losowanych z rozkładu
+    (GAP_DISTRIBUTIONS), a po wyjechaniu za drugą krawędź trafiają na wolną
+    listę i są używane ponownie przy kolejnym wjeździe - po rozgrzaniu pas
+    nie tworzy już nowych obiektów. Obiekty pasa różnią się tylko pozycją,
+    więc ponowne użycie to zmiana x.
+    
+    Parametry pasa (klucze słownika z VEHICLE_LANES/LOG_LANES):
+        density - średnia liczba obiektów na szerokość ekranu + obiektu
+                  (domyślnie liczba obiektów na pas jak w trybie 'wrap')
+        gap     - rozkład odstępów: 'uniform', 'exponential' lub 'fixed'
+        min_gap - najmniejsza wolna przerwa w pikselach
+    
+    Odległości liczone są w układzie pasa u (droga przebyta od wjazdu):
+    obiekt wjeżdża w u = -width i znika, gdy u > SCREEN_WIDTH - dokładnie
+    tam, gdzie w trybie 'wrap' byłby zawinięty.
+    
+    Każdy pas losuje odstępy własnym generatorem, a wylosowane z wyprzedzeniem
+    (upcoming()) czekają w kolejce - przyszłe wjazdy są więc znane z góry
+    (planer) i nie zależą od tego, czy ktoś o nie pytał (replaye). W kolejce
+    są odstępy względne (średnia 1), skalowane bieżącą gęstością dopiero
+    przy użyciu, więc configure() nie unieważnia już wylosowanych.
+    """
+    
+    GAP_DISTRIBUTIONS = ("uniform", "exponential", "fixed")
+    
+    def __init__(self, lane: Dict, make, target: list, rng: random.Random, per_lane: int):
+        """
+        Args:
+            lane: Parametry pasa
+            make: Funkcja x -> nowy obiekt pasa (Vehicle lub Log)
+            target: Lista obiektów świata, do której dopisywane są aktywne obiekty
+            rng: Generator liczb losowych świata
+            per_lane: Domyślna gęstość
+        """
+        self.lane = lane
+        self.make = make
+        self.target = target
+        self.rng = random.Random(rng.getrandbits(64))
+        self.spacings = deque()  # Odstępy względne wylosowane z wyprzedzeniem
+        self.active = []
+        self.free = []
+        self.created = 0
+        self.spawned = 0
+        self.configure(lane['speed'], lane.get('density', per_lane))
+        
+        # Wypełnij pas od strony wyjazdu, jakby strumień płynął od dawna
+        u = SCREEN_WIDTH - self.rng.uniform(0, self.mean_spacing)
+        while u > -self.width:
+            self._activate(u)
+            u -= self._spacing()
+        self.distance = -self.width - u  # Droga do wjazdu następnego obiektu
+    
+    def configure(self, speed: float, density: float):
+        """Zmienia prędkość i gęstość pasa w miejscu (bez tworzenia obiektów)."""
+        lane = self.lane
+        self.width = lane['width']
+        self.speed = speed
+        self.direction = lane['direction']
+        self.gap = lane.get('gap', 'uniform')
+        self.min_gap = lane.get('min_gap', GRID_SIZE)
+        self.mean_spacing = (SCREEN_WIDTH + self.width) / max(density, 0.1)
+        for entity in self.active:
+            entity.speed = speed
+        for entity in self.free:
+            entity.speed = speed
+    
+    def _spacing(self) -> float:
+        """Odległość przód-przód do następnego obiektu."""
+        return self._scale(self.spacings.popleft() if self.spacings else self._draw_unit())
+    
+    def _scale(self, unit: float) -> float:
+        return max(unit * self.mean_spacing, self.width + self.min_gap)
+    
+    def _draw_unit(self) -> float:
+        """Losuje odstęp względny (średnia 1) z rozkładu pasa."""
+        if self.gap == 'fixed':
+            return 1.0
+        if self.gap == 'exponential':
+            return self.rng.expovariate(1.0)
+        return self.rng.uniform(0.5, 1.5)
+    
+    def upcoming(self, ticks: int) -> List[float]:
+        """Pozycje x (jeszcze za ekranem) obiektów, które wjadą w ciągu `ticks` ticków."""
+        reach = self.speed * ticks
+        u = -self.width - self.distance
+        positions = []
+        i = 0
+        while -self.width - u <= reach:
+            positions.append(u if self.direction > 0 else SCREEN_WIDTH - self.width - u)
+            if i == len(self.spacings):
+                self.spacings.append(self._draw_unit())
+            u -= self._scale(self.spacings[i])
+            i += 1
+        return positions
+    
+    def _activate(self, u: float):
+        x = u if self.direction > 0 else SCREEN_WIDTH - self.width - u
+        if self.free:
+            entity = self.free.pop()
+            entity.x = x
+        else:
+            entity = self.make(x)
+            entity.speed = self.speed
+            self.created += 1
+        self.active.append(entity)
+        self.target.append(entity)
+        self.spawned += 1
+    
+    def update(self) -> bool:
+        """Przesuwa obiekty pasa o jeden tick; zwraca True, gdy zmienił się ich zbiór."""
+        changed = False
+        step = self.speed * self.direction
+        for entity in self.active:
+            entity.x += step
+        
+        # Obiekty są w kolejności wjazdu, więc wyjeżdżają z początku listy
+        while self.active:
+            entity = self.active[0]
+            if -self.width <= entity.x <= SCREEN_WIDTH:
+                break
+            self.active.pop(0)
+            self.target.remove(entity)
+            self.free.append(entity)
+            changed = True
+        
+        self.distance -= self.speed
+        while self.distance <= 0:
+            self._activate(-self.width - self.distance)
+            self.distance += self._spacing()
+            changed = True
+        return changed
+
+
+class Progression:
+    """
+    Parametry pasów na kolejnych poziomach dla jednego poziomu trudności.
+    
+    Cała tabela (poziomy 1..MAX_LEVEL) jest liczona w konstruktorze, więc
+    przejście na kolejny poziom to odczyt jednego wiersza i przypisanie
+    prędkości istniejącym obiektom (World.set_level) - bez tworzenia
+    obiektów i bez obliczeń w trakcie gry.
+    
+    Wiersz tabeli to krotka (prędkość, gęstość) dla każdego pasa, w kolejności
+    pasów drogi, a potem rzek. Gęstość działa tylko w trybie 'stream' - w
+    trybie 'wrap' liczba obiektów na pasie jest stała.
+    """
+    
+    def __init__(self, difficulty: str, lanes: List[Tuple[Dict, int]]):
+        """
+        Args:
+            difficulty: Klucz DIFFICULTIES
+            lanes: Pary (parametry pasa, domyślna liczba obiektów na pasie)
+        """
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        self.difficulty = difficulty
+        scale = DIFFICULTIES[difficulty]
+        self.table = []
+        for level in range(MAX_LEVEL):
+            speed = scale['speed'] * (1 + scale['speed_step'] * level)
+            density = scale['density'] * (1 + scale['density_step'] * level)
+            self.table.append(tuple((lane['speed'] * speed, lane.get('density', per_lane) * density)
+                                    for lane, per_lane in lanes))
+    
+    def lanes(self, level: int) -> tuple:
+        """Parametry pasów na danym poziomie (od 1)."""
+        return self.table[min(max(level, 1), MAX_LEVEL) - 1]
+
+
+def tall_level(screens: int) -> Dict:
+    """
+    Parametry World dla planszy o wysokości `screens` odcinków.
+    
+    Odcinek to zwykła plansza bez rzędu startu (LEVEL_SECTION pikseli):
+    rząd trawy (na najwyższym odcinku meta), rzeka, pas zieleni i droga.
+    Odcinki są ułożone jeden nad drugim, a start jest pod najniższym;
+    parametry pasów (prędkość, kierunek, kolor, szerokość) są w kolejnych
+    odcinkach przesunięte cyklicznie, żeby odcinki się różniły. Dla
+    screens=1 wynik jest równy zwykłej planszy.
+    
+    Returns:
+        Słownik z kluczami vehicle_lanes, log_lanes i height
+    """
+    vehicle_lanes, log_lanes = [], []
+    for section in range(screens):
+        offset = section * LEVEL_SECTION
+        for lanes, target in ((VEHICLE_LANES, vehicle_lanes), (LOG_LANES, log_lanes)):
+            for i, lane in enumerate(lanes):
+                params = dict(lanes[(i + section) % len(lanes)])
+                params['y'] = lane['y'] + offset
+                target.append(params)
+    return {'vehicle_lanes': vehicle_lanes, 'log_lanes': log_lanes,
+            'height': screens * LEVEL_SECTION + GRID_SIZE}
+
+
+def _shallow_copy(obj):
+    """Płytka kopia obiektu bez __slots__ (szybsza niż copy.copy)."""
+    clone = object.__new__(type(obj))
+    clone.__dict__.update(obj.__dict__)
+    return clone
+
+
+class World:
+    """
+    Symulacja gry bez renderowania: żaba, pojazdy, kłody i kolizje.
+    
+    Nie używa ekranu ani globalnego generatora liczb losowych, więc ten sam
+    seed i te same ruchy dają identyczny przebieg. Game rysuje stan świata
+    i zamienia zdarzenia ze step() na efekty; tryb headless (testy balansu,
+    boty, replaye) używa World bezpośrednio.
+    
+    Zdarzenia zwracane przez step() to krotki (rodzaj, x, y), gdzie rodzaj
+    to 'crash' (pojazd), 'splash' (woda) lub 'goal' (meta), a x, y to
+    środek żaby w chwili zdarzenia.
+    
+    Kolizje są sprawdzane w jednym z trybów (COLLISION_MODES):
+    'poll' - colliderect z każdym obiektem w każdym ticku,
+    'event' - tick następnej kolizji/utonięcia jest wyliczany analitycznie
+    (next_overlap_tick) i trzymany w kolejce priorytetowej per pas; pełne
+    sprawdzenie odbywa się tylko, gdy zdarzenie nadchodzi albo żaba się
+    ruszyła,
+    'table' - odczyt z okresowych bitmap zajętości pasów (OccupancyTable,
+    tylko ruch 'wrap' i plansza jednoekranowa), przeliczanych po zmianie
+    layout_version.
+    Tryby dają identyczny przebieg (tools/verify_collisions.py). Na wysokiej
+    planszy pasy poza kamerą są doganiane analitycznie (predict_x), czego
+    iteracyjnie krokowane tabele nie odtwarzają dokładnie, więc 'table'
+    jest tam odrzucany.
+    
+    Ruch na pasach (TRAFFIC_MODES): 'wrap' - stała liczba obiektów
+    zawijanych na krawędziach (przewidywalna przez predict_x), 'stream' -
+    LaneSpawner z losowymi odstępami i pulą obiektów. layout_version
+    rośnie przy każdej zmianie zbioru obiektów lub parametrów pasów.
+    
+    Z poziomem trudności (difficulty) każde dotarcie do mety podnosi
+    poziom: prędkości (i gęstość strumieni) rosną według tabeli Progression,
+    zmieniane w miejscu. Bez niego pasy są stałe przez całą grę.
+    
+    Plansza może być wyższa niż ekran (height, pasy z tall_level()). Wtedy
+    w każdym ticku aktualizowane są tylko pasy w pasie widoku wokół żaby
+    (VIEW_MARGIN ekranu w górę i w dół, patrz active_band()); pozostałe
+    stoją i przy powrocie do widoku są doganiane analitycznie (predict_x)
+    o liczbę pominiętych ticków. Kolizje sprawdzają tylko pasy rzędu żaby,
+    więc koszt ticka nie zależy od wysokości planszy. Zakres aktywnych pasów
+    zależy wyłącznie od pozycji żaby, więc przebieg nadal jest wyznaczony
+    przez ziarno i ruchy.
+    
+    Do przeszukiwania drzewa gry (ruch 'wrap'): snapshot() zapisuje stan
+    dynamiczny w płaskim buforze liczb, restore() wpisuje go z powrotem,
+    a fork() tworzy niezależną kopię świata (tools/bench_fork.py).
+    """
+    
+    COLLISION_MODES = ("poll", "event", "table")
+    _LINEAGES = itertools.count(1)  # Rodowody migawek, patrz snapshot()
+    VIEW_MARGIN = 1.0  # Wysokie poziomy: ile ekranów nad i pod żabą symulować dokładnie
+    TRAFFIC_MODES = ("wrap", "stream")
+    
+    def __init__(self, seed: int = None,
+                 vehicle_lanes: List[Dict] = None, log_lanes: List[Dict] = None,
+                 vehicles_per_lane: int = VEHICLES_PER_LANE,
+                 logs_per_lane: int = LOGS_PER_LANE,
+                 collision_mode: str = "poll", traffic: str = "wrap",
+                 difficulty: str = None, height: int = SCREEN_HEIGHT):
+        """
+        Tworzy nowy świat.
+        
+        Args:
+            seed: Ziarno losowania pozycji obiektów (domyślnie losowe)
+            vehicle_lanes: Parametry pasów drogi (domyślnie VEHICLE_LANES)
+            log_lanes: Parametry rzędów kłód (domyślnie LOG_LANES)
+            vehicles_per_lane: Liczba pojazdów na pasie
+            logs_per_lane: Liczba kłód w rzędzie
+            collision_mode: 'poll', 'event' lub 'table'
+            traffic: 'wrap' lub 'stream'
+            difficulty: Klucz DIFFICULTIES - włącza poziomy (domyślnie pasy stałe)
+            height: Wysokość planszy w pikselach (wyższa niż ekran - kamera i
+                    symulacja tylko pasów w pobliżu żaby)
+        """
+        if collision_mode not in self.COLLISION_MODES:
+            raise ValueError(f"Unknown collision mode: {collision_mode}")
+        if collision_mode == "table" and traffic != "wrap":
+            raise ValueError("collision_mode='table' requires traffic='wrap'")
+        if traffic not in self.TRAFFIC_MODES:
+            raise ValueError(f"Unknown traffic mode: {traffic}")
+        if height > SCREEN_HEIGHT and traffic != "wrap":
+            raise ValueError("Tall levels support only traffic='wrap'")
+        if height > SCREEN_HEIGHT and collision_mode == "table":
+            raise ValueError("Tall levels do not support collision_mode='table'")
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.game_over = False
+        self.events = []
+        
+        self.vehicle_lanes = vehicle_lanes if vehicle_lanes is not None else VEHICLE_LANES
+        self.log_lanes = log_lanes if log_lanes is not None else LOG_LANES
+        
+        self.height = height
+        self.tall = height > SCREEN_HEIGHT
+        self.water_rows = frozenset(lane['y'] for lane in self.log_lanes)
+        self.frog = Frog(SCREEN_WIDTH // 2 - 25, height - GRID_SIZE, GRID_SIZE)
+        self.frog.max_y = height - GRID_SIZE
+        self.traffic = traffic
+        self.layout_version = 0
+        self._lineage = next(self._LINEAGES)
+        self.spawners = []
+        if traffic == "stream":
+            self.vehicles, self.logs = [], []
+            self._create_spawners(vehicles_per_lane, logs_per_lane)
+        else:
+            self.vehicles = self._create_vehicles(vehicles_per_lane)
+            self.logs = self._create_logs(logs_per_lane)
+            # Obiekty każdego pasa (w kolejności pasów) - do zmiany prędkości
+            self._lane_groups = (
+                [self.vehicles[i * vehicles_per_lane:(i + 1) * vehicles_per_lane]
+                 for i in range(len(self.vehicle_lanes))] +
+                [self.logs[i * logs_per_lane:(i + 1) * logs_per_lane]
+                 for i in range(len(self.log_lanes))])
+        
+        # Wysokie poziomy: pasy posortowane wg y jako [y, obiekty, tick
+        # ostatniej aktualizacji], obiekty każdego rzędu do kolizji i liczniki
+        self._lanes = []
+        self._lane_ys = []
+        self._rows = None
+        self.lanes_updated = 0    # Pasy zaktualizowane w ostatnim ticku
+        self.lane_catchups = 0    # Dogonienia pasów wracających do widoku
+        if self.tall:
+            lanes = sorted(zip([lane['y'] for lane in self.vehicle_lanes + self.log_lanes],
+                               self._lane_groups), key=lambda lane: lane[0])
+            self._lanes = [[y, group, 0] for y, group in lanes]
+            self._lane_ys = [y for y, _ in lanes]
+            self._rows = {}
+            for y, group in lanes:
+                vehicles, logs = self._rows.setdefault(y, ([], []))
+                for entity in group:
+                    (logs if isinstance(entity, Log) else vehicles).append(entity)
+        
+        # Poziomy: tabela liczona raz na grę, poziom 1 ustawiany od razu
+        self.level = 1
+        self.progression = None
+        if difficulty is not None:
+            self.progression = Progression(
+                difficulty,
+                [(lane, vehicles_per_lane) for lane in self.vehicle_lanes] +
+                [(lane, logs_per_lane) for lane in self.log_lanes])
+            self.set_level(1)
+        
+        # Tryb zdarzeniowy: kolejka (tick, rodzaj, y pasa), przesunięcie żaby
+        # niesionej przez kłodę i pozycja, dla której liczono kolejkę
+        self.collision_mode = collision_mode
+        self.collision_checks = 0
+        self._collision_queue = []
+        self._carry = 0.0
+        self._scheduled_at = None
+        self.occupancy = None  # OccupancyTable (tryb 'table' i boty, occupancy_table())
+        
+        # Zapis przebiegu (Trajectory lub None) i ruch żaby w bieżącym ticku
+        self.trajectory = None
+        self._move = None
+    
+    def _create_vehicles(self, per_lane: int) -> List[Vehicle]:
+        """Tworzy listę pojazdów."""
+        vehicles = []
+        
+        for lane in self.vehicle_lanes:
+            for i in range(per_lane):
+                x = i * (SCREEN_WIDTH / 2) + self.rng.randint(0, 100)
+                vehicles.append(Vehicle(
+                    x, lane['y'], lane['width'], LANE_OBJECT_HEIGHT,
+                    lane['speed'], lane['direction'], lane['color']
+                ))
+        
+        return vehicles
+    
+    def _create_logs(self, per_lane: int) -> List[Log]:
+        """Tworzy listę kłód."""
+        logs = []
+        
+        for lane in self.log_lanes:
+            for i in range(per_lane):
+                x = i * (SCREEN_WIDTH / 1.5) + self.rng.randint(0, 150)
+                logs.append(Log(
+                    x, lane['y'], lane['width'], LANE_OBJECT_HEIGHT,
+                    lane['speed'], lane['direction'], lane['color'],
+                    self.rng
+                ))
+        
+        return logs
+    
+    def upcoming_entities(self, ticks: int) -> List[Tuple[int, float, int, float, int]]:
+        """Obiekty, które wjadą w ciągu `ticks` ticków: (y, x, width, speed, direction)."""
+        entities = []
+        for spawner in self.spawners:
+            for x in spawner.upcoming(ticks):
+                entities.append((spawner.lane['y'], x, spawner.width, spawner.speed, spawner.direction))
+        return entities
+    
+    def _create_spawners(self, vehicles_per_lane: int, logs_per_lane: int):
+        """Tworzy strumienie ruchu dla wszystkich pasów."""
+        for lane in self.vehicle_lanes:
+            make = (lambda x, lane=lane: Vehicle(x, lane['y'], lane['width'], LANE_OBJECT_HEIGHT,
+                                                 lane['speed'], lane['direction'], lane['color']))
+            self.spawners.append(LaneSpawner(lane, make, self.vehicles, self.rng, vehicles_per_lane))
+        for lane in self.log_lanes:
+            make = (lambda x, lane=lane: Log(x, lane['y'], lane['width'], LANE_OBJECT_HEIGHT,
+                                             lane['speed'], lane['direction'], lane['color'], self.rng))
+            self.spawners.append(LaneSpawner(lane, make, self.logs, self.rng, logs_per_lane))
+    
+    def set_level(self, level: int):
+        """Ustawia poziom: parametry pasów z tabeli progresji, w miejscu."""
+        self.level = level
+        params = self.progression.lanes(level)
+        if self.spawners:
+            for spawner, (speed, density) in zip(self.spawners, params):
+                spawner.configure(speed, density)
+        else:
+            for group, (speed, _) in zip(self._lane_groups, params):
+                for entity in group:
+                    entity.speed = speed
+        self.layout_version += 1
+        self._lineage = next(self._LINEAGES)
+    
+    def lane_objects(self) -> list:
+        """Po jednym obiekcie z prędkością i kierunkiem na pas (drogi, potem rzeki)."""
+        if self.spawners:
+            return list(self.spawners)
+        return [group[0] for group in self._lane_groups if group]
+    
+    def lane_heads(self) -> List[Tuple[object, float]]:
+        """
+        (pierwszy obiekt pasa, jego x w bieżącym ticku) dla każdego pasa
+        w trybie 'wrap' - drogi, potem rzeki (na wysokiej planszy według y).
+        """
+        if self.tall:
+            return [(group[0], predict_x(group[0].x, group[0].width, group[0].speed,
+                                         group[0].direction, self.tick - synced))
+                    for _, group, synced in self._lanes if group]
+        return [(group[0], group[0].x) for group in self._lane_groups if group]
+    
+    def occupancy_table(self) -> Optional[OccupancyTable]:
+        """
+        Tabela zajętości pasów dla bieżącego layout_version (liczona przy
+        pierwszym wywołaniu po zmianie) albo None w trybie 'stream'.
+        """
+        if self.traffic != "wrap":
+            return None
+        if self.occupancy is None or self.occupancy.version != self.layout_version:
+            # Pasy, których zmiana nie dotyczyła, przejmują dotychczasowe tabele
+            self.occupancy = OccupancyTable.from_world(self, self.occupancy)
+        return self.occupancy
+    
+    def in_water(self, y: float) -> bool:
+        """Czy rząd y to rzeka (bez kłody - utonięcie)."""
+        return y in self.water_rows
+    
+    def active_band(self) -> Tuple[float, float]:
+        """Zakres y (góra, dół) pasów symulowanych dokładnie - wokół żaby."""
+        margin = SCREEN_HEIGHT * self.VIEW_MARGIN
+        return self.frog.y - margin, self.frog.y + GRID_SIZE + margin
+    
+    def _lane_range(self, top: float, bottom: float) -> range:
+        """Indeksy pasów (w self._lanes) nachodzących na zakres y [top, bottom)."""
+        return range(bisect.bisect_left(self._lane_ys, top - GRID_SIZE + 1),
+                     bisect.bisect_left(self._lane_ys, bottom))
+    
+    def _catch_up(self, lane: list):
+        """Dogania pas, który nie był aktualizowany, do bieżącego ticka."""
+        ticks = self.tick - lane[2]
+        if ticks:
+            for entity in lane[1]:
+                entity.x = predict_x(entity.x, entity.width, entity.speed, entity.direction, ticks)
+            lane[2] = self.tick
+            self.lane_catchups += 1
+    
+    def entity_positions(self, top: float = None, bottom: float = None) -> List[Tuple[object, float]]:
+        """
+        Pary (obiekt, x w bieżącym ticku) dla pasów w zakresie y [top, bottom)
+        (domyślnie wszystkich). Na wysokiej planszy x pasów poza widokiem jest
+        przewidywany bez zmiany stanu świata - rysowanie i boty nie wpływają
+        na przebieg.
+        """
+        if not self.tall:
+            return [(entity, entity.x) for entity in self.vehicles + self.logs]
+        lanes = self._lanes
+        if top is not None:
+            lanes = [lanes[i] for i in self._lane_range(top, bottom)]
+        positions = []
+        for _, group, synced in lanes:
+            ticks = self.tick - synced
+            for entity in group:
+                positions.append((entity, predict_x(entity.x, entity.width, entity.speed,
+                                                    entity.direction, ticks)))
+        return positions
+    
+    def _step_lanes(self):
+        """Wysoka plansza: aktualizuje tylko pasy z active_band()."""
+        lanes = self._lanes
+        band = self._lane_range(*self.active_band())
+        for i in band:
+            lane = lanes[i]
+            self._catch_up(lane)
+            for entity in lane[1]:
+                entity.update()
+            lane[2] = self.tick + 1
+        self.lanes_updated = len(band)
+    
+    def move_frog(self, dx: int, dy: int):
+        """Przesuwa żabę (przed najbliższym step())."""
+        if not self.game_over:
+            self.frog.move(dx, dy)
+            self._move = (dx, dy)
+    
+    def step(self) -> List[Tuple[str, float, float]]:
+        """Wykonuje jeden tick symulacji i zwraca jego zdarzenia."""
+        self.events = []
+        if self.game_over:
+            return self.events
+        
+        if self.collision_mode == "table":
+            self.occupancy_table()
+        
+        if self.spawners:
+            for spawner in self.spawners:
+                if spawner.update():
+                    self.layout_version += 1
+        elif self.tall:
+            self._step_lanes()
+        else:
+            for vehicle in self.vehicles:
+                vehicle.update()
+            
+            for log in self.logs:
+                log.update()
+        
+        self.frog.update()
+        if self.collision_mode == "event":
+            self._step_collisions()
+        elif self.collision_mode == "table":
+            self._table_collisions()
+        else:
+            self.check_collisions()
+        if self.trajectory:
+            self.trajectory.record(self, self._move)
+        self._move = None
+        self.tick += 1
+        return self.events
+    
+    def _frog_center(self) -> Tuple[float, float]:
+        return (self.frog.x + self.frog.size // 2, self.frog.y + self.frog.size // 2)
+    
+    def _kill_frog(self, cause: str):
+        """Odbiera życie (cause: 'crash' lub 'splash')."""
+        self.events.append((cause, *self._frog_center()))
+        self.frog.reset()
+        if self.frog.lives <= 0:
+            self.game_over = True
+    
+    def _step_collisions(self):
+        """Kolizje w trybie 'event': pełne sprawdzenie tylko gdy trzeba."""
+        frog = self.frog
+        due = self._collision_queue and self._collision_queue[0][0] <= self.tick + 1
+        # Nowy obiekt strumienia nie ma zdarzenia w kolejce - przelicz po zmianie zbioru
+        if due or self._scheduled_at != (frog.x, frog.y, self.layout_version):
+            self.check_collisions()
+            if not self.game_over:
+                self._schedule_collisions()
+            return
+        
+        if self._carry:
+            frog.x = max(0, min(frog.x + self._carry, SCREEN_WIDTH - frog.size))
+            self._scheduled_at = (frog.x, frog.y, self.layout_version)
+    
+    def _schedule_collisions(self):
+        """
+        Wylicza ticki najbliższych zdarzeń dla obecnej pozycji żaby.
+        
+        Wołane zaraz po pełnym sprawdzeniu kolizji, gdy obiekty wykonały
+        już self.tick + 1 aktualizacji. Zdarzenie jest planowane tick
+        wcześniej niż wyliczone - to sprawdzenie zapasowe chroni przed
+        różnicą zaokrągleń między sumowaniem pozycji a predict_x.
+        """
+        frog = self.frog
+        now = self.tick + 1
+        queue = []
+        self._carry = 0.0
+        self._scheduled_at = (frog.x, frog.y, self.layout_version)
+        
+        fx, fy, size = int(frog.x), int(frog.y), frog.size
+        in_water = self.in_water(frog.y)
+        
+        if frog.y < GRID_SIZE:
+            queue.append((now + 1, 'goal', fy))
+        
+        vehicles, logs = self.vehicles, self.logs
+        if self._rows is not None:
+            vehicles, logs = self._rows.get(frog.y, ((), ()))
+        
+        # Pojazdy: najbliższy tick najechania na żabę, osobno dla każdego pasa
+        lanes = {}
+        for vehicle in vehicles:
+            if not (vehicle.y < fy + size and fy < vehicle.y + vehicle.height):
+                continue
+            if in_water:
+                # Żaba niesiona przez kłodę nie stoi w miejscu - sprawdzaj co tick
+                lanes[vehicle.y] = 1
+                continue
+            k = next_overlap_tick(vehicle.x, vehicle.width, vehicle.speed,
+                                  vehicle.direction, fx, fx + size)
+            if k is not None and k < lanes.get(vehicle.y, k + 1):
+                lanes[vehicle.y] = k
+        for lane_y, k in lanes.items():
+            queue.append((now + max(1, k - 1), 'crash', lane_y))
+        
+        if in_water:
+            carrier = None
+            for log in logs:
+                if (int(log.x) < fx + size and fx < int(log.x) + log.width
+                        and log.y < fy + size and fy < log.y + log.height):
+                    carrier = log
+                    break
+            
+            if carrier is None:
+                queue.append((now + 1, 'splash', fy))
+            else:
+                # Żaba i kłoda poruszają się razem, więc kontakt trwa do zawinięcia
+                # kłody albo dojścia żaby do krawędzi ekranu; przy zakładce poniżej
+                # 1 px obcięcie do int może go zerwać wcześniej - wtedy co tick
+                self._carry = velocity = carrier.speed * carrier.direction
+                lx = carrier.x + velocity  # Pozycja przy następnym sprawdzeniu
+                k = 1
+                if lx + carrier.width - frog.x > 1 and frog.x + size - lx > 1 and velocity:
+                    if velocity > 0:
+                        wrap = max(1, int((SCREEN_WIDTH - carrier.x) / carrier.speed) + 1)
+                        edge = int((SCREEN_WIDTH - size - frog.x) / velocity) + 1
+                    else:
+                        wrap = max(1, int((carrier.x + carrier.width) / carrier.speed) + 1)
+                        edge = int(frog.x / -velocity) + 1
+                    k = max(1, min(wrap, edge) - 1)
+                queue.append((now + k, 'log', carrier.y))
+        
+        heapq.heapify(queue)
+        self._collision_queue = queue
+    
+    def check_collisions(self):
+        """Sprawdza kolizje żaby."""
+        self.collision_checks += 1
+        frog_rect = self.frog.get_rect()
+        vehicles, logs = self.vehicles, self.logs
+        if self._rows is not None:
+            # Wysoka plansza: tylko pasy rzędu żaby (zawsze w active_band())
+            vehicles, logs = self._rows.get(self.frog.y, ((), ()))
+        
+        # Kolizja z pojazdami
+        for vehicle in vehicles:
+            if frog_rect.colliderect(vehicle.get_rect()):
+                self._kill_frog('crash')
+                return
+        
+        # Sprawdź czy żaba jest w wodzie
+        if self.in_water(self.frog.y):
+            on_log = False
+            for log in logs:
+                if frog_rect.colliderect(log.get_rect()):
+                    on_log = True
+                    # Przesuń żabę z kłodą
+                    self.frog.x += log.speed * log.direction
+                    # Ogranicz pozycję żaby
+                    self.frog.x = max(0, min(self.frog.x, SCREEN_WIDTH - self.frog.size))
+                    break
+            
+            if not on_log:
+                self._kill_frog('splash')
+                return
+        
+        self._check_goal()
+    
+    def _table_collisions(self):
+        """Kolizje w trybie 'table': odczyt z OccupancyTable zamiast prostokątów."""
+        self.collision_checks += 1
+        frog = self.frog
+        tick = self.tick + 1  # Obiekty wykonały już aktualizację tego ticka
+        if self.in_water(frog.y):
+            log = self.occupancy.log_at(frog.x, frog.y, frog.size, tick)
+            if log is None:
+                self._kill_frog('splash')
+                return
+            frog.x = max(0, min(frog.x + log[1], SCREEN_WIDTH - frog.size))
+        elif self.occupancy.overlap(frog.x, frog.y, frog.size, tick) is not None:
+            self._kill_frog('crash')
+            return
+        
+        self._check_goal()
+    
+    def _check_goal(self):
+        """Sprawdza osiągnięcie mety."""
+        if self.frog.y < GRID_SIZE:
+            self.frog.score += 100
+            self.events.append(('goal', *self._frog_center()))
+            self.frog.x = self.frog.start_x
+            self.frog.y = self.frog.start_y
+            if self.progression:
+                self.set_level(self.level + 1)
+    
+    # --- Migawki stanu (przeszukiwanie drzewa, analiza "co jeśli") ---
+    
+    SNAPSHOT_HEADER = 15  # Pola przed pozycjami obiektów, patrz snapshot()
+    
+    def snapshot(self) -> array.array:
+        """
+        Stan dynamiczny świata jako płaski bufor array('d'):
+        [rodowód (nowy przy utworzeniu świata i każdej zmianie poziomu -
+        ten sam rodowód i tick oznaczają te same prędkości i pozycje pasów), tick, poziom, layout_version, game_over, ruch w ticku
+        (jest, dx, dy), żaba (x, y, życia, wynik, kierunek, faza skoku,
+        wysokość skoku)], x każdego obiektu (pojazdy, potem kłody),
+        prędkość każdego pasa i - na wysokiej planszy - tick ostatniej
+        aktualizacji każdego pasa.
+        
+        Układ pasów, kolory i słoje kłód są stałe w trakcie gry, więc nie
+        trafiają do bufora. Kopia migawki to kopia jednego bufora liczb
+        (bytes(), array.array(...)), a restore() wpisuje ją z powrotem do
+        istniejących obiektów bez alokacji - w pętli przeszukiwania jeden
+        świat wystarcza do sprawdzenia dowolnie wielu gałęzi. Tylko ruch
+        'wrap' (w trybie 'stream' zbiór obiektów się zmienia).
+        """
+        if self.traffic != "wrap":
+            raise ValueError("snapshot() requires traffic='wrap'")
+        frog = self.frog
+        move = self._move
+        values = [self._lineage, self.tick, self.level, self.layout_version, self.game_over,
+                  move is not None, *(move or (0, 0)),
+                  frog.x, frog.y, frog.lives, frog.score, Frog.DIRECTIONS.index(frog.direction),
+                  frog.hop_animation, frog.hop_height]
+        values += [entity.x for entity in self.vehicles]
+        values += [entity.x for entity in self.logs]
+        values += [group[0].speed if group else 0.0 for group in self._lane_groups]
+        if self.tall:
+            values += [lane[2] for lane in self._lanes]
+        return array.array('d', values)
+    
+    def restore(self, snapshot: array.array):
+        """
+        Przywraca stan z snapshot() tego świata, jego forka albo świata
+        o tym samym układzie (ziarno, pasy, wysokość, tryb ruchu).
+        
+        Dalszy przebieg jest identyczny jak po chwili zrobienia migawki.
+        Kolejka trybu 'event' jest liczona od nowa przy najbliższym ticku,
+        a tabela zajętości odrzucana, jeśli nie pasuje do przywróconego
+        stanu. Zapis przebiegu (trajectory) i liczniki nie są cofane.
+        """
+        vehicles, logs = self.vehicles, self.logs
+        count = len(vehicles) + len(logs)
+        size = self.SNAPSHOT_HEADER + count + len(self._lane_groups) + len(self._lanes)
+        if self.traffic != "wrap" or len(snapshot) != size:
+            raise ValueError("Snapshot does not match this world's layout")
+        (lineage, tick, level, version, over, moved, dx, dy,
+         x, y, lives, score, direction, hop, height) = snapshot[:self.SNAPSHOT_HEADER]
+        self.tick = int(tick)
+        self.level = int(level)
+        self.game_over = bool(over)
+        self._move = (int(dx), int(dy)) if moved else None
+        frog = self.frog
+        frog.x = x
+        frog.y = int(y)
+        frog.lives, frog.score = int(lives), int(score)
+        frog.direction = Frog.DIRECTIONS[int(direction)]
+        frog.hop_animation, frog.hop_height = int(hop), int(height)
+        
+        start = self.SNAPSHOT_HEADER
+        for entity, x in zip(vehicles, snapshot[start:start + len(vehicles)]):
+            entity.x = x
+        start += len(vehicles)
+        for entity, x in zip(logs, snapshot[start:start + len(logs)]):
+            entity.x = x
+        start += len(logs)
+        # Prędkości zmienia tylko set_level(), który zmienia też rodowód
+        if lineage != self._lineage:
+            for group, speed in zip(self._lane_groups, snapshot[start:start + len(self._lane_groups)]):
+                for entity in group:
+                    entity.speed = speed
+        self.layout_version = int(version)
+        if self.tall:
+            for lane, synced in zip(self._lanes, snapshot[start + len(self._lane_groups):]):
+                lane[2] = int(synced)
+        
+        # Tabela zajętości innego rodowodu albo zbudowana później niż
+        # przywrócony tick nie opisuje tego stanu
+        if self.occupancy is not None and (lineage != self._lineage
+                                           or self.occupancy.base_tick > self.tick):
+            self.occupancy = None
+        self._lineage = lineage
+        self._collision_queue = []
+        self._scheduled_at = None
+        self._carry = 0.0
+        self.events = []
+    
+    def fork(self) -> 'World':
+        """
+        Niezależna kopia świata w bieżącym stanie: własna żaba, obiekty
+        i pasy, wspólne dane stałe (układ pasów, słoje kłód, tabela
+        zajętości). Dużo tańsza niż copy.deepcopy(); do wielu gałęzi
+        z jednego stanu taniej jest jednak restore() do kilku forków.
+        Kopia nie zapisuje przebiegu (trajectory = None).
+        """
+        if self.traffic != "wrap":
+            raise ValueError("fork() requires traffic='wrap'")
+        clone = copy.copy(self)
+        clone.frog = _shallow_copy(self.frog)
+        copies = {}
+        for entity in self.vehicles + self.logs:
+            copies[id(entity)] = _shallow_copy(entity)
+        clone.vehicles = [copies[id(entity)] for entity in self.vehicles]
+        clone.logs = [copies[id(entity)] for entity in self.logs]
+        clone._lane_groups = [[copies[id(entity)] for entity in group] for group in self._lane_groups]
+        if self.tall:
+            clone._lanes = [[y, [copies[id(entity)] for entity in group], synced]
+                            for y, group, synced in self._lanes]
+            clone._rows = {y: ([copies[id(entity)] for entity in vehicles],
+                               [copies[id(entity)] for entity in logs])
+                           for y, (vehicles, logs) in self._rows.items()}
+        clone.events = list(self.events)
+        clone._collision_queue = list(self._collision_queue)
+        clone.trajectory = None
+        return clone
+
+
+class GameState(NamedTuple):
+    """Stan gry odczytany z kodu StateCodec (wartości skwantowane)."""
+    col: int              # Kolumna siatki środka żaby
+    row: int              # Rząd siatki żaby
+    lives: int
+    level: int
+    score: int            # Kubełek wyniku: score // SCORE_BUCKET (obcięty)
+    phases: tuple         # Faza każdego pasa: 0..phase_steps-1
+
+
+class StateCodec:
+    """
+    Zwarte kodowanie stanu gry w jednej liczbie całkowitej (bitboard).
+    
+    Pola od najmłodszych bitów: kolumna i rząd żaby, życia, poziom, kubełek
+    wyniku, a potem faza każdego pasa - położenie pierwszego obiektu pasa
+    na jego drodze od wjazdu do zawinięcia, skwantowane do phase_bits bitów.
+    Szerokości pól wynikają z układu świata (liczba kolumn, rzędów i pasów),
+    więc kodek jest tworzony raz dla danego układu i koduje dowolny świat
+    o tym samym układzie (np. kolejne stany jednej gry, stany wielu gier).
+    
+    Kod to zwykły int: hash() i == działają od razu (tablice transpozycji,
+    zbiory stanów), pack()/unpack() dają stałą liczbę bajtów do zapisu.
+    Stany różniące się mniej niż krokiem kwantyzacji mają ten sam kod.
+    Tylko ruch 'wrap' - w trybie 'stream' pas nie ma stałej fazy.
+    """
+    
+    LIVES_BITS = 2
+    LEVEL_BITS = 4
+    SCORE_BITS = 8
+    SCORE_BUCKET = 100   # Punkty na kubełek wyniku (meta = 100)
+    
+    def __init__(self, world: World, phase_bits: int = 5):
+        if world.traffic != "wrap":
+            raise ValueError("StateCodec requires traffic='wrap'")
+        self.phase_bits = phase_bits
+        self.phase_steps = 1 << phase_bits
+        self.columns = SCREEN_WIDTH // GRID_SIZE
+        self.rows = world.height // GRID_SIZE
+        # Pasy: (szerokość, kierunek, droga od wjazdu do zawinięcia); faza
+        # to int((offset + kierunek * x) * scale) - przebyta część drogi
+        self.lanes = [(entity.width, entity.direction, SCREEN_WIDTH + entity.width)
+                      for entity, _ in world.lane_heads()]
+        self._phase = [(direction, width if direction > 0 else SCREEN_WIDTH, self.phase_steps / span)
+                       for width, direction, span in self.lanes]
+        
+        self.fields = [('col', (self.columns - 1).bit_length()),
+                       ('row', (self.rows - 1).bit_length()),
+                       ('lives', self.LIVES_BITS), ('level', self.LEVEL_BITS),
+                       ('score', self.SCORE_BITS)]
+        self._shifts = []
+        shift = 0
+        for _, bits in self.fields:
+            self._shifts.append(shift)
+            shift += bits
+        self.phase_shift = shift
+        self.bits = shift + phase_bits * len(self.lanes)
+        self.size = (self.bits + 7) // 8
+    
+    def encode(self, world: World) -> int:
+        """Kod bieżącego stanu świata."""
+        frog = world.frog
+        if world.tall:
+            xs = [x for _, x in world.lane_heads()]
+        else:
+            xs = [entity.x for entity in world.lane_objects()]
+        top = self.phase_steps - 1
+        bits = self.phase_bits
+        code = 0
+        shift = self.phase_shift
+        for x, (direction, offset, scale) in zip(xs, self._phase):
+            phase = int((offset + direction * x) * scale)
+            code |= (top if phase > top else phase if phase > 0 else 0) << shift
+            shift += bits
+        
+        col_shift, row_shift, lives_shift, level_shift, score_shift = self._shifts
+        return (code
+                | min(self.columns - 1, int(frog.x + frog.size // 2) // GRID_SIZE) << col_shift
+                | int(frog.y) // GRID_SIZE << row_shift
+                | min(frog.lives, (1 << self.LIVES_BITS) - 1) << lives_shift
+                | min(world.level, (1 << self.LEVEL_BITS) - 1) << level_shift
+                | min(frog.score // self.SCORE_BUCKET, (1 << self.SCORE_BITS) - 1) << score_shift)
+    
+    def decode(self, code: int) -> GameState:
+        """Pola stanu z kodu."""
+        values = []
+        for (_, bits), shift in zip(self.fields, self._shifts):
+            values.append(code >> shift & ((1 << bits) - 1))
+        mask = self.phase_steps - 1
+        code >>= self.phase_shift
+        phases = []
+        for _ in self.lanes:
+            phases.append(code & mask)
+            code >>= self.phase_bits
+        return GameState(*values, tuple(phases))
+    
+    def encode_state(self, state: GameState) -> int:
+        """Kod z pól stanu (odwrotność decode())."""
+        code = 0
+        for phase in reversed(state.phases):
+            code = (code << self.phase_bits) | phase
+        code <<= self.phase_shift
+        for value, shift in zip(state[:len(self.fields)], self._shifts):
+            code |= value << shift
+        return code
+    
+    def pack(self, code: int) -> bytes:
+        """Kod jako `size` bajtów (little-endian) - do zapisu zbiorów stanów."""
+        return code.to_bytes(self.size, 'little')
+    
+    def unpack(self, data: bytes) -> int:
+        return int.from_bytes(data, 'little')
+
+
+class RandomAgent:
+    """Agent losowy: co AGENT_MOVE_INTERVAL ticków skacze, najczęściej do przodu."""
+    
+    MOVES = [(0, -1)] * 5 + [(-1, 0), (1, 0), (0, 1)] + [None] * 2
+    
+    def __init__(self, seed: int = None):
+        self.rng = random.Random(seed)
+    
+    def act(self, world: World) -> Optional[Tuple[int, int]]:
+        """Zwraca ruch (dx, dy) albo None."""
+        if world.tick % AGENT_MOVE_INTERVAL:
+            return None
+        return self.rng.choice(self.MOVES)
+
+
+class GreedyAgent:
+    """
+    Prosty agent skryptowany.
+    
+    Skacze do przodu, jeśli pole docelowe będzie bezpieczne przez najbliższy
+    odstęp decyzyjny (pozycje obiektów przewidywane liniowo), w przeciwnym
+    razie czeka, a gdy stanie w miejscu też grozi śmiercią - ucieka w bok
+    lub do tyłu.
+    """
+    
+    CANDIDATES = [(0, -1), (0, 0), (-1, 0), (1, 0), (0, 1)]
+    
+    def __init__(self, seed: int = None):
+        self.rng = random.Random(seed)
+    
+    def act(self, world: World) -> Optional[Tuple[int, int]]:
+        """Zwraca ruch (dx, dy) albo None."""
+        if world.tick % AGENT_MOVE_INTERVAL:
+            return None
+        for dx, dy in self.CANDIDATES:
+            if self._safe(world, dx, dy):
+                return (dx, dy) if (dx or dy) else None
+        return (0, 1)
+    
+    def _safe(self, world: World, dx: int, dy: int) -> bool:
+        frog = world.frog
+        x = max(0, min(frog.x + dx * GRID_SIZE, SCREEN_WIDTH - frog.size))
+        y = max(0, min(frog.y + dy * GRID_SIZE, frog.max_y))
+        
+        for ahead in range(1, AGENT_MOVE_INTERVAL + 2):
+            frog_rect = pygame.Rect(x, y, frog.size, frog.size)
+            for vehicle in world.vehicles:
+                if abs(vehicle.y - y) < frog.size:
+                    moved = vehicle.get_rect().move(vehicle.speed * vehicle.direction * ahead, 0)
+                    if frog_rect.colliderect(moved):
+                        return False
+            
+            if world.in_water(y):
+                carrier = None
+                for log in world.logs:
+                    moved = log.get_rect().move(log.speed * log.direction * ahead, 0)
+                    if frog_rect.colliderect(moved):
+                        carrier = log
+                        break
+                if carrier is None:
+                    return False
+                # Żaba płynie razem z kłodą
+                x = max(0, min(x + carrier.speed * carrier.direction, SCREEN_WIDTH - frog.size))
+        return True
+
+
+class PlannerAgent:
+    """
+    Autopilot planujący bezpieczną ścieżkę w siatce (pozycja × tick).
+    
+    Pozycje pojazdów i kłód są odczytywane z okresowych tabel pasów
+    (OccupancyTable, ruch 'wrap') albo przewidywane analitycznie (predict_x,
+    ruch 'stream') od stanu bazowego zapamiętanego przy pierwszym
+    planowaniu, a wynik
+    sprawdzenia "czy żaba w (x, y) przeżyje tick T" oraz ślepe zaułki są
+    memoizowane, więc kolejne plany korzystają z już policzonych komórek.
+    Plan jest liczony raz na przejście i potem tylko odtwarzany - ponownie
+    dopiero gdy stan żaby odbiegnie od przewidywanego (śmierć, meta,
+    zmiana pasów).
+    
+    Sprawdzenia kolizji odtwarzają World.check_collisions (prostokąty
+    pygame obcinają współrzędne do liczb całkowitych).
+    """
+    
+    HORIZON = 120            # Maksymalna liczba decyzji w planie
+    EXPANSION_LIMIT = 4000   # Maksymalna liczba rozwiniętych stanów na plan
+    TALL_EXPANSION_LIMIT = 500  # To samo na wysokiej planszy (plan co odcinek ruchu)
+    MEMO_LIMIT = 200000
+    MOVES = [(0, -1), (-1, 0), (1, 0), (0, 0), (0, 1)]  # Kolejność prób w DFS
+    # Wysoka plansza: najpierw czekanie - plan kończy się za najbliższym
+    # pasem ruchu, a przejście rzeki zwykle wymaga przeczekania kłody
+    TALL_MOVES = [(0, -1), (0, 0), (-1, 0), (1, 0), (0, 1)]
+    
+    def __init__(self, seed: int = None, interval: int = AGENT_MOVE_INTERVAL):
+        self.interval = interval
+        self.plan = []          # Lista (tick, ruch, oczekiwany stan (x, y) przed ruchem)
+        self.plans = 0          # Liczba przeliczonych planów
+        self._world = None
+        self._base_tick = 0
+        self._base = []         # (obiekt, x w ticku bazowym, indeks w rzędzie)
+        self._rows = {}         # y -> lista (x0, width, speed, direction)
+        self._table = None      # OccupancyTable z self._rows (ruch 'wrap')
+        self._water = frozenset()  # Rzędy rzeki (World.water_rows)
+        self._max_y = SCREEN_HEIGHT - GRID_SIZE
+        self._subgoal = 0       # Wysoka plansza: rząd, powyżej którego plan się kończy
+        self._moves = self.MOVES
+        self._limit = self.EXPANSION_LIMIT
+        self._wraps = True      # False dla World(traffic='stream') - obiekty znikają
+        self._memo = {}
+        self._dead = set()      # Stany (x, y, tick) bez bezpiecznego ruchu
+    
+    # --- Przewidywanie świata ---------------------------------------------
+    
+    def _sync(self, world: World):
+        """Zapamiętuje stan bazowy pasów, chyba że przewidywania nadal się zgadzają."""
+        # Wysoka plansza: tylko pasy wokół żaby - dalsze dochodzą (i wymuszają
+        # nowy plan) dopiero, gdy żaba się do nich zbliży
+        positions = world.entity_positions(*world.active_band()) if world.tall else world.entity_positions()
+        ticks = world.tick - self._base_tick
+        table = self._table
+        if (self._world is world and len(self._base) == len(positions) and all(
+                entity is base_entity and x == (
+                    table.positions(entity.y, world.tick)[i] if table else
+                    predict_x(x0, entity.width, entity.speed, entity.direction, ticks))
+                for (entity, x), (base_entity, x0, i) in zip(positions, self._base))):
+            return
+        
+        same_world = self._world is world
+        plan = self.plan
+        
+        self._world = world
+        self._wraps = world.traffic == "wrap"
+        self._water = world.water_rows
+        self._max_y = world.frog.max_y
+        self._base_tick = world.tick
+        self._base = []
+        self._rows = {}
+        for entity, x in positions:
+            row = self._rows.setdefault(entity.y, [])
+            self._base.append((entity, x, len(row)))
+            row.append((x, entity.width, entity.speed, entity.direction))
+        self._table = None
+        if self._wraps and not world.tall:
+            self._table = world.occupancy_table()  # Wspólna ze światem (tryb 'table')
+        elif self._wraps:
+            # Tylko pasy wokół żaby; tabele pasów, które się nie zmieniły,
+            # przechodzą do nowej
+            self._table = OccupancyTable(self._rows, self._water, world.tick,
+                                         previous=table if same_world else None)
+        else:
+            # Przyszłe wjazdy są znane z góry - planuj także z nimi
+            for y, x, width, speed, direction in world.upcoming_entities(self.HORIZON * self.interval):
+                self._rows.setdefault(y, []).append((x, width, speed, direction))
+        self._memo = {}
+        self._dead = set()
+        self.plan = []
+        
+        # W trybie 'stream' zbiór obiektów zmienia się przy każdym wjeździe,
+        # zwykle daleko od żaby - plan zostaje, jeśli nadal jest bezpieczny
+        if same_world and not self._wraps and plan and self._plan_holds(world, plan):
+            self.plan = plan
+    
+    def _plan_holds(self, world: World, plan: list) -> bool:
+        """Sprawdza plan na nowo przewidzianych pasach."""
+        size = world.frog.size
+        x, y = world.frog.x, world.frog.y
+        for tick in range(world.tick + 1, plan[0][0] + 1):
+            x = self._survive(x, y, tick, size)
+            if x is None:
+                return False
+        
+        for tick, move, expected in plan:
+            if (x, y) != expected:
+                return False
+            outcome, state = self._expand(x, y, tick, move, size)
+            if outcome == 'dead':
+                return False
+            if outcome == 'goal':
+                return True
+            x, y = state
+        return True
+    
+    def _survive(self, x: float, y: int, tick: int, size: int) -> Optional[float]:
+        """
+        Sprawdza kolizje żaby w (x, y) z obiektami po `tick` aktualizacjach świata.
+        
+        Returns:
+            Nowa pozycja X (po przesunięciu przez kłodę) albo None przy śmierci
+        """
+        key = (x, y, tick)
+        if key in self._memo:
+            return self._memo[key]
+        if len(self._memo) > self.MEMO_LIMIT:
+            self._memo.clear()
+        
+        water = y in self._water
+        if self._table is not None:
+            if water:
+                log = self._table.log_at(x, y, size, tick)
+                result = None if log is None else max(0, min(x + log[1], SCREEN_WIDTH - size))
+            else:
+                result = None if self._table.overlap(x, y, size, tick) is not None else x
+            self._memo[key] = result
+            return result
+        
+        fx = int(x)
+        ticks = tick - self._base_tick
+        result = None if water else x
+        
+        for x0, width, speed, direction in self._rows.get(y, ()):
+            if self._wraps:
+                ex = int(predict_x(x0, width, speed, direction, ticks))
+            else:
+                # Strumień: obiekt istnieje od wjazdu do wyjazdu z ekranu
+                px = x0 + speed * direction * ticks
+                if not -width <= px <= SCREEN_WIDTH:
+                    continue
+                ex = int(px)
+            if ex < fx + size and fx < ex + width:
+                if water:
+                    result = max(0, min(x + speed * direction, SCREEN_WIDTH - size))
+                else:
+                    result = None
+                break
+        
+        self._memo[key] = result
+        return result
+    
+    # --- Planowanie -------------------------------------------------------
+    
+    def _expand(self, x: float, y: int, tick: int, move: Tuple[int, int], size: int):
+        """
+        Stosuje ruch przed tickiem `tick` i symuluje `interval` ticków.
+        
+        Returns:
+            ('goal', None), ('alive', (x, y)) albo ('dead', None)
+        """
+        dx, dy = move
+        x = max(0, min(x + dx * GRID_SIZE, SCREEN_WIDTH - size))
+        y = max(0, min(y + dy * GRID_SIZE, self._max_y))
+        for step in range(1, self.interval + 1):
+            x = self._survive(x, y, tick + step, size)
+            if x is None:
+                return 'dead', None
+            if y < GRID_SIZE:
+                return 'goal', None
+        if y < self._subgoal:
+            return 'goal', None  # Koniec odcinka planu - dalej nowy plan
+        return 'alive', (x, y)
+    
+    def _build_plan(self, world: World):
+        """
+        Przeszukiwanie w głąb (najpierw skok do przodu) aż do mety.
+        
+        Stany (x, y, tick), z których nie da się przeżyć, trafiają do
+        pamięci ślepych zaułków i nie są rozwijane ponownie - ani w tym,
+        ani w kolejnych planach. Jeśli meta jest poza horyzontem lub
+        limitem rozwinięć, plan prowadzi do najdłużej przeżywającego stanu.
+        Na wysokiej planszy celem jest pierwszy rząd bez ruchu za najbliższą
+        drogą lub rzeką (patrz _next_subgoal), a limit rozwinięć jest
+        mniejszy - koszt planu nie zależy od wysokości planszy.
+        """
+        self.plans += 1
+        self._subgoal = self._next_subgoal(world) if world.tall else 0
+        self._moves = self.TALL_MOVES if world.tall else self.MOVES
+        self._limit = self.TALL_EXPANSION_LIMIT if world.tall else self.EXPANSION_LIMIT
+        self._expansions = 0
+        self._visited = set()
+        self._longest = []
+        start = (world.frog.x, world.frog.y)
+        moves = self._search(start[0], start[1], world.tick, 0, world.frog.size, [])
+        if moves is None:
+            moves = self._longest or [(0, 1)]  # Brak ratunku - spróbuj cofnąć się
+        
+        plan = []
+        x, y = start
+        for i, move in enumerate(moves):
+            tick = world.tick + i * self.interval
+            plan.append((tick, move, (x, y)))
+            _, state = self._expand(x, y, tick, move, world.frog.size)
+            if state is None:
+                break
+            x, y = state
+        self.plan = plan
+    
+    def _next_subgoal(self, world: World) -> int:
+        """
+        Wysoka plansza: y, powyżej którego plan się kończy - rząd bez ruchu
+        nad najbliższym ciągiem pasów ponad żabą (najdalej odcinek wyżej;
+        dalsze pasy nie są jeszcze znane - patrz _sync).
+        """
+        y = world.frog.y - GRID_SIZE
+        while y >= GRID_SIZE and y not in self._rows:
+            y -= GRID_SIZE
+        while y >= GRID_SIZE and y in self._rows:
+            y -= GRID_SIZE
+        return max(y + GRID_SIZE, world.frog.y - LEVEL_SECTION + GRID_SIZE)
+    
+    def _search(self, x: float, y: int, tick: int, depth: int, size: int,
+                path: List[Tuple[int, int]]) -> Optional[List[Tuple[int, int]]]:
+        """Zwraca listę ruchów prowadzącą do mety albo None."""
+        key = (x, y, tick)
+        if key in self._dead or key in self._visited:
+            return None
+        self._visited.add(key)
+        if len(path) > len(self._longest):
+            self._longest = list(path)
+        if depth >= self.HORIZON or self._expansions >= self._limit:
+            return None
+        self._expansions += 1
+        
+        survivable = False
+        for move in self._moves:
+            outcome, state = self._expand(x, y, tick, move, size)
+            if outcome == 'goal':
+                return path + [move]
+            if outcome == 'alive':
+                survivable = True
+                found = self._search(state[0], state[1], tick + self.interval,
+                                     depth + 1, size, path + [move])
+                if found is not None:
+                    return found
+        
+        if not survivable:
+            if len(self._dead) > self.MEMO_LIMIT:
+                self._dead.clear()
+            self._dead.add(key)
+        return None
+    
+    def act(self, world: World) -> Optional[Tuple[int, int]]:
+        """Zwraca ruch (dx, dy) albo None."""
+        while self.plan and self.plan[0][0] < world.tick:
+            self.plan.pop(0)
+        if self.plan and self.plan[0][0] > world.tick:
+            return None
+        
+        self._sync(world)
+        if not self.plan or self.plan[0][2] != (world.frog.x, world.frog.y):
+            self._build_plan(world)
+        
+        _, move, _ = self.plan.pop(0)
+        return move if move != (0, 0) else None
+
+
+# Agenci dostępni dla symulacji headless (np. tools/tune_balance.py)
+AGENTS = {'random': RandomAgent, 'greedy': GreedyAgent, 'planner': PlannerAgent}
+
+
+def simulate_game(agent, seed: int = None, max_ticks: int = FPS * 300, **world_options) -> Dict:
+    """
+    Rozgrywa jedną grę bez renderowania.
+    
+    Args:
+        agent: Obiekt z metodą act(world) -> (dx, dy) lub None
+        seed: Ziarno świata
+        max_ticks: Limit długości gry (gra przerwana nie jest game over)
+        **world_options: Parametry przekazywane do World (pasy, liczby obiektów)
+    
+    Returns:
+        Słownik z wynikiem, długością gry, tickami utraty żyć
+        i czasami przejść (w tickach)
+    """
+    world = World(seed, **world_options)
+    deaths = []
+    crossings = []
+    attempt_start = 0
+    
+    while not world.game_over and world.tick < max_ticks:
+        move = agent.act(world)
+        if move:
+            world.move_frog(*move)
+        for kind, _, _ in world.step():
+            if kind == 'goal':
+                crossings.append(world.tick - attempt_start)
+            else:
+                deaths.append(world.tick)
+            attempt_start = world.tick
+    
+    return {
+        'seed': world.seed,
+        'score': world.frog.score,
+        'ticks': world.tick,
+        'game_over': world.game_over,
+        'deaths': deaths,
+        'crossings': crossings,
+    }
+
+
+class Replay:
+    """
+    Zapis rozgrywki: ziarno losowania i ruchy żaby z numerami ticków.
+    
+    Symulacja jest deterministyczna dla danego ziarna, więc ruchy wystarczą
+    do odtworzenia całej gry (np. do eksportu wideo przez FrameCapture).
+    
+    Format pliku (JSON):
+    {
+        "version": 1,
+        "seed": 123456,
+        "traffic": "wrap",
+        "difficulty": "normal",
+        "screens": 1,
+        "collisions": "poll",
+        "moves": [[tick, dx, dy], ...]
+    }
+    
+    Pola "traffic" (tryb ruchu World), "difficulty" (poziomy), "screens"
+    (wysokość planszy, tall_level) i "collisions" (tryb kolizji World) są
+    opcjonalne - starsze pliki to zawsze 'wrap', stałe pasy (null), jeden
+    ekran i 'poll'.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, seed: int, moves: List[Tuple[int, int, int]] = None,
+                 traffic: str = "wrap", difficulty: str = None, screens: int = 1,
+                 collision_mode: str = "poll"):
+        self.seed = seed
+        self.moves = moves if moves is not None else []
+        self.traffic = traffic
+        self.difficulty = difficulty
+        self.screens = screens
+        self.collision_mode = collision_mode
+    
+    def record(self, tick: int, dx: int, dy: int):
+        """Dodaje ruch wykonany przed aktualizacją o numerze `tick`."""
+        self.moves.append((tick, dx, dy))
+    
+    def moves_by_tick(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Grupuje ruchy według numeru ticka."""
+        grouped = {}
+        for tick, dx, dy in self.moves:
+            grouped.setdefault(tick, []).append((dx, dy))
+        return grouped
+    
+    @property
+    def length(self) -> int:
+        """Numer ticka ostatniego ruchu."""
+        return self.moves[-1][0] if self.moves else 0
+    
+    def save(self, path: Path):
+        """Zapisuje replay do pliku JSON."""
+        data = {'version': self.VERSION, 'seed': self.seed, 'traffic': self.traffic,
+                'difficulty': self.difficulty, 'screens': self.screens,
+                'collisions': self.collision_mode, 'moves': [list(move) for move in self.moves]}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    
+    @classmethod
+    def load(cls, path: Path) -> 'Replay':
+        """Wczytuje replay z pliku JSON."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        return cls(data['seed'], [tuple(move) for move in data['moves']],
+                   data.get('traffic', "wrap"), data.get('difficulty'), data.get('screens', 1),
+                   data.get('collisions', "poll"))
+
+
+class FrameCapture:
+    """
+    Przechwytywanie klatek do sekwencji PNG, surowego pliku RGB lub potoku.
+    
+    Klatki są kopiowane do puli wielokrotnie używanych buforów, a zapis
+    odbywa się w wątku w tle, więc pętla gry nigdy nie czeka na dysk ani
+    enkoder. Gdy wszystkie bufory są zajęte, klatka jest pomijana
+    (licznik `dropped`) zamiast blokować grę.
+    
+    Formaty:
+        png  - target to katalog, pliki frame_000000.png, ...
+        raw  - target to plik z kolejnymi klatkami RGB24 (width*height*3 B)
+        pipe - `command` dostaje surowe klatki RGB24 na stdin, np.
+               "ffmpeg -y -f rawvideo -pix_fmt rgb24 -s {width}x{height}
+                -r {fps} -i - out.mp4"
+    
+    Z NumPy klatki są kopiowane z widoku surfarray (bez alokacji), bez niego
+    przez pygame.image.tobytes. Przy eksporcie offline (drop_frames=False)
+    capture() czeka na wolny bufor zamiast pomijać klatkę.
+    """
+    
+    FORMATS = ("png", "raw", "pipe")
+    
+    def __init__(self, target: Path = None, fmt: str = "png", size: Tuple[int, int] = None,
+                 command: str = None, every: int = 1, buffers: int = 8,
+                 drop_frames: bool = True):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown capture format: {fmt}")
+        if fmt == "pipe" and not command:
+            raise ValueError("Capture format 'pipe' requires a command")
+        if fmt != "pipe" and target is None:
+            raise ValueError(f"Capture format '{fmt}' requires a target path")
+        
+        self.target = Path(target) if target is not None else None
+        self.fmt = fmt
+        self.size = size or (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.command = command
+        self.every = max(1, every)
+        self.drop_frames = drop_frames
+        
+        self.offered = 0   # Klatki przekazane do capture()
+        self.captured = 0  # Klatki skopiowane do bufora
+        self.written = 0   # Klatki zapisane przez wątek
+        self.dropped = 0   # Klatki pominięte (brak wolnego bufora)
+        self.error = None
+        
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        self._numpy = numpy
+        
+        # Pula buforów i kolejki wymiany z wątkiem zapisu
+        width, height = self.size
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for _ in range(max(2, buffers)):
+            if numpy is not None:
+                self._free.put(numpy.empty((height, width, 3), dtype=numpy.uint8))
+            else:
+                self._free.put(bytearray(width * height * 3))
+        self._scaled = None  # Powierzchnia pomocnicza przy skalowaniu
+        
+        self._file = None
+        self._process = None
+        self._thread = None
+    
+    def start(self):
+        """Otwiera cel zapisu i uruchamia wątek w tle."""
+        if self.fmt == "png":
+            self.target.mkdir(parents=True, exist_ok=True)
+        elif self.fmt == "raw":
+            self.target.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.target, 'wb')
+        else:
+            width, height = self.size
+            cmd = self.command.format(width=width, height=height, fps=FPS // self.every)
+            self._process = subprocess.Popen(shlex.split(cmd), stdin=subprocess.PIPE)
+        
+        self._thread = threading.Thread(target=self._writer, name="FrameCapture", daemon=True)
+        self._thread.start()
+        return self
+    
+    def capture(self, surface: pygame.Surface) -> bool:
+        """Kopiuje bieżącą klatkę do bufora. Zwraca False jeśli pominięto."""
+        self.offered += 1
+        if self._thread is None or self.error is not None:
+            return False
+        if (self.offered - 1) % self.every:
+            return False
+        
+        try:
+            buffer = self._free.get(block=not self.drop_frames)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        
+        if surface.get_size() != self.size:
+            if self._scaled is None:
+                self._scaled = pygame.Surface(self.size)
+            pygame.transform.scale(surface, self.size, self._scaled)
+            surface = self._scaled
+        
+        if self._numpy is not None and surface.get_bitsize() in (24, 32):
+            view = pygame.surfarray.pixels3d(surface)
+            self._numpy.copyto(buffer, view.transpose(1, 0, 2))
+            del view  # Odblokuj powierzchnię
+        else:
+            buffer[:] = pygame.image.tobytes(surface, "RGB")
+        
+        self._filled.put((self.captured, buffer))
+        self.captured += 1
+        return True
+    
+    def _writer(self):
+        """Wątek zapisu - zwraca bufory do puli po zapisaniu klatki."""
+        while True:
+            item = self._filled.get()
+            if item is None:
+                break
+            index, buffer = item
+            try:
+                if self.error is None:
+                    self._write(index, buffer)
+                    self.written += 1
+            except Exception as e:
+                self.error = e
+                print(f"Error writing captured frame: {e}")
+            finally:
+                self._free.put(buffer)
+    
+    def _write(self, index: int, buffer):
+        if self.fmt == "png":
+            frame = pygame.image.frombuffer(buffer, self.size, "RGB")
+            pygame.image.save(frame, str(self.target / f"frame_{index:06d}.png"))
+        elif self.fmt == "raw":
+            self._file.write(buffer)
+        else:
+            self._process.stdin.write(buffer)
+    
+    def close(self):
+        """Czeka na zapis zaległych klatek i zamyka cel."""
+        if self._thread is None:
+            return
+        self._filled.put(None)
+        self._thread.join()
+        self._thread = None
+        
+        if self._file:
+            self._file.close()
+        if self._process:
+            self._process.stdin.close()
+            self._process.wait()
+        
+        print(f"Capture finished: {self.written} frames written, "
+              f"{self.dropped} dropped ({self.target or self.command})")
+
+
+class ObservationRenderer:
+    """
+    Obserwacje pikselowe świata jako tablice NumPy uint8 (wymaga numpy).
+    
+    Boty wizyjne i miniatury nie potrzebują grafiki Game.draw: tło rzędów
+    (meta, rzeka, droga, trawa), pojazdy, kłody i żaba są rysowane jako
+    jednolite prostokąty o geometrii get_rect() wprost do tablicy
+    (height, width, C) w niskiej rozdzielczości, bez powierzchni pygame.
+    Piksel wyjścia bierze kolor punktu planszy w swoim środku (zmniejszony
+    ekran bez rozmycia).
+    
+    Rysowanie to obraz indeksów palety (dla rzędu siatki g: 2g - tło,
+    2g + 1 - obiekt pasa, ostatni - żaba) i jedno numpy.take z palety.
+    Pokrycie rzędów przez obiekty to tablica różnic (+1 na początku
+    prostokąta, -1 za końcem) zsumowana narastająco, więc nie ma pętli po
+    pikselach; render_batch() rysuje wiele światów o tym samym układzie
+    pasów do jednej tablicy (N, height, width, C).
+    
+    Widok to ekran gry, na wysokiej planszy wyśrodkowany na żabie (cel
+    kamery Game.follow_frog, bez wygładzania). Rzędy bez pasów mają kolor
+    trawy. grayscale=True daje C=1 (luminancja), inaczej C=3 (RGB).
+    """
+    
+    WATER = (0, 65, 150)   # Średni kolor WaterEffect
+    ROAD = DARK_GRAY
+    GRASS = GREEN
+    GOAL = LIGHT_GREEN
+    FROG = (50, 220, 50)
+    
+    def __init__(self, width: int = 84, height: int = 84, grayscale: bool = False):
+        import numpy
+        self._numpy = numpy
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.channels = 1 if grayscale else 3
+        # Środki pikseli wyjścia we współrzędnych ekranu
+        self._xs = (numpy.arange(width) + 0.5) * (SCREEN_WIDTH / width)
+        self._ys = (numpy.arange(height) + 0.5) * (SCREEN_HEIGHT / height)
+        self._layout = None  # (pasy drogi, pasy rzeki, wysokość, paleta, rzędy z pasami)
+    
+    def _palette(self, colors: list):
+        """Tablica kolorów (n, C) uint8 - RGB albo luminancja."""
+        numpy = self._numpy
+        rgb = numpy.array(colors, dtype=numpy.float64)
+        if self.grayscale:
+            rgb = (rgb @ numpy.array([0.299, 0.587, 0.114]))[:, None]
+        return numpy.rint(rgb).astype(numpy.uint8)
+    
+    def _tables(self, world: World) -> tuple:
+        """(paleta, czy rząd siatki ma pas) - liczone raz na układ pasów."""
+        layout = self._layout
+        if (layout is not None and layout[2] == world.height
+                and (layout[0] is world.vehicle_lanes or layout[0] == world.vehicle_lanes)
+                and (layout[1] is world.log_lanes or layout[1] == world.log_lanes)):
+            return layout[3:]
+        rows = world.height // GRID_SIZE
+        colors = [self.GOAL, BLACK] + [self.GRASS, BLACK] * (rows - 1) + [self.FROG]
+        lanes = self._numpy.zeros(rows, dtype=bool)
+        for lane in world.vehicle_lanes + world.log_lanes:
+            row = lane['y'] // GRID_SIZE
+            colors[2 * row] = self.WATER if world.in_water(lane['y']) else self.ROAD
+            colors[2 * row + 1] = lane['color']
+            lanes[row] = True
+        self._layout = (world.vehicle_lanes, world.log_lanes, world.height,
+                        self._palette(colors), lanes)
+        return self._layout[3:]
+    
+    @staticmethod
+    def view_top(world: World) -> int:
+        """Górna krawędź widoku (0 na zwykłej planszy)."""
+        top = world.frog.y + GRID_SIZE // 2 - SCREEN_HEIGHT // 2
+        return int(max(0, min(top, world.height - SCREEN_HEIGHT)))
+    
+    def _columns(self, left, right):
+        """Zakres kolumn wyjścia [od, do), których środki leżą w [left, right) ekranu."""
+        numpy = self._numpy
+        scale = self.width / SCREEN_WIDTH
+        return (numpy.clip(numpy.ceil(left * scale - 0.5), 0, self.width).astype(numpy.intp),
+                numpy.clip(numpy.ceil(right * scale - 0.5), 0, self.width).astype(numpy.intp))
+    
+    def render(self, world: World):
+        """Obserwacja jednego świata: tablica (height, width, C) uint8."""
+        return self.render_batch([world])[0]
+    
+    def render_batch(self, worlds: List[World], out=None):
+        """
+        Obserwacje wielu światów o tym samym układzie pasów jako jedna
+        tablica (N, height, width, C) uint8 (albo wpisane do `out`).
+        """
+        numpy = self._numpy
+        count = len(worlds)
+        palette, lanes = self._tables(worlds[0])
+        for world in worlds:
+            if self._tables(world)[1] is not lanes:
+                raise ValueError("render_batch() requires worlds with the same lane layout")
+        rows = len(lanes)
+        width = self.width
+        if out is None:
+            out = numpy.empty((count, self.height, width, self.channels), dtype=numpy.uint8)
+        
+        tops = numpy.array([self.view_top(world) for world in worlds])
+        world_y = tops[:, None] + self._ys                              # (N, H)
+        grid = numpy.minimum(world_y // GRID_SIZE, rows - 1).astype(numpy.intp)
+        first = tops // GRID_SIZE
+        view_rows = SCREEN_HEIGHT // GRID_SIZE + 1
+        
+        # Prostokąty obiektów w rzędach widoku (x obcięte jak w pygame.Rect)
+        index, lefts, widths = [], [], []
+        for i, world in enumerate(worlds):
+            top = int(tops[i])
+            for entity, x in world.entity_positions(top, top + SCREEN_HEIGHT):
+                index.append(i * view_rows + entity.y // GRID_SIZE - first[i])
+                lefts.append(int(x))
+                widths.append(entity.width)
+        cover = numpy.zeros((count * view_rows, width + 1), dtype=numpy.int16)
+        if index:
+            index = numpy.array(index)
+            keep = (index >= 0) & (index < count * view_rows)  # Pasy nachodzące na widok
+            index, lefts = index[keep], numpy.array(lefts)[keep]
+            start, end = self._columns(lefts, lefts + numpy.array(widths)[keep])
+            numpy.add.at(cover, (index, start), 1)
+            numpy.add.at(cover, (index, end), -1)
+        cover = numpy.cumsum(cover[:, :width], axis=1, out=cover[:, :width]) > 0
+        
+        # Piksel obiektu: rząd z pasem, wiersz w prostokącie obiektu (niższym niż rząd)
+        # i kolumna pokryta w tym rzędzie widoku
+        in_lane = lanes[grid] & (world_y - grid * GRID_SIZE < LANE_OBJECT_HEIGHT)
+        covered = cover[numpy.arange(count)[:, None] * view_rows + (grid - first[:, None])]
+        image = numpy.add((2 * grid)[:, :, None], covered & in_lane[:, :, None], dtype=numpy.intp)
+        
+        # Żaba (Frog.get_rect)
+        frog = len(palette) - 1
+        for i, world in enumerate(worlds):
+            x, y, size = int(world.frog.x), world.frog.y, world.frog.size
+            lines = numpy.flatnonzero((world_y[i] >= y) & (world_y[i] < y + size))
+            if len(lines):
+                start, end = self._columns(x, x + size)
+                image[i, lines[0]:lines[-1] + 1, start:end] = frog
+        
+        numpy.take(palette, image, axis=0, out=out)
+        return out
+
+
+class LeaderboardServer:
+    """
+    Lokalny serwer HTTP (tylko odczyt) z wynikami i statystykami automatu.
+    
+    Działa w wątku w tle (ThreadingHTTPServer) i nie czyta konfiguracji
+    gry: Game wywołuje publish() po zmianie wyników, a serwer podaje gotowe
+    bajty JSON z ETagiem. Zapytanie z pasującym If-None-Match dostaje
+    304 bez treści, więc częste odpytywanie przez tablice wyników prawie
+    nic nie kosztuje.
+    
+    Ścieżki:
+        /leaderboard - eksport automatu (wyniki + statystyki), format
+                       łączony przez tools/merge_leaderboards.py
+        /scores      - lista top 5
+        /statistics  - get_statistics()
+    """
+    
+    FORMAT = "frogger-leaderboard"
+    VERSION = 1
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, cabinet: str = None):
+        self.cabinet = cabinet or socket.gethostname()
+        self.requests = 0
+        self.not_modified = 0
+        self._documents = {}  # ścieżka -> (treść, etag)
+        
+        # Serwer jest opcjonalny (--leaderboard-port) - bez kosztu importu przy starcie gry
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._respond(self, body=True)
+            
+            def do_HEAD(self):
+                server._respond(self, body=False)
+            
+            def log_message(self, format, *args):
+                pass  # Tablice odpytują co kilka sekund - bez logu na stderr
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'LeaderboardServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name="frogger-leaderboard", daemon=True)
+        self._thread.start()
+        return self
+    
+    def publish(self, config_manager: ConfigManager):
+        """Serializuje bieżące wyniki i statystyki (wątek gry)."""
+        scores = [dict(entry) for entry in config_manager.get_scores()]
+        statistics = dict(config_manager.get_statistics())
+        export = {
+            'format': self.FORMAT,
+            'version': self.VERSION,
+            'cabinet': self.cabinet,
+            'game_version': __version__,
+            'scores': scores,
+            'statistics': statistics,
+        }
+        documents = {}
+        for path, data in (('/leaderboard', export), ('/scores', scores), ('/statistics', statistics)):
+            body = json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            documents[path] = (body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+        self._documents = documents  # Podmiana całego słownika jest atomowa
+    
+    def _respond(self, handler: 'BaseHTTPRequestHandler', body: bool):
+        self.requests += 1
+        path = handler.path.split('?', 1)[0].rstrip('/') or '/leaderboard'
+        document = self._documents.get(path)
+        if document is None:
+            handler.send_error(404)
+            return
+        
+        data, etag = document
+        tags = handler.headers.get('If-None-Match', '')
+        if etag in (tag.strip() for tag in tags.split(',')) or tags.strip() == '*':
+            self.not_modified += 1
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            return
+        
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.send_header('ETag', etag)
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+        if body:
+            handler.wfile.write(data)
+    
+    def close(self):
+        if self._thread is None:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+
+class NetPeer(abc.ABC):
+    """
+    Wspólna część gry sieciowej dla dwóch graczy w LAN (NetHost, NetClient).
+    
+    Mecz to dwa światy World z tym samym ziarnem - po jednym na żabę
+    gospodarza (gracz 1) i klienta (gracz 2). Pasy w trybie 'wrap' bez
+    poziomów trudności zależą tylko od ziarna i ticka, więc w obu światach
+    i u obu graczy są identyczne; każdy gracz ma własne życia i wynik.
+    
+    Gospodarz jest autorytatywny: symuluje oba światy, stosuje ruchy
+    klienta w tickach, z którymi je wysłał, i co NET_SNAPSHOT_INTERVAL
+    ticków wysyła migawkę (stan obu żab i pozycje obiektów na pasach)
+    zakodowaną jako różnica względem ostatniej migawki potwierdzonej przez
+    klienta (delta()). Klient wyprzedza gospodarza o czas dotarcia wejścia,
+    własne ruchy wykonuje od razu (predykcja), a po każdej migawce porównuje
+    ją ze stanem zapamiętanym z tego ticka - przy rozbieżności cofa swój
+    świat do migawki i symuluje ponownie zapisane ruchy (rollback). Żaba
+    gospodarza jest u klienta ekstrapolowana od ostatniej migawki.
+    
+    Pakiety UDP: nagłówek HEADER (rodzaj, numer, czas wysłania i echo czasu
+    drugiej strony - z niego RTT) oraz treść zależna od rodzaju.
+    
+    Podklasa musi zdefiniować new_match(), step() i handle() - bez nich
+    nie da się utworzyć obiektu (abc.ABC).
+    """
+    
+    HEADER = struct.Struct("<cIdd")       # rodzaj, numer pakietu, czas wysłania, echo
+    HELLO = struct.Struct("<I")           # wersja protokołu
+    WELCOME = struct.Struct("<II")        # ziarno, tick gospodarza
+    INPUT = struct.Struct("<IIB")         # ostatnia migawka, pierwszy tick ruchów, liczba ruchów
+    SNAPSHOT = struct.Struct("<IIIIb")    # ziarno, tick, tick bazy, ostatni ruch klienta, zapas wejścia
+    VERSION = 1
+    NO_TICK = 0xFFFFFFFF
+    
+    # Kody ruchów w pakietach wejścia (0 - brak ruchu w ticku)
+    MOVES = (None, (0, -1), (0, 1), (-1, 0), (1, 0))
+    MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+    DIRECTIONS = Frog.DIRECTIONS
+    FROG_FIELDS = 8
+    
+    role = "peer"
+    local_index = 0
+    
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.peer = None          # Adres drugiego gracza
+        self.seed = None
+        self.worlds = None        # [świat gracza 1, świat gracza 2]
+        self.tick = 0
+        self.waiting = True       # Brak drugiego gracza - mecz nie biegnie
+        self.connected = False
+        self.stats_visible = True
+        
+        self._seq = 0
+        self._peer_seq = None
+        self._echo = 0.0          # Czas wysłania ostatniego pakietu drugiej strony
+        self._echo_at = 0.0
+        self.last_heard = 0.0
+        
+        # Statystyki (panel i podsumowanie)
+        self.rtt = 0.0            # ms, średnia wykładnicza
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.packets_received = 0
+        self.packets_lost = 0
+        self.snapshots = 0
+        self.snapshot_bytes = deque(maxlen=120)
+        self.full_bytes = 0
+        self.up_rate = 0.0        # B/s
+        self.down_rate = 0.0
+        self._rate_at = (time.perf_counter(), 0, 0)
+    
+    @property
+    def local(self) -> 'World':
+        return self.worlds[self.local_index]
+    
+    @property
+    def remote(self) -> 'World':
+        return self.worlds[1 - self.local_index]
+    
+    @property
+    def lanes_world(self) -> 'World':
+        """Świat, którego pasy są rysowane - pierwszy, w którym trwa gra."""
+        for world in self.worlds:
+            if not world.game_over:
+                return world
+        return self.local
+    
+    @property
+    def finished(self) -> bool:
+        return not self.waiting and all(world.game_over for world in self.worlds)
+    
+    @staticmethod
+    def make_world(seed: int) -> 'World':
+        return World(seed, collision_mode="poll", traffic="wrap")
+    
+    @abc.abstractmethod
+    def new_match(self, seed: int = None) -> 'World':
+        """Zaczyna mecz i zwraca świat lokalnej żaby."""
+    
+    @abc.abstractmethod
+    def step(self) -> List[Tuple[str, float, float]]:
+        """Jeden tick meczu; zwraca zdarzenia świata lokalnej żaby."""
+    
+    # --- Stan i kodowanie migawek ---
+    
+    @classmethod
+    def frog_state(cls, world: 'World') -> List[int]:
+        """Stan żaby jako liczby całkowite (x w ćwiartkach piksela)."""
+        frog = world.frog
+        return [round(frog.x * 4), int(frog.y), frog.lives, frog.score,
+                cls.DIRECTIONS.index(frog.direction), frog.hop_animation, frog.hop_height,
+                int(world.game_over)]
+    
+    @classmethod
+    def set_frog_state(cls, world: 'World', values: List[int]):
+        frog = world.frog
+        frog.x = values[0] / 4
+        frog.y, frog.lives, frog.score = values[1], values[2], values[3]
+        frog.direction = cls.DIRECTIONS[values[4]]
+        frog.hop_animation, frog.hop_height = values[5], values[6]
+        world.game_over = bool(values[7])
+    
+    @staticmethod
+    def lane_positions(world: 'World') -> List[float]:
+        return [entity.x for entity in world.vehicles] + [entity.x for entity in world.logs]
+    
+    @staticmethod
+    def set_lane_positions(world: 'World', positions: List[float]):
+        for entity, x in zip(world.vehicles + world.logs, positions):
+            entity.x = x
+    
+    @staticmethod
+    def delta(base: Optional[List[int]], values: List[int]) -> bytes:
+        """
+        Koduje values jako różnicę względem base (None - względem zer):
+        maska zmienionych pól i różnice jako varinty ze zmianą znaku (zigzag).
+        """
+        mask = bytearray((len(values) + 7) // 8)
+        out = bytearray()
+        for i, value in enumerate(values):
+            diff = value - base[i] if base else value
+            if not diff:
+                continue
+            mask[i >> 3] |= 1 << (i & 7)
+            diff = diff * 2 if diff >= 0 else -diff * 2 - 1
+            while diff >= 0x80:
+                out.append(diff & 0x7F | 0x80)
+                diff >>= 7
+            out.append(diff)
+        return bytes(mask) + bytes(out)
+    
+    @staticmethod
+    def undelta(base: Optional[List[int]], payload: bytes, count: int) -> List[int]:
+        """Odwrotność delta()."""
+        values = list(base) if base else [0] * count
+        pos = (count + 7) // 8
+        for i in range(count):
+            if not payload[i >> 3] >> (i & 7) & 1:
+                continue
+            diff = shift = 0
+            while True:
+                byte = payload[pos]
+                pos += 1
+                diff |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            values[i] += diff >> 1 if not diff & 1 else -(diff >> 1) - 1
+        return values
+    
+    # --- Pakiety ---
+    
+    def send(self, kind: bytes, body: bytes):
+        if self.peer is None:
+            return
+        now = time.perf_counter()
+        echo = self._echo + (now - self._echo_at) if self._echo else 0.0
+        self._seq += 1
+        packet = self.HEADER.pack(kind, self._seq, now, echo) + body
+        try:
+            self.sock.sendto(packet, self.peer)
+        except OSError:
+            return  # Np. ICMP "port unreachable" z poprzedniego pakietu
+        self.sent_bytes += len(packet)
+    
+    def receive(self):
+        """Odbiera wszystkie czekające pakiety i przekazuje je do handle()."""
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            if len(data) < self.HEADER.size:
+                continue
+            kind, seq, sent, echo = self.HEADER.unpack_from(data)
+            if not self.accept(address, kind):
+                continue
+            now = time.perf_counter()
+            self.received_bytes += len(data)
+            self.packets_received += 1
+            if self._peer_seq is None or seq > self._peer_seq:
+                if self._peer_seq is not None:
+                    self.packets_lost += seq - self._peer_seq - 1
+                self._peer_seq = seq
+                self._echo, self._echo_at = sent, now
+            elif self.packets_lost:
+                self.packets_lost -= 1  # Przestawiony, nie zgubiony
+            if echo:
+                sample = (now - echo) * 1000
+                self.rtt = sample if not self.rtt else self.rtt * 0.9 + sample * 0.1
+            self.last_heard = now
+            self.connected = True
+            self.handle(kind, data[self.HEADER.size:], address)
+        self._update_rates()
+    
+    def accept(self, address, kind: bytes) -> bool:
+        return address == self.peer
+    
+    @abc.abstractmethod
+    def handle(self, kind: bytes, body: bytes, address):
+        """Obsługuje pakiet rodzaju `kind` (już po nagłówku) od `address`."""
+    
+    def _update_rates(self):
+        now = time.perf_counter()
+        since, sent, received = self._rate_at
+        if now - since >= 1.0:
+            self.up_rate = (self.sent_bytes - sent) / (now - since)
+            self.down_rate = (self.received_bytes - received) / (now - since)
+            self._rate_at = (now, self.sent_bytes, self.received_bytes)
+    
+    def check_timeout(self):
+        """Po NET_TIMEOUT s ciszy drugi gracz odpada (jego żaba kończy grę)."""
+        if self.connected and time.perf_counter() - self.last_heard > NET_TIMEOUT:
+            self.connected = False
+            if self.worlds and not self.waiting:
+                self.remote.game_over = True
+            print(f"Netplay: peer {self.peer} timed out")
+    
+    # --- Statystyki ---
+    
+    def stats(self) -> Dict:
+        sizes = self.snapshot_bytes
+        expected = self.packets_received + self.packets_lost
+        return {
+            'role': self.role,
+            'connected': self.connected,
+            'tick': self.tick,
+            'rtt_ms': self.rtt,
+            'up_Bps': self.up_rate,
+            'down_Bps': self.down_rate,
+            'snapshots': self.snapshots,
+            'snapshot_bytes': sum(sizes) / len(sizes) if sizes else 0.0,
+            'full_bytes': self.full_bytes,
+            'loss': self.packets_lost / expected if expected else 0.0,
+        }
+    
+    def stats_lines(self) -> List[str]:
+        """Linie panelu statystyk sieci."""
+        stats = self.stats()
+        ratio = stats['full_bytes'] / stats['snapshot_bytes'] if stats['snapshot_bytes'] else 0.0
+        return [
+            f"{self.role} {'connected' if self.connected else 'offline'}  RTT {stats['rtt_ms']:.0f} ms  "
+            f"loss {stats['loss']:.1%}",
+            f"up {stats['up_Bps'] / 1024:.1f} KiB/s  down {stats['down_Bps'] / 1024:.1f} KiB/s",
+            f"snapshot {stats['snapshot_bytes']:.0f} B (full {stats['full_bytes']} B, {ratio:.1f}x)",
+        ]
+    
+    def summary(self) -> str:
+        return "Netplay: " + " | ".join(self.stats_lines())
+    
+    def close(self):
+        self.sock.close()
+
+
+class NetHost(NetPeer):
+    """Gospodarz meczu (gracz 1): autorytatywna symulacja obu światów."""
+    
+    role = "host"
+    local_index = 0
+    
+    def __init__(self, address: str = "0.0.0.0", port: int = NET_PORT):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((address, port))
+        super().__init__(sock)
+        self.port = sock.getsockname()[1]
+        self.inputs = {}          # tick -> kod ruchu klienta
+        self.applied = -1         # Ostatni tick, w którym zastosowano wejście klienta
+        self.acked = self.NO_TICK
+        self.slack = 0            # O ile ticków wejście klienta wyprzedza gospodarza
+        self.late_inputs = 0
+        self.history = {}         # tick -> stan wysłanej migawki
+    
+    @property
+    def status(self) -> str:
+        return f"Waiting for player 2 on port {self.port}..."
+    
+    def new_match(self, seed: int = None) -> 'World':
+        """Nowy mecz - biegnie, gdy klient przyśle HELLO."""
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.worlds = [self.make_world(self.seed), self.make_world(self.seed)]
+        self.tick = 0
+        self.waiting = True
+        self.inputs.clear()
+        self.history.clear()
+        self.applied = -1
+        self.acked = self.NO_TICK
+        return self.local
+    
+    def accept(self, address, kind: bytes) -> bool:
+        if kind == b'H' and not self.connected:
+            self.peer = address  # Nowy (lub ponownie podłączony) klient
+        return address == self.peer
+    
+    def handle(self, kind: bytes, body: bytes, address):
+        if kind == b'H':
+            if self.worlds is None or self.HELLO.unpack_from(body)[0] != self.VERSION:
+                return
+            if self.waiting:
+                self.waiting = False
+                print(f"Netplay: player 2 joined from {address[0]}:{address[1]}")
+            self.send(b'W', self.WELCOME.pack(self.seed, self.tick))
+        elif kind == b'I' and not self.waiting:
+            ack, first, count = self.INPUT.unpack_from(body)
+            moves = body[self.INPUT.size:self.INPUT.size + count]
+            for i, code in enumerate(moves):
+                if first + i > self.applied:
+                    self.inputs[first + i] = code
+            if ack != self.NO_TICK and (self.acked == self.NO_TICK or ack > self.acked):
+                self.acked = ack
+            self.slack = first + count - 1 - self.tick
+    
+    def step(self) -> List[Tuple[str, float, float]]:
+        self.receive()
+        self.check_timeout()
+        if self.waiting:
+            return []
+        
+        # Ruchy klienta z tego ticka i spóźnione (stosowane od razu)
+        remote = self.remote
+        for tick in sorted(t for t in self.inputs if t <= self.tick):
+            code = self.inputs.pop(tick)
+            if code:
+                if tick < self.tick:
+                    self.late_inputs += 1
+                remote.move_frog(*self.MOVES[code])
+            self.applied = max(self.applied, tick)
+        
+        events = self.local.step()
+        remote.step()
+        self.tick += 1
+        if self.tick % NET_SNAPSHOT_INTERVAL == 0 and self.connected:
+            self.send_snapshot()
+        return events
+    
+    def send_snapshot(self):
+        values = (self.frog_state(self.worlds[0]) + self.frog_state(self.worlds[1]) +
+                  [round(x * 4) for x in self.lane_positions(self.lanes_world)])
+        self.history[self.tick] = values
+        self.history.pop(self.tick - NET_HISTORY, None)
+        base_tick = self.acked if self.acked in self.history else self.NO_TICK
+        payload = self.delta(self.history.get(base_tick), values)
+        applied = self.applied if self.applied >= 0 else self.NO_TICK
+        self.send(b'S', self.SNAPSHOT.pack(self.seed, self.tick, base_tick, applied,
+                                           max(-128, min(127, self.slack))) + payload)
+        self.snapshots += 1
+        self.snapshot_bytes.append(len(payload))
+        self.full_bytes = len(values) * 4
+    
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats['late_inputs'] = self.late_inputs
+        stats['input_slack'] = self.slack
+        return stats
+    
+    def stats_lines(self) -> List[str]:
+        return super().stats_lines() + [
+            f"input slack {self.slack} ticks, {self.late_inputs} late inputs"]
+
+
+class NetClient(NetPeer):
+    """Klient meczu (gracz 2): predykcja własnej żaby i rollback po migawkach."""
+    
+    role = "client"
+    local_index = 1
+    
+    def __init__(self, host: Tuple[str, int], shim: 'NetShim' = None):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("0.0.0.0", 0))
+        super().__init__(sock)
+        self.peer = (socket.gethostbyname(host[0]), host[1])
+        self.shim = shim          # Przekaźnik z symulowanym opóźnieniem (testy)
+        self.start = 0
+        self.history = {}         # tick -> (pozycje na pasach, przewidziany stan żaby)
+        self.moves = {}           # tick -> kod własnego ruchu
+        self.received = {}        # tick -> odebrana migawka (baza kolejnych)
+        self.latest = self.NO_TICK
+        self.slack = 0
+        self._pending = None
+        self._hello_at = 0.0
+        self._adjust_at = 0
+        self.rollbacks = 0        # Migawki niezgodne z predykcją
+        self.resimulated = 0      # Ticki symulowane ponownie
+        self.desyncs = 0          # Pasy różne od gospodarza
+        self.lead_changes = 0
+    
+    @property
+    def status(self) -> str:
+        return f"Connecting to {self.peer[0]}:{self.peer[1]}..."
+    
+    def new_match(self, seed: int = None) -> 'World':
+        """Dołącza do meczu gospodarza; do WELCOME światy są tylko zaślepką."""
+        self.worlds = [self.make_world(0), self.make_world(0)]
+        self.waiting = True
+        self._hello_at = 0.0
+        return self.local
+    
+    def handle(self, kind: bytes, body: bytes, address):
+        if kind == b'W' and self.waiting:
+            seed, host_tick = self.WELCOME.unpack_from(body)
+            self.begin(seed, host_tick)
+        elif kind == b'S' and not self.waiting:
+            seed, tick, base_tick, _, slack = self.SNAPSHOT.unpack_from(body)
+            if seed != self.seed or (self.latest != self.NO_TICK and tick <= self.latest):
+                return  # Migawka z poprzedniego meczu albo spóźniona
+            if base_tick != self.NO_TICK and base_tick not in self.received:
+                return
+            count = self.FROG_FIELDS * 2 + len(self.local.vehicles) + len(self.local.logs)
+            values = self.undelta(self.received.get(base_tick), body[self.SNAPSHOT.size:], count)
+            self.received[tick] = values
+            for old in [t for t in self.received if t <= tick - NET_HISTORY]:
+                del self.received[old]
+            self.latest = tick
+            self.slack = slack
+            self.snapshots += 1
+            self.snapshot_bytes.append(len(body) - self.SNAPSHOT.size)
+            self.full_bytes = count * 4
+            self._pending = (tick, values)
+    
+    def begin(self, seed: int, host_tick: int):
+        """Start meczu: wyprzedzenie gospodarza o RTT i zapas NET_INPUT_MARGIN."""
+        self.seed = seed
+        self.worlds = [self.make_world(seed), self.make_world(seed)]
+        lead = math.ceil(self.rtt / (1000 / FPS)) + NET_INPUT_MARGIN
+        for _ in range(host_tick + lead):
+            for world in self.worlds:
+                world.step()
+        self.tick = self.start = host_tick + lead
+        self.history = {self.tick: self._save()}
+        self.moves.clear()
+        self.received.clear()
+        self.latest = self.NO_TICK
+        self._pending = None
+        self._adjust_at = self.tick + FPS // 2
+        self.waiting = False
+        print(f"Netplay: joined match {seed}, {lead} ticks ahead of the host (RTT {self.rtt:.0f} ms)")
+    
+    def _save(self) -> tuple:
+        return (self.lane_positions(self.lanes_world), self.frog_state(self.local))
+    
+    def step(self) -> List[Tuple[str, float, float]]:
+        move = self.local._move if self.worlds else None
+        self.receive()
+        self.check_timeout()
+        if self.waiting:
+            now = time.perf_counter()
+            if now - self._hello_at > 0.2:
+                self._hello_at = now
+                self.send(b'H', self.HELLO.pack(self.VERSION))
+            return []
+        
+        if self._pending:
+            self.reconcile(*self._pending, move)
+            self._pending = None
+        # Wyprzedzenie zmieniane najwyżej o tick na pół sekundy (zapas wejścia
+        # w migawkach odzwierciedla zmianę dopiero po RTT)
+        adjust = self.tick >= self._adjust_at
+        if adjust and move is None and self.slack > NET_INPUT_MARGIN + 3:
+            # Wejście daleko przed gospodarzem - wstrzymaj jeden tick
+            self._adjust_at = self.tick + FPS // 2
+            self.lead_changes += 1
+            return []
+        self.moves[self.tick] = self.MOVE_CODES.get(move, 0)
+        events = self._advance()
+        if adjust and self.slack < 0:
+            # Wejście dociera za późno - wyprzedź gospodarza o dodatkowy tick
+            self._adjust_at = self.tick + FPS // 2
+            self.lead_changes += 1
+            self.moves[self.tick] = 0
+            events += self._advance()
+        
+        first = max(self.start, self.tick - NET_INPUT_REDUNDANCY)
+        moves = bytes(self.moves.get(t, 0) for t in range(first, self.tick))
+        self.send(b'I', self.INPUT.pack(self.latest, first, len(moves)) + moves)
+        return events
+    
+    def _advance(self) -> List[Tuple[str, float, float]]:
+        events = self.local.step()
+        self.remote.step()
+        self.tick += 1
+        self.history[self.tick] = self._save()
+        self.history.pop(self.tick - NET_HISTORY, None)
+        self.moves.pop(self.tick - NET_HISTORY, None)
+        return events
+    
+    def reconcile(self, tick: int, values: List[int], move: Optional[Tuple[int, int]]):
+        """
+        Porównuje migawkę z ticka `tick` z predykcją i w razie potrzeby cofa
+        świat klienta; żabę gospodarza ustawia z migawki i ekstrapoluje do
+        bieżącego ticka. `move` to ruch bieżącego ticka (już wykonany).
+        """
+        host_frog = values[:self.FROG_FIELDS]
+        own = values[self.FROG_FIELDS:self.FROG_FIELDS * 2]
+        lanes = values[self.FROG_FIELDS * 2:]
+        saved = self.history.get(tick)
+        if saved is None or tick > self.tick:
+            # Migawka spoza historii - przyjmij pozycje z migawki
+            positions, predicted = [q / 4 for q in lanes], None
+        else:
+            positions, predicted = saved
+            if [round(x * 4) for x in positions] != lanes:
+                self.desyncs += 1
+                positions = [q / 4 for q in lanes]
+        
+        local, remote = self.local, self.remote
+        rollback = predicted != own
+        self.set_lane_positions(remote, positions)
+        self.set_frog_state(remote, host_frog)
+        remote.tick = tick
+        if rollback:
+            self.rollbacks += 1
+            self.set_lane_positions(local, positions)
+            self.set_frog_state(local, own)
+            local.tick = tick
+        
+        for t in range(tick, self.tick):
+            if rollback:
+                code = self.moves.get(t)
+                if code:
+                    local.move_frog(*self.MOVES[code])
+                local.step()
+            remote.step()
+            if rollback:
+                self.history[t + 1] = self._save()
+        self.resimulated += max(0, self.tick - tick)
+        if rollback and move:
+            local.move_frog(*move)
+    
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update(rollbacks=self.rollbacks, resimulated=self.resimulated, desyncs=self.desyncs,
+                     lead=self.tick - self.latest if self.latest != self.NO_TICK else 0,
+                     lead_changes=self.lead_changes)
+        return stats
+    
+    def stats_lines(self) -> List[str]:
+        stats = self.stats()
+        return super().stats_lines() + [
+            f"lead {stats['lead']} ticks, {self.rollbacks} rollbacks "
+            f"({self.resimulated} ticks resimulated), {self.desyncs} desyncs"]
+    
+    def close(self):
+        super().close()
+        if self.shim:
+            self.shim.close()
+
+
+class NetShim:
+    """
+    Przekaźnik UDP z symulowanym opóźnieniem do testów gry sieciowej.
+    
+    Klient łączy się z portem przekaźnika zamiast z gospodarzem; każdy
+    pakiet (w obie strony) jest przekazywany po latency_ms ± jitter_ms
+    (opóźnienie w jedną stronę), a z prawdopodobieństwem loss gubiony.
+    Działa w wątku w tle.
+    """
+    
+    def __init__(self, target: Tuple[str, int], port: int = 0, latency_ms: float = 50.0,
+                 jitter_ms: float = 0.0, loss: float = 0.0, seed: int = None):
+        self.target = (socket.gethostbyname(target[0]), target[1])
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", port))
+        self.port = self.sock.getsockname()[1]
+        self.client = None
+        self.forwarded = 0
+        self.dropped = 0
+        self._queue = []          # (termin, numer, dane, adres)
+        self._count = 0
+        self._running = False
+        self._thread = None
+    
+    def start(self) -> 'NetShim':
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="NetShim", daemon=True)
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        while self._running:
+            now = time.perf_counter()
+            while self._queue and self._queue[0][0] <= now:
+                _, _, data, address = heapq.heappop(self._queue)
+                try:
+                    self.sock.sendto(data, address)
+                    self.forwarded += 1
+                except OSError:
+                    pass
+            timeout = self._queue[0][0] - now if self._queue else 0.05
+            self.sock.settimeout(max(0.0005, min(timeout, 0.05)))
+            try:
+                data, address = self.sock.recvfrom(65536)
+            except OSError:
+                continue  # Limit czasu albo ICMP z zamkniętego portu
+            if address == self.target:
+                destination = self.client
+            else:
+                self.client = destination = address
+                destination = self.target
+            if destination is None:
+                continue
+            if self.rng.random() < self.loss:
+                self.dropped += 1
+                continue
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms))
+            self._count += 1
+            heapq.heappush(self._queue, (time.perf_counter() + delay / 1000, self._count, data, destination))
+    
+    def close(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.sock.close()
+
+
+class Telemetry:
+    """
+    Strumień zdarzeń rozgrywki do analizy trudności i wydajności.
+    
+    emit() tylko dopisuje krotkę do ograniczonego bufora w pamięci (przy
+    pełnym buforze zdarzenie jest odrzucane i liczone w `dropped`); wątek
+    w tle co `interval` sekund albo po zebraniu `batch` zdarzeń zapisuje
+    je paczką na koniec pliku. Formaty:
+    
+        ndjson - jedna linia JSON na zdarzenie,
+        binary - nagłówek MAGIC + rekordy RECORD o stałej długości
+                 (czas, tick, id rodzaju, do 4 pól liczbowych).
+    
+    Rodzaje zdarzeń i ich pola opisuje EVENTS; Telemetry.read() czyta
+    oba formaty.
+    """
+    
+    FORMATS = ("ndjson", "binary")
+    MAGIC = b"FRTL\x01"
+    RECORD = struct.Struct("<dIB3x4d")
+    
+    # rodzaj -> (id w formacie binarnym, nazwy pól)
+    EVENTS = {
+        'round_start': (1, ('seed', 'lives', 'attract')),
+        'hop': (2, ('dx', 'dy', 'x', 'y')),
+        'death': (3, ('cause', 'x', 'y', 'lives')),
+        'goal': (4, ('score', 'crossing_ticks')),
+        'frame_spike': (5, ('frame_ms', 'budget_ms', 'quality')),
+    }
+    CAUSES = ('vehicle', 'water')  # Pole 'cause' w formacie binarnym to indeks
+    
+    def __init__(self, path: Path, fmt: str = "ndjson", capacity: int = 8192,
+                 batch: int = 256, interval: float = 1.0):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown telemetry format: {fmt}")
+        self.path = Path(path)
+        self.format = fmt
+        self.capacity = capacity
+        self.batch = batch
+        self.interval = interval
+        
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = None
+        self._file = None
+    
+    def start(self) -> 'Telemetry':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        if self.format == "binary":
+            self._file = open(self.path, 'ab')
+            if new_file:
+                self._file.write(self.MAGIC)
+        else:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._writer, name="frogger-telemetry", daemon=True)
+        self._thread.start()
+        return self
+    
+    def emit(self, kind: str, tick: int, *values):
+        """Dodaje zdarzenie (wartości w kolejności pól z EVENTS)."""
+        self.emitted += 1
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer.append((time.time(), tick, kind, values))
+        if len(self._buffer) >= self.batch:
+            self._wake.set()
+    
+    def _writer(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._flush()
+            if self._stop:
+                self._flush()
+                return
+    
+    def _flush(self):
+        """Zapisuje zawartość bufora (wątek zapisu)."""
+        chunk = []
+        buffer = self._buffer
+        while buffer:
+            chunk.append(buffer.popleft())
+        if not chunk or self.error:
+            return
+        try:
+            if self.format == "binary":
+                self._file.write(b"".join(self._pack(event) for event in chunk))
+            else:
+                self._file.write("".join(self._line(event) for event in chunk))
+            self._file.flush()
+            self.written += len(chunk)
+            self.batches += 1
+        except Exception as e:
+            self.error = e
+            print(f"Telemetry error: {e}")
+    
+    def _line(self, event: tuple) -> str:
+        t, tick, kind, values = event
+        record = {'t': round(t, 4), 'tick': tick, 'event': kind}
+        record.update(zip(self.EVENTS[kind][1], values))
+        return json.dumps(record) + "\n"
+    
+    def _pack(self, event: tuple) -> bytes:
+        t, tick, kind, values = event
+        values = [self.CAUSES.index(v) if isinstance(v, str) else v for v in values]
+        values += [0] * (4 - len(values))
+        return self.RECORD.pack(t, tick, self.EVENTS[kind][0], *values)
+    
+    def close(self):
+        """Zapisuje zaległe zdarzenia i zamyka plik."""
+        if self._thread is None:
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        print(f"Telemetry: {self.written} events written in {self.batches} batches, "
+              f"{self.dropped} dropped ({self.path})")
+    
+    @classmethod
+    def read(cls, path: Path):
+        """Czyta zapisane zdarzenia (oba formaty) jako słowniki."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        if not data.startswith(cls.MAGIC):
+            for line in data.decode('utf-8').splitlines():
+                if line.strip():
+                    yield json.loads(line)
+            return
+        
+        kinds = {event_id: (kind, fields) for kind, (event_id, fields) in cls.EVENTS.items()}
+        body = data[len(cls.MAGIC):]
+        body = body[:len(body) - len(body) % cls.RECORD.size]  # Bez uciętego ostatniego rekordu
+        for t, tick, event_id, *values in cls.RECORD.iter_unpack(body):
+            kind, fields = kinds[event_id]
+            record = {'t': t, 'tick': tick, 'event': kind}
+            record.update(zip(fields, values))
+            if kind == 'death':
+                record['cause'] = cls.CAUSES[int(record['cause'])]
+            yield record
+
+
+class Trajectory:
+    """
+    Zapis przebiegu gry tick po ticku w binarnym formacie o stałej długości
+    rekordu - dla trenowania botów i analiz na milionach ticków.
+    
+    World.step() wywołuje record() po każdym ticku (World.trajectory);
+    rekordy są pakowane do bufora porcji (chunk rekordów), a pełne porcje
+    kompresuje i zapisuje wątek w tle.
+    
+    Plik to nagłówek HEADER (64 B) i rekordy o układzie z dtype():
+    tick, seed, stan żaby (x, y, życia, punkty), poziom, ruch (dx, dy),
+    bitmaska zdarzeń ticka (EVENT_BITS), przesunięcia pasów (droga pasa
+    modulo SCREEN_WIDTH + szerokość obiektu) oraz pozycje x pojazdów
+    i kłód w stałej liczbie slotów (puste sloty to NaN). Wiele gier może
+    trafić do jednego pliku - rozróżnia je pole seed. Wysoka plansza ma
+    więcej pasów i obiektów - rozmiary zapisu daje for_level(); x obiektów
+    pasów poza widokiem to pozycja z ich ostatniej aktualizacji.
+    
+    Bez kompresji rekordy leżą jeden za drugim, więc TrajectoryReader mapuje
+    plik do pamięci (numpy.memmap) bez parsowania. Z kompresją (zlib, lzma,
+    bz2 - do archiwum) każda porcja to nagłówek CHUNK i skompresowane
+    rekordy; dostęp swobodny rozpakowuje tylko jedną porcję.
+    """
+    
+    MAGIC = b"FRTJ"
+    VERSION = 2  # 2: frog_y jako int32 (wysokie plansze)
+    HEADER = struct.Struct("<4sHBBHHHI46x")  # magic, wersja, kompresja, -, pasy, sloty, porcja
+    CHUNK = struct.Struct("<II")             # liczba rekordów, długość skompresowanych danych
+    COMPRESSIONS = (None, "zlib", "lzma", "bz2")
+    EVENT_BITS = {'crash': 1, 'splash': 2, 'goal': 4}
+    
+    # Pola rekordu poza tablicami: (nazwa, kod struct, dtype NumPy)
+    FIELDS = [
+        ('tick', 'I', '<u4'),
+        ('seed', 'I', '<u4'),
+        ('frog_x', 'f', '<f4'),
+        ('frog_y', 'i', '<i4'),
+        ('lives', 'B', 'u1'),
+        ('events', 'B', 'u1'),
+        ('score', 'I', '<u4'),
+        ('level', 'H', '<u2'),
+        ('dx', 'b', 'i1'),
+        ('dy', 'b', 'i1'),
+    ]
+    
+    LANES = len(VEHICLE_LANES) + len(LOG_LANES)
+    VEHICLE_SLOTS = 48
+    LOG_SLOTS = 32
+    CHUNK_RECORDS = 4096
+    
+    def __init__(self, path: Path, compression: str = None, lanes: int = LANES,
+                 vehicle_slots: int = VEHICLE_SLOTS, log_slots: int = LOG_SLOTS,
+                 chunk: int = CHUNK_RECORDS):
+        """
+        Args:
+            path: Plik wynikowy (nadpisywany)
+            compression: None, 'zlib', 'lzma' lub 'bz2'
+            lanes: Liczba pasów (drogi i rzeki) świata
+            vehicle_slots: Sloty na pozycje pojazdów (nadmiar jest pomijany)
+            log_slots: Sloty na pozycje kłód
+            chunk: Liczba rekordów w porcji zapisu / kompresji
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown trajectory compression: {compression}")
+        self.path = Path(path)
+        self.compression = compression
+        self.lanes = lanes
+        self.vehicle_slots = vehicle_slots
+        self.log_slots = log_slots
+        self.chunk = chunk
+        self.record_struct = self.layout(lanes, vehicle_slots, log_slots)
+        
+        self.records = 0
+        self.truncated = 0  # Rekordy, w których zabrakło slotów
+        self.bytes_written = 0
+        self.error = None
+        
+        self._buffer = bytearray(self.record_struct.size * chunk)
+        self._count = 0
+        self._nan = [math.nan] * max(vehicle_slots, log_slots)
+        self._world = None
+        self._lane_objects = []
+        self._offsets = []
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+    
+    @classmethod
+    def for_level(cls, path: Path, compression: str = None, screens: int = 1) -> 'Trajectory':
+        """
+        Zapis dla planszy z tall_level(screens): pasy i sloty razy screens,
+        porcja mniejsza w tej samej proporcji (bufor porcji ma stały rozmiar).
+        """
+        return cls(path, compression, lanes=cls.LANES * screens,
+                   vehicle_slots=cls.VEHICLE_SLOTS * screens, log_slots=cls.LOG_SLOTS * screens,
+                   chunk=max(1, cls.CHUNK_RECORDS // screens))
+    
+    @classmethod
+    def layout(cls, lanes: int, vehicle_slots: int, log_slots: int) -> struct.Struct:
+        """Struktura jednego rekordu (bez wyrównania - zgodna z dtype())."""
+        return struct.Struct("<" + "".join(code for _, code, _ in cls.FIELDS)
+                             + f"{lanes}f{vehicle_slots}f{log_slots}f")
+    
+    @classmethod
+    def dtype(cls, lanes: int, vehicle_slots: int, log_slots: int):
+        """Typ rekordu dla NumPy (wymaga numpy)."""
+        import numpy
+        return numpy.dtype([(name, kind) for name, _, kind in cls.FIELDS] + [
+            ('lanes', '<f4', (lanes,)),
+            ('vehicles', '<f4', (vehicle_slots,)),
+            ('logs', '<f4', (log_slots,)),
+        ])
+    
+    @staticmethod
+    def codec(compression: str):
+        """Moduł kompresji porcji; lzma i bz2 (archiwa) są importowane dopiero tutaj."""
+        if compression == 'lzma':
+            import lzma
+            return lzma
+        if compression == 'bz2':
+            import bz2
+            return bz2
+        return zlib
+    
+    def start(self) -> 'Trajectory':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION,
+                                          self.COMPRESSIONS.index(self.compression), 0,
+                                          self.lanes, self.vehicle_slots, self.log_slots,
+                                          self.chunk))
+        self._thread = threading.Thread(target=self._writer, name="frogger-trajectory", daemon=True)
+        self._thread.start()
+        return self
+    
+    def record(self, world: 'World', move: Optional[Tuple[int, int]]):
+        """Dopisuje rekord ticka, który World właśnie wykonał."""
+        if world is not self._world:
+            # Nowa gra: przesunięcia pasów liczone od zera
+            self._world = world
+            self._lane_objects = world.lane_objects()
+            if len(self._lane_objects) != self.lanes:
+                raise ValueError(f"Trajectory has {self.lanes} lanes, world has {len(self._lane_objects)}")
+            self._offsets = [0.0] * self.lanes
+        
+        offsets = self._offsets
+        for i, lane in enumerate(self._lane_objects):
+            offsets[i] = (offsets[i] + lane.speed * lane.direction) % (SCREEN_WIDTH + lane.width)
+        
+        vehicles = [vehicle.x for vehicle in world.vehicles[:self.vehicle_slots]]
+        logs = [log.x for log in world.logs[:self.log_slots]]
+        if len(world.vehicles) > self.vehicle_slots or len(world.logs) > self.log_slots:
+            self.truncated += 1
+        events = 0
+        for kind, _, _ in world.events:
+            events |= self.EVENT_BITS[kind]
+        frog = world.frog
+        dx, dy = move or (0, 0)
+        
+        self.record_struct.pack_into(
+            self._buffer, self._count * self.record_struct.size,
+            world.tick, world.seed & 0xFFFFFFFF, frog.x, frog.y, frog.lives, events,
+            frog.score, world.level, dx, dy, *offsets,
+            *vehicles, *self._nan[:self.vehicle_slots - len(vehicles)],
+            *logs, *self._nan[:self.log_slots - len(logs)])
+        self._count += 1
+        self.records += 1
+        if self._count == self.chunk:
+            self._flush_chunk()
+    
+    def _flush_chunk(self):
+        if self._count:
+            self._queue.put((self._count, bytes(self._buffer[:self._count * self.record_struct.size])))
+            self._count = 0
+    
+    def _writer(self):
+        compress = self.codec(self.compression).compress if self.compression else None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error:
+                continue
+            count, data = item
+            try:
+                if compress:
+                    data = compress(data)
+                    self._file.write(self.CHUNK.pack(count, len(data)))
+                self._file.write(data)
+                self.bytes_written += len(data)
+            except Exception as e:
+                self.error = e
+                print(f"Trajectory error: {e}")
+    
+    def close(self):
+        """Zapisuje ostatnią porcję i zamyka plik."""
+        if self._thread is None:
+            return
+        self._flush_chunk()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        print(f"Trajectory: {self.records} ticks, {self.bytes_written / 1024:.0f} KiB "
+              f"({self.compression or 'uncompressed'}, {self.path})")
+
+
+class TrajectoryReader:
+    """
+    Dostęp swobodny do pliku Trajectory jako tablic NumPy (wymaga numpy).
+    
+    reader[i] to rekord ticka i (numpy.void), reader[a:b] - tablica
+    strukturalna, reader.column('frog_x') - jedno pole wszystkich rekordów.
+    Plik bez kompresji jest mapowany do pamięci (records to numpy.memmap,
+    nic nie jest czytane z góry); w pliku skompresowanym przy otwarciu
+    czytane są tylko nagłówki porcji, a rozpakowywana jest porcja, do
+    której trafia indeks (ostatnia jest trzymana w pamięci). Niepełny
+    ostatni rekord lub porcja (plik w trakcie zapisu) są pomijane.
+    """
+    
+    def __init__(self, path: Path):
+        import numpy
+        self._numpy = numpy
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            header = f.read(Trajectory.HEADER.size)
+        if len(header) < Trajectory.HEADER.size or not header.startswith(Trajectory.MAGIC):
+            raise ValueError(f"Not a trajectory file: {path}")
+        (_, version, compression, _, self.lanes, self.vehicle_slots,
+         self.log_slots, self.chunk) = Trajectory.HEADER.unpack(header)
+        if version != Trajectory.VERSION:
+            raise ValueError(f"Unsupported trajectory version: {version}")
+        self.compression = Trajectory.COMPRESSIONS[compression]
+        self.dtype = Trajectory.dtype(self.lanes, self.vehicle_slots, self.log_slots)
+        
+        data_size = self.path.stat().st_size - Trajectory.HEADER.size
+        self.records = None
+        self._chunks = []   # (pierwszy rekord, offset danych, długość, liczba rekordów)
+        self._starts = []
+        self._cached = (None, None)
+        if self.compression is None:
+            count = data_size // self.dtype.itemsize
+            self.length = count
+            if count:
+                self.records = numpy.memmap(self.path, dtype=self.dtype, mode='r',
+                                            offset=Trajectory.HEADER.size, shape=(count,))
+        else:
+            self.length = 0
+            with open(self.path, 'rb') as f:
+                offset = Trajectory.HEADER.size
+                f.seek(offset)
+                while True:
+                    head = f.read(Trajectory.CHUNK.size)
+                    if len(head) < Trajectory.CHUNK.size:
+                        break
+                    count, size = Trajectory.CHUNK.unpack(head)
+                    offset += Trajectory.CHUNK.size
+                    if offset + size > Trajectory.HEADER.size + data_size:
+                        break
+                    self._chunks.append((self.length, offset, size, count))
+                    self._starts.append(self.length)
+                    self.length += count
+                    offset += size
+                    f.seek(offset)
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def _chunk(self, index: int):
+        """Rozpakowana porcja o numerze `index`."""
+        if self._cached[0] != index:
+            _, offset, size, _ = self._chunks[index]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(size)
+            data = Trajectory.codec(self.compression).decompress(data)
+            self._cached = (index, self._numpy.frombuffer(data, dtype=self.dtype))
+        return self._cached[1]
+    
+    def __getitem__(self, index):
+        if not self.length:
+            return self._numpy.empty(0, dtype=self.dtype)[index]
+        if self.records is not None:
+            return self.records[index]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return self[start:stop][::step]
+            parts = []
+            position = start
+            while position < stop:
+                i = bisect.bisect_right(self._starts, position) - 1
+                first, _, _, count = self._chunks[i]
+                end = min(stop, first + count)
+                parts.append(self._chunk(i)[position - first:end - first])
+                position = end
+            if not parts:
+                return self._numpy.empty(0, dtype=self.dtype)
+            return self._numpy.concatenate(parts)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trajectory index out of range")
+        i = bisect.bisect_right(self._starts, index) - 1
+        return self._chunk(i)[index - self._chunks[i][0]]
+    
+    def column(self, name: str):
+        """Jedno pole wszystkich rekordów (widok memmap albo nowa tablica)."""
+        if self.records is not None:
+            return self.records[name]
+        return self[:][name]
+    
+    def close(self):
+        """Zwalnia mapowanie pliku."""
+        self.records = None
+        self._cached = (None, None)
+
+
+class FrameSnapshot(NamedTuple):
+    """
+    Niezmienny stan jednej klatki rozgrywki, przekazywany z pętli symulacji
+    do wątku rysującego (RenderPipeline).
+    
+    Stan dynamiczny to wyłącznie krotki liczb; `scene` to kopie obiektów
+    (żaba, pojazdy, kłody) z cechami stałymi - kolorem, rozmiarem, słojami -
+    tworzone raz na grę i używane tylko przez wątek rysujący.
+    """
+    tick: int
+    scene: tuple          # (frog, vehicles, logs) - kopie do rysowania
+    frog: tuple           # (x, y, direction, hop_height, lives, score)
+    level: int
+    vehicles: tuple       # pozycje x pojazdów
+    logs: tuple           # pozycje x kłód
+    particles: tuple      # ParticleSystem.snapshot()
+    water_time: float
+    quality: int
+    created: float        # time.perf_counter() w chwili utworzenia
+
+
+class RenderPipeline:
+    """
+    Opcjonalny dwuetapowy potok: symulacja i obsługa wejścia w wątku
+    głównym, rysowanie klatek rozgrywki w wątku w tle.
+    
+    SDL wymaga, by zdarzenia i okno obsługiwał wątek, który je utworzył,
+    dlatego w wątku głównym zostaje pętla zdarzeń, World.step() i szybkie
+    wyświetlenie gotowej klatki (blit + flip). Wątek rysujący bierze zawsze
+    najnowszy FrameSnapshot (starsze, nienarysowane są pomijane) i rysuje go
+    do tylnego z dwóch buforów; po skończeniu bufory są zamieniane. Wolne
+    rysowanie obniża więc tylko liczbę wyświetlanych klatek, a nie tempo
+    symulacji i reakcję na klawisze.
+    """
+    
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.frames = [pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) for _ in range(2)]
+        self.front = 0                  # Indeks ostatniej gotowej klatki
+        self.front_snapshot = None      # Snapshot, z którego ją narysowano
+        self.water = WaterEffect()
+        
+        self.rendered = 0
+        self.skipped = 0
+        self.render_ms = 0.0
+        
+        self._cond = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._stop = False
+        self._thread = None
+    
+    def start(self) -> 'RenderPipeline':
+        self._thread = threading.Thread(target=self._worker, name="frogger-render", daemon=True)
+        self._thread.start()
+        return self
+    
+    def publish(self, snapshot: FrameSnapshot):
+        """Podmienia najnowszy snapshot do narysowania (wątek główny)."""
+        with self._cond:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = snapshot
+            self._cond.notify_all()
+    
+    def present(self, screen: pygame.Surface) -> Optional[FrameSnapshot]:
+        """Kopiuje ostatnią gotową klatkę na ekran; zwraca jej snapshot."""
+        with self._cond:
+            if self.front_snapshot is not None:
+                screen.blit(self.frames[self.front], (0, 0))
+            return self.front_snapshot
+    
+    def wait_idle(self):
+        """Czeka, aż wątek rysujący skończy (przed rysowaniem w wątku głównym)."""
+        with self._cond:
+            self._pending = None
+            self._cond.wait_for(lambda: not self._busy)
+            self.front_snapshot = None
+    
+    def close(self):
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._thread = None
+    
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._stop)
+                if self._stop:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+            
+            start = time.perf_counter()
+            back = 1 - self.front
+            try:
+                self.render(snapshot, self.frames[back])
+            finally:
+                with self._cond:
+                    self.render_ms = (time.perf_counter() - start) * 1000
+                    self.front = back
+                    self.front_snapshot = snapshot
+                    self.rendered += 1
+                    self._busy = False
+                    self._cond.notify_all()
+    
+    def render(self, snapshot: FrameSnapshot, target: pygame.Surface):
+        """Rysuje snapshot na powierzchni docelowej."""
+        frog, vehicles, logs = snapshot.scene
+        frog.x, frog.y, frog.direction, frog.hop_height, frog.lives, frog.score = snapshot.frog
+        for vehicle, x in zip(vehicles, snapshot.vehicles):
+            vehicle.x = x
+        for log, x in zip(logs, snapshot.logs):
+            log.x = x
+        self.water.time = snapshot.water_time
+        self.water.wave_offset = math.sin(snapshot.water_time) * 3
+        
+        game = self.game
+        game.draw_scene(target, frog, vehicles, logs, snapshot.particles, self.water, snapshot.quality)
+        game.draw_ui(target, frog, snapshot.quality, snapshot.level)
+        # Nakładka profilera też tutaj - czcionek nie wolno używać z dwóch wątków naraz
+        game.profiler.draw(target, game.small_font)
+
+
+class Game:
+    """
+    Główna klasa gry Frogger.
+    
+    Zarządza logiką gry, kolizjami i renderowaniem.
+    
+    Klawisze są obsługiwane przez tabele (patrz _build_input_tables()):
+    globalne, per stan gry i domyślne per stan (menu, wpisywanie imienia).
+    Ruchy żaby trafiają do bufora i są wykonywane po jednym na tick, więc
+    szybka seria klawiszy nie przepada ani nie przeskakuje kolizji.
+    
+    Taktowanie klatek (PACING_MODES): 'sleep' - clock.tick (najmniej CPU),
+    'busy' - clock.tick_busy_loop (dokładne granice klatek), 'wake' -
+    czekanie na zdarzenie do terminu klatki; klawisz w trakcie czekania
+    od razu wykonuje ruch i rysuje klatkę bez kroku symulacji.
+    
+    Poza rozgrywką pętla zwalnia, gdy nic się nie zmienia (idle_timeout()):
+    ekrany statyczne, ukryte lub nieaktywne okno i nieruszane menu główne
+    czekają na zdarzenie (pygame.event.wait z limitem czasu) zamiast
+    rysować 60 klatek na sekundę; każde zdarzenie budzi pętlę od razu.
+    """
+    
+    PACING_MODES = ("sleep", "busy", "wake")
+    
+    def __init__(self, headless: bool = False):
+        """
+        Inicjalizuje grę.
+        
+        Args:
+            headless: Renderuj do powierzchni poza ekranem (bez okna),
+                      np. przy eksporcie replayu do wideo
+        """
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption(
+                f"Frogger Enhanced - polsoft.ITS™ London © 2026 Sebastian Januchowski"
+            )
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.input_font = pygame.font.Font(None, 48)
+        self.font_tiny = pygame.font.Font(None, 18)
+        
+        # Menu i wyniki (wspólny ConfigManager, żeby zapisy się nie nadpisywały)
+        self.config_manager = ConfigManager()
+        self.score_manager = ScoreManager(self.config_manager)
+        self.menu = Menu(self.screen, self.score_manager)
+        
+        # Efekty
+        self.particle_system = ParticleSystem()
+        self.water_effect = WaterEffect()
+        self.quality = QualityGovernor(self.config_manager.get_setting('quality', 'auto'))
+        
+        # Profiler klatek (nakładka F3)
+        self.profiler = FrameProfiler()
+        self.profiler.track('surface_allocs', lambda: SURFACE_POOL.allocations)
+        self.profiler.track('surface_pool_hits', lambda: SURFACE_POOL.hits)
+        
+        # Profilowanie cProfile / tracemalloc (ProfileSession lub None, F9)
+        self.profile = None
+        
+        # Odśmiecanie i pomiar jego przerw (tryb zmienia set_gc_mode())
+        self.gc = GCController()
+        self.profiler.track('gc_collections', lambda: self.gc.total)
+        self.profiler.track('gc_ms', lambda: round(self.gc.pause_ms, 2))
+        self._frame_start = time.perf_counter()
+        
+        # Stan gry
+        self.state = "menu"  # menu, playing, game_over, enter_name
+        self.player_name = ""
+        self.input_active = False
+        
+        # Symulacja (World tworzony przy starcie gry) i zapis ruchów
+        self.world = None
+        self.replay = None
+        self.collision_mode = "poll"  # Tryb kolizji World (World.COLLISION_MODES)
+        self.traffic = "wrap"         # Ruch na pasach World ('wrap' lub 'stream')
+        self.level_screens = 1        # Wysokość planszy w odcinkach (tall_level)
+        
+        # Kamera wysokiej planszy (y górnej krawędzi widoku) i kopie obiektów
+        # widocznych pasów do rysowania w jej układzie (scene_view())
+        self.camera_y = 0.0
+        self._views = {}
+        self.difficulty = self.config_manager.get_setting('difficulty', 'normal')
+        if self.difficulty not in DIFFICULTIES:
+            self.difficulty = 'normal'
+        
+        # Autopilot (PlannerAgent, --autoplay) i tryb demo uruchamiany z bezczynnego
+        # menu - demo ma własnego agenta, więc nie nadpisuje autopilota
+        self.autoplay = None
+        self.attract = False
+        self.attract_agent = None
+        self.last_input = pygame.time.get_ticks()
+        self.replay_path = None  # Gdzie zapisać replay po zakończeniu gry
+        
+        # Przechwytywanie klatek (FrameCapture lub None)
+        self.capture = None
+        
+        # Executor zadań I/O (zapis konfiguracji, replayów, zamykanie nagrań);
+        # ustawiany przez run_async(), w run() operacje są synchroniczne
+        self.io_executor = None
+        
+        # Serwer HTTP z wynikami dla tablic w salonie (LeaderboardServer lub None)
+        self.leaderboard = None
+        
+        # Strumień zdarzeń do analizy (Telemetry lub None) i początek próby
+        # przejścia - do czasu przejścia w zdarzeniu 'goal'
+        self.telemetry = None
+        self.attempt_start = 0
+        
+        # Zapis przebiegu gier tick po ticku (Trajectory lub None)
+        self.trajectory = None
+        
+        # Gra sieciowa dla dwóch graczy (NetHost / NetClient lub None)
+        self.net = None
+        
+        # Rysowanie w osobnym wątku (RenderPipeline lub None) i kopie
+        # obiektów świata, z których rysuje (patrz snapshot())
+        self.pipeline = None
+        self._scene_layout = None
+        self._scene = None
+        
+        # Opóźnienie klawisz -> ruch: ruchy czekające na wyświetlenie
+        # (tick, czas klawisza) i zmierzone czasy w ms
+        self.pending_moves = deque()
+        self.sim_latency = deque(maxlen=600)     # klawisz -> ruch w World
+        self.input_latency = deque(maxlen=600)   # klawisz -> wyświetlona klatka
+        
+        # Bufor ruchów z klawiatury (dx, dy, czas klawisza), tick ostatniego
+        # wykonanego ruchu i liczba ruchów odrzuconych przy pełnym buforze
+        self.input_buffer = deque()
+        self._moved_at = -1
+        self.input_dropped = 0
+        
+        # Taktowanie klatek i termin następnej klatki (tryb 'wake')
+        self.pacing = "sleep"
+        self._deadline = 0.0
+        
+        # Zamrożona klatka z nakładką dla enter_name / game_over (frozen_frame())
+        # i wyrenderowane imię z kursorem
+        self._frozen = None
+        self._frozen_key = None
+        self.overlay_builds = 0
+        self.profiler.track('overlay_builds', lambda: self.overlay_builds)
+        self._name_text = (None, None)
+        
+        # Zwalnianie pętli poza rozgrywką i stan okna (zdarzenia WINDOW*)
+        self.idle_throttle = True
+        self.window_visible = True
+        self.window_focused = True
+        
+        self._build_input_tables()
+        
+        self.running = True
+        
+        # Display configuration file location
+        print(f"\n{'='*60}")
+        print(f"Configuration file: {CONFIG_FILE}")
+        print(f"{'='*60}\n")
+    
+    @property
+    def frog(self) -> Frog:
+        """Żaba bieżącej gry (None przed pierwszą grą)."""
+        return self.world.frog if self.world else None
+    
+    @property
+    def vehicles(self) -> List[Vehicle]:
+        world = self.net.lanes_world if self.net and self.world else self.world
+        return world.vehicles if world else []
+    
+    @property
+    def logs(self) -> List[Log]:
+        world = self.net.lanes_world if self.net and self.world else self.world
+        return world.logs if world else []
+    
+    @property
+    def tick(self) -> int:
+        return self.world.tick if self.world else 0
+    
+    def start_new_game(self, seed: int = None, attract: bool = False):
+        """
+        Rozpoczyna nową grę.
+        
+        Args:
+            seed: Ziarno losowania pasów (domyślnie losowe); to samo ziarno
+                  i te same ruchy dają identyczną rozgrywkę
+            attract: Gra demo (autopilot) - nie zapisuje czasu ostatniej gry
+        """
+        if self.net:
+            # Mecz sieciowy: światy tworzy NetHost / NetClient, bez replayu
+            self.world = self.net.new_match(seed)
+            self.replay = None
+        else:
+            layout = tall_level(self.level_screens) if self.level_screens > 1 else {}
+            self.world = World(seed, collision_mode=self.collision_mode, traffic=self.traffic,
+                               difficulty=self.difficulty, **layout)
+            self.replay = Replay(self.world.seed, traffic=self.traffic, difficulty=self.difficulty,
+                                 screens=self.level_screens, collision_mode=self.collision_mode)
+            self.world.trajectory = self.trajectory
+        self.camera_y = float(self.world.height - SCREEN_HEIGHT)
+        self._views = {}
+        self.pending_moves.clear()
+        self.input_buffer.clear()
+        self._moved_at = -1
+        self.attempt_start = 0
+        if self.telemetry:
+            self.telemetry.emit('round_start', 0, self.world.seed, self.frog.lives, int(attract))
+        self.state = "playing"
+        self.player_name = ""
+        self.particle_system = ParticleSystem()
+        self.particle_system.max_particles = PARTICLE_CAPS[self.quality.level]
+        
+        # Aktualizuj czas ostatniej gry
+        if not attract:
+            self.config_manager.update_last_played()
+    
+    def start_attract(self):
+        """Uruchamia tryb demo: autopilot gra w pętli aż do naciśnięcia klawisza."""
+        self.attract = True
+        self.attract_agent = PlannerAgent()
+        self.start_new_game(attract=True)
+    
+    def stop_attract(self):
+        """Kończy tryb demo i wraca do menu."""
+        self.attract = False
+        self.attract_agent = None
+        self.state = "menu"
+        self.last_input = pygame.time.get_ticks()
+    
+    def draw_background(self, screen: pygame.Surface = None,
+                        water: WaterEffect = None, quality: int = None,
+                        offset: int = 0, goal: bool = True):
+        """
+        Rysuje tło gry z ulepszoną grafiką (domyślnie na ekranie gry).
+        
+        offset przesuwa tło w pionie (odcinek wysokiej planszy w widoku
+        kamery), a goal=False pomija pas mety (odcinki poniżej najwyższego,
+        gdzie ten rząd to trawa startu odcinka wyżej). Pasy tła poza ekranem
+        nie są rysowane.
+        """
+        screen = screen or self.screen
+        water = water or self.water_effect
+        quality = self.quality.level if quality is None else quality
+        height = screen.get_height()
+        
+        def visible(y: int, h: int) -> bool:
+            return y + offset + h > 0 and y + offset < height
+        
+        # Rzeka z animacją
+        if visible(50, 200):
+            water_rect = pygame.Rect(0, 50 + offset, SCREEN_WIDTH, 200)
+            water.draw(screen, water_rect, quality)
+        
+        # Droga z teksturą
+        step = GRADIENT_STEPS[quality] or 10
+        for i in range(0, 250 if visible(400, 250) else 0, step):
+            shade = int(i / 250 * 30)
+            road_color = (68 + shade, 68 + shade, 68 + shade)
+            if step == 1:
+                pygame.draw.line(screen, road_color, 
+                               (0, 400 + offset + i), (SCREEN_WIDTH, 400 + offset + i))
+            else:
+                pygame.draw.rect(screen, road_color, 
+                               (0, 400 + offset + i, SCREEN_WIDTH + 1, step))
+        
+        # Gęstość źdźbeł trawy zależna od jakości
+        density = {QUALITY_LOW: 4, QUALITY_MEDIUM: 2, QUALITY_HIGH: 1}[quality]
+        
+        # Bezpieczne strefy z teksturą trawy
+        # Start
+        for i in range(GRID_SIZE if visible(650, GRID_SIZE) else 0):
+            grass_shade = random.randint(-10, 10)
+            grass_color = (
+                max(0, min(255, 34 + grass_shade)),
+                max(0, min(255, 139 + grass_shade)),
+                max(0, min(255, 34 + grass_shade))
+            )
+            for x in range(0, SCREEN_WIDTH, 20 * density):
+                if random.random() > 0.3:
+                    pygame.draw.line(screen, grass_color, 
+                                   (x + random.randint(-5, 5), 650 + offset + i), 
+                                   (x + random.randint(-3, 3), 650 + offset + i + random.randint(5, 15)), 1)
+        
+        # Środek
+        for i in range(GRID_SIZE if visible(350, GRID_SIZE) else 0):
+            grass_shade = random.randint(-10, 10)
+            grass_color = (
+                max(0, min(255, 34 + grass_shade)),
+                max(0, min(255, 139 + grass_shade)),
+                max(0, min(255, 34 + grass_shade))
+            )
+            for x in range(0, SCREEN_WIDTH, 20 * density):
+                if random.random() > 0.3:
+                    pygame.draw.line(screen, grass_color, 
+                                   (x + random.randint(-5, 5), 350 + offset + i), 
+                                   (x + random.randint(-3, 3), 350 + offset + i + random.randint(5, 15)), 1)
         
         # Meta (jaśniejsza trawa)
-        for i in range(GRID_SIZE):
+        for i in range(GRID_SIZE if goal and visible(0, GRID_SIZE) else 0):
             grass_shade = random.randint(-10, 10)
             grass_color = (
                 max(0, min(255, 144 + grass_shade)),
                 max(0, min(255, 238 + grass_shade)),
                 max(0, min(255, 144 + grass_shade))
             )
-            for x in range(0, SCREEN_WIDTH, 15):
+            for x in range(0, SCREEN_WIDTH, 15 * density):
                 if random.random() > 0.2:
-                    pygame.draw.line(self.screen, grass_color, 
-                                   (x + random.randint(-5, 5), i), 
-                                   (x + random.randint(-3, 3), i + random.randint(5, 12)), 1)
+                    pygame.draw.line(screen, grass_color, 
+                                   (x + random.randint(-5, 5), offset + i), 
+                                   (x + random.randint(-3, 3), offset + i + random.randint(5, 12)), 1)
         
         # Linie na drodze z efektem świecenia
         for i in range(1, 5):
-            y = 400 + i * 50
-            for x in range(0, SCREEN_WIDTH, 40):
+            y = 400 + offset + i * 50
+            for x in range(0, SCREEN_WIDTH if visible(400 + i * 50 - 1, 3) else 0, 40):
                 # Główna linia
-                pygame.draw.line(self.screen, WHITE, (x, y), (x + 20, y), 3)
+                pygame.draw.line(screen, WHITE, (x, y), (x + 20, y), 3)
                 # Świecenie
-                pygame.draw.line(self.screen, (255, 255, 255, 100), 
+                pygame.draw.line(screen, (255, 255, 255, 100), 
                                (x, y - 1), (x + 20, y - 1), 1)
-                pygame.draw.line(self.screen, (255, 255, 255, 100), 
+                pygame.draw.line(screen, (255, 255, 255, 100), 
                                (x, y + 1), (x + 20, y + 1), 1)
     
-    def draw_ui(self):
+    def draw_net(self, screen: pygame.Surface = None):
+        """Żaba drugiego gracza, komunikat oczekiwania i panel statystyk sieci (F4)."""
+        screen = screen or self.screen
+        net = self.net
+        if net.waiting:
+            text = self.font.render(net.status, True, YELLOW, BLACK)
+            screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - 20))
+        else:
+            remote = net.remote
+            if not remote.game_over:
+                remote.frog.draw(screen, self.quality.level)
+                label = self.font_tiny.render(f"P{2 - net.local_index}", True, CYAN)
+                screen.blit(label, (remote.frog.x + remote.frog.size // 2 - label.get_width() // 2,
+                                    remote.frog.y - 14))
+        if not net.stats_visible:
+            return
+        lines = net.stats_lines()
+        if not net.waiting:
+            frog = net.remote.frog
+            lines.append(f"P{2 - net.local_index}: score {frog.score}, lives {frog.lives}")
+        y = SCREEN_HEIGHT - 60 - len(lines) * 20
+        for line in lines:
+            text = self.font_tiny.render(line, True, CYAN, BLACK)
+            screen.blit(text, (10, y))
+            y += text.get_height() + 2
+    
+    def draw_ui(self, screen: pygame.Surface = None, frog: Frog = None, quality: int = None,
+                level: int = None):
         """Draws the user interface with enhanced graphics."""
+        screen = screen or self.screen
+        frog = frog or self.frog
+        quality = self.quality.level if quality is None else quality
+        level = self.world.level if level is None else level
+        
         # Panel tło
-        panel_surf = pygame.Surface((SCREEN_WIDTH, 45), pygame.SRCALPHA)
-        pygame.draw.rect(panel_surf, (0, 0, 0, 150), panel_surf.get_rect())
-        self.screen.blit(panel_surf, (0, 0))
+        panel_surf = SURFACE_POOL.cached(
+            ('fill', (0, 0, 0, 150)), (SCREEN_WIDTH, 45),
+            lambda s: s.fill((0, 0, 0, 150))
+        )
+        screen.blit(panel_surf, (0, 0))
         
         # Score and lives with glow
-        score_text = f"Score: {self.frog.score}  Lives: {self.frog.lives}"
+        score_text = f"Score: {frog.score}  Lives: {frog.lives}"
         
         # Glow effect
-        for offset in range(3, 0, -1):
+        for offset in range(min(3, GLOW_PASSES[quality]), 0, -1):
             glow = self.font.render(score_text, True, (100, 100, 0))
             glow.set_alpha(50)
-            self.screen.blit(glow, (10 + offset, 10 + offset))
+            screen.blit(glow, (10 + offset, 10 + offset))
         
         # Main text
         score_surf = self.font.render(score_text, True, GOLD)
-        self.screen.blit(score_surf, (10, 10))
+        screen.blit(score_surf, (10, 10))
         
         # Lives hearts
         heart_x = 220
-        for i in range(self.frog.lives):
+        for i in range(frog.lives):
             # Heart shape (simplified)
-            pygame.draw.circle(self.screen, RED, (heart_x + i * 25, 22), 6)
-            pygame.draw.circle(self.screen, RED, (heart_x + i * 25 + 10, 22), 6)
+            pygame.draw.circle(screen, RED, (heart_x + i * 25, 22), 6)
+            pygame.draw.circle(screen, RED, (heart_x + i * 25 + 10, 22), 6)
             points = [
                 (heart_x + i * 25 + 5, 26),
                 (heart_x + i * 25, 32),
                 (heart_x + i * 25 + 10, 32)
             ]
-            pygame.draw.polygon(self.screen, RED, points)
+            pygame.draw.polygon(screen, RED, points)
+        
+        # Level (only when the difficulty setting drives progression)
+        if self.world.progression:
+            level_surf = self.small_font.render(
+                f"Level {level} ({self.world.progression.difficulty.upper()})", True, LIGHT_GREEN)
+            screen.blit(level_surf, (SCREEN_WIDTH - level_surf.get_width() - 10, 15))
         
         # Author information
         author_text = self.small_font.render(
@@ -1248,8 +5512,8 @@ class Game:
             "polsoft.ITS™ London © 2026 Sebastian Januchowski", 
             True, BLACK
         )
-        self.screen.blit(author_shadow, author_rect.move(2, 2))
-        self.screen.blit(author_text, author_rect)
+        screen.blit(author_shadow, author_rect.move(2, 2))
+        screen.blit(author_text, author_rect)
         
         # Config file path (smaller font)
         config_path = str(CONFIG_FILE)
@@ -1260,63 +5524,15 @@ class Game:
             f"Config: {config_path}",
             True, DARK_GRAY
         )
-        self.screen.blit(config_text, (10, SCREEN_HEIGHT - 15))
-    
-    def check_collisions(self):
-        """Sprawdza kolizje żaby."""
-        if not self.frog:
-            return
-            
-        frog_rect = self.frog.get_rect()
-        
-        # Kolizja z pojazdami
-        for vehicle in self.vehicles:
-            if frog_rect.colliderect(vehicle.get_rect()):
-                self.particle_system.add_crash(
-                    self.frog.x + self.frog.size // 2,
-                    self.frog.y + self.frog.size // 2
-                )
-                self.frog.reset()
-                if self.frog.lives <= 0:
-                    self.end_game()
-                return
-        
-        # Sprawdź czy żaba jest w wodzie
-        if 50 <= self.frog.y < 250:
-            on_log = False
-            for log in self.logs:
-                if frog_rect.colliderect(log.get_rect()):
-                    on_log = True
-                    # Przesuń żabę z kłodą
-                    self.frog.x += log.speed * log.direction
-                    # Ogranicz pozycję żaby
-                    self.frog.x = max(0, min(self.frog.x, SCREEN_WIDTH - self.frog.size))
-                    break
-            
-            if not on_log:
-                self.particle_system.add_splash(
-                    self.frog.x + self.frog.size // 2,
-                    self.frog.y + self.frog.size // 2
-                )
-                self.frog.reset()
-                if self.frog.lives <= 0:
-                    self.end_game()
-                return
-        
-        # Sprawdź osiągnięcie mety
-        if self.frog.y < GRID_SIZE:
-            self.frog.score += 100
-            # Efekt sukcesu
-            for _ in range(30):
-                self.particle_system.add_hop(
-                    self.frog.x + self.frog.size // 2,
-                    self.frog.y + self.frog.size // 2
-                )
-            self.frog.x = self.frog.start_x
-            self.frog.y = self.frog.start_y
+        screen.blit(config_text, (10, SCREEN_HEIGHT - 15))
     
     def end_game(self):
         """Kończy grę i sprawdza czy wynik jest w top 5."""
+        if self.attract:
+            self.start_attract()  # Demo gra w pętli, bez wpisywania wyników
+            return
+        
+        self.save_replay()
         if self.score_manager.is_high_score(self.frog.score):
             self.state = "enter_name"
             self.input_active = True
@@ -1327,136 +5543,314 @@ class Game:
         """Zapisuje wynik gracza."""
         if self.player_name.strip():
             self.score_manager.add_score(self.player_name.strip(), self.frog.score)
+            if self.leaderboard:
+                self.leaderboard.publish(self.config_manager)
+        self.state = "game_over"
+        self.input_active = False
+    
+    def save_replay(self):
+        """Zapisuje replay ostatniej gry, jeśli podano ścieżkę (--save-replay)."""
+        if self.replay_path and self.replay:
+            self.run_io(self._write_replay, self.replay, self.replay_path)
+    
+    @staticmethod
+    def _write_replay(replay: Replay, path: Path):
+        try:
+            replay.save(path)
+            print(f"Replay saved: {path}")
+        except Exception as e:
+            print(f"Error saving replay: {e}")
+    
+    def run_io(self, func, *args):
+        """Wykonuje operację I/O w executorze (pętla asyncio) lub od razu."""
+        if self.io_executor is not None:
+            return self.io_executor.submit(func, *args)
+        func(*args)
+    
+    def toggle_capture(self):
+        """Włącza/wyłącza nagrywanie klatek do katalogu captures (F12)."""
+        if self.capture:
+            # close() czeka na zaległe klatki - w pętli asyncio poza klatką
+            self.run_io(self.capture.close)
+            self.capture = None
+            return
+        
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = CONFIG_FILE.parent / 'captures' / f'Frogger_{stamp}'
+        self.capture = FrameCapture(target, "png").start()
+        print(f"Capturing frames to: {target}")
+    
+    def move_frog(self, dx: int, dy: int):
+        """Przesuwa żabę, dodaje efekt skoku i zapisuje ruch w replayu."""
+        if self.replay:
+            self.replay.record(self.tick, dx, dy)
+        
+        self.world.move_frog(dx, dy)
+        if self.telemetry:
+            self.telemetry.emit('hop', self.tick, dx, dy, self.frog.x, self.frog.y)
+        
+        # Pył pojawia się za żabą (po przeciwnej stronie niż kierunek skoku)
+        if dy < 0:
+            hop_x, hop_y = self.frog.x + self.frog.size // 2, self.frog.y + self.frog.size
+        elif dy > 0:
+            hop_x, hop_y = self.frog.x + self.frog.size // 2, self.frog.y
+        elif dx < 0:
+            hop_x, hop_y = self.frog.x + self.frog.size, self.frog.y + self.frog.size // 2
+        else:
+            hop_x, hop_y = self.frog.x, self.frog.y + self.frog.size // 2
+        self.particle_system.add_hop(hop_x, hop_y)
+    
+    def emit_world_event(self, kind: str, x: float, y: float):
+        """Przekazuje zdarzenie z World.step() do telemetrii."""
+        if kind == 'goal':
+            self.telemetry.emit('goal', self.tick, self.frog.score, self.tick - self.attempt_start)
+        else:
+            cause = 'vehicle' if kind == 'crash' else 'water'
+            self.telemetry.emit('death', self.tick, cause, x, y, self.frog.lives)
+    
+    def _build_input_tables(self):
+        """Tabele obsługi klawiszy: klawisz -> funkcja(zdarzenie)."""
+        def move(dx, dy):
+            return lambda event: self.key_move(event, dx, dy)
+        
+        # Działają w każdym stanie
+        self.global_keys = {
+            pygame.K_F12: lambda event: self.toggle_capture(),  # Nagrywanie (do zgłoszeń błędów)
+            pygame.K_F3: lambda event: self.toggle_profiler(),
+            pygame.K_F9: lambda event: self.toggle_sampling(),
+            pygame.K_F4: lambda event: self.toggle_net_stats(),
+        }
+        self.key_bindings = {
+            'menu': {},
+            'playing': {
+                pygame.K_UP: move(0, -1),
+                pygame.K_DOWN: move(0, 1),
+                pygame.K_LEFT: move(-1, 0),
+                pygame.K_RIGHT: move(1, 0),
+                pygame.K_ESCAPE: self.leave_game,
+            },
+            'enter_name': {
+                pygame.K_RETURN: lambda event: self.save_score(),
+                pygame.K_BACKSPACE: self.erase_name_char,
+                pygame.K_ESCAPE: self.cancel_name,
+            },
+            'game_over': {
+                pygame.K_SPACE: lambda event: self.start_new_game(),
+                pygame.K_ESCAPE: self.back_to_menu,
+            },
+        }
+        # Klawisze spoza tabeli stanu
+        self.fallback_keys = {
+            'menu': self.menu_input,
+            'enter_name': self.type_name_char,
+        }
+        # Akcje zwracane przez Menu.handle_input()
+        self.menu_actions = {
+            'start': self.start_new_game,
+            'quality': self.cycle_quality,
+            'difficulty': self.cycle_difficulty,
+            'quit': self.quit,
+        }
+    
+    def key_move(self, event: pygame.event.Event, dx: int, dy: int):
+        """
+        Ruch z klawiatury - do bufora, wykonywany w apply_buffered_move().
+        
+        Czas naciśnięcia to atrybut `sent` zdarzenia (zdarzenia wstrzykiwane
+        przez tools/bench_latency.py), a dla prawdziwych klawiszy - chwila
+        odebrania zdarzenia z kolejki.
+        """
+        if len(self.input_buffer) >= INPUT_BUFFER_SIZE:
+            self.input_dropped += 1
+            return
+        sent = getattr(event, 'sent', None) or time.perf_counter()
+        self.input_buffer.append((dx, dy, sent))
+    
+    def apply_buffered_move(self) -> bool:
+        """Wykonuje najstarszy zbuforowany ruch - najwyżej jeden na tick."""
+        if not self.input_buffer or self._moved_at == self.tick:
+            return False
+        dx, dy, sent = self.input_buffer.popleft()
+        self._moved_at = self.tick
+        self.move_frog(dx, dy)
+        self.sim_latency.append((time.perf_counter() - sent) * 1000)
+        self.pending_moves.append((self.tick, sent))
+        return True
+    
+    def toggle_profiler(self):
+        self.profiler.visible = not self.profiler.visible
+    
+    def set_gc_mode(self, mode: str):
+        """Przełącza tryb odśmiecania (GCController.MODES)."""
+        self.gc.close()
+        self.gc = GCController(mode)
+    
+    def toggle_sampling(self):
+        if self.profile:
+            self.profile.toggle()
+    
+    def toggle_net_stats(self):
+        if self.net:
+            self.net.stats_visible = not self.net.stats_visible
+    
+    def leave_game(self, event: pygame.event.Event):
+        self.save_replay()
+        self.state = "menu"
+    
+    def back_to_menu(self, event: pygame.event.Event):
+        self.state = "menu"
+    
+    def erase_name_char(self, event: pygame.event.Event):
+        self.player_name = self.player_name[:-1]
+    
+    def type_name_char(self, event: pygame.event.Event):
+        if len(self.player_name) < 15 and event.unicode.isprintable():
+            self.player_name += event.unicode
+    
+    def cancel_name(self, event: pygame.event.Event):
         self.state = "game_over"
         self.input_active = False
     
+    def menu_input(self, event: pygame.event.Event):
+        action = self.menu_actions.get(self.menu.handle_input(event))
+        if action:
+            action()
+    
+    def cycle_quality(self):
+        self.quality.set_preset(self.quality.next_preset())
+        self.config_manager.set_setting('quality', self.quality.preset)
+    
+    def cycle_difficulty(self):
+        names = list(DIFFICULTIES)
+        self.difficulty = names[(names.index(self.difficulty) + 1) % len(names)]
+        self.config_manager.set_setting('difficulty', self.difficulty)
+    
+    def quit(self):
+        self.running = False
+    
     def handle_events(self):
         """Obsługuje zdarzenia pygame."""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            
-            # Menu
-            if self.state == "menu":
-                action = self.menu.handle_input(event)
-                if action == 'start':
-                    self.start_new_game()
-                elif action == 'quit':
-                    self.running = False
-            
-            # Wprowadzanie imienia
-            elif self.state == "enter_name":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        self.save_score()
-                    elif event.key == pygame.K_BACKSPACE:
-                        self.player_name = self.player_name[:-1]
-                    elif event.key == pygame.K_ESCAPE:
-                        self.state = "game_over"
-                        self.input_active = False
-                    elif len(self.player_name) < 15:
-                        if event.unicode.isprintable():
-                            self.player_name += event.unicode
-            
-            # Gra
-            elif self.state == "playing":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        self.frog.move(0, -1)
-                        self.particle_system.add_hop(
-                            self.frog.x + self.frog.size // 2,
-                            self.frog.y + self.frog.size
-                        )
-                    elif event.key == pygame.K_DOWN:
-                        self.frog.move(0, 1)
-                        self.particle_system.add_hop(
-                            self.frog.x + self.frog.size // 2,
-                            self.frog.y
-                        )
-                    elif event.key == pygame.K_LEFT:
-                        self.frog.move(-1, 0)
-                        self.particle_system.add_hop(
-                            self.frog.x + self.frog.size,
-                            self.frog.y + self.frog.size // 2
-                        )
-                    elif event.key == pygame.K_RIGHT:
-                        self.frog.move(1, 0)
-                        self.particle_system.add_hop(
-                            self.frog.x,
-                            self.frog.y + self.frog.size // 2
-                        )
-                    elif event.key == pygame.K_ESCAPE:
-                        self.state = "menu"
-            
-            # Koniec gry
-            elif self.state == "game_over":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        self.start_new_game()
-                    elif event.key == pygame.K_ESCAPE:
-                        self.state = "menu"
+            self.dispatch(event)
+    
+    def dispatch(self, event: pygame.event.Event):
+        """Przekazuje zdarzenie do funkcji z tabel klawiszy."""
+        if event.type == pygame.QUIT:
+            self.running = False
+            return
+        if event.type in (pygame.WINDOWHIDDEN, pygame.WINDOWMINIMIZED):
+            self.window_visible = False
+        elif event.type in (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWEXPOSED):
+            self.window_visible = True
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.window_focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.window_focused = True
+        if event.type != pygame.KEYDOWN:
+            return
+        
+        self.last_input = pygame.time.get_ticks()
+        # Dowolny klawisz przerywa tryb demo
+        if self.attract:
+            self.stop_attract()
+            return
+        
+        handler = (self.global_keys.get(event.key)
+                   or self.key_bindings[self.state].get(event.key)
+                   or self.fallback_keys.get(self.state))
+        if handler:
+            handler(event)
     
     def update(self):
         """Aktualizuje stan gry."""
+        if (self.state == "menu" and self.menu.state == "main" and self.window_visible
+                and not self.net and pygame.time.get_ticks() - self.last_input > ATTRACT_DELAY_MS):
+            self.start_attract()
+        
+        if self.state == "playing" and self.net and self.net.waiting:
+            # Mecz sieciowy czeka na drugiego gracza
+            self.net.step()
+            self.world = self.net.local
+            return
+        
         if self.state == "playing":
-            for vehicle in self.vehicles:
-                vehicle.update()
-            
-            for log in self.logs:
-                log.update()
+            self.apply_buffered_move()
+            agent = self.attract_agent if self.attract else self.autoplay
+            if agent:
+                move = agent.act(self.world)
+                if move:
+                    self.move_frog(*move)
             
-            if self.frog:
-                self.frog.update()
+            if self.net:
+                events = self.net.step()
+                self.world = self.net.local
+            else:
+                events = self.world.step()
+            if self.world.tall:
+                self.follow_frog()
             
             self.water_effect.update()
             self.particle_system.update()
-            self.check_collisions()
+            
+            # Efekty dla zdarzeń z symulacji
+            for kind, x, y in events:
+                if kind == 'crash':
+                    self.particle_system.add_crash(x, y)
+                elif kind == 'splash':
+                    self.particle_system.add_splash(x, y)
+                elif kind == 'goal':
+                    for _ in range(30):
+                        self.particle_system.add_hop(x, y)
+                if self.telemetry:
+                    self.emit_world_event(kind, x, y)
+                self.attempt_start = self.tick
+            
+            if self.net.finished if self.net else self.world.game_over:
+                self.end_game()
+    
+    NAME_FIELD = pygame.Rect(SCREEN_WIDTH // 2 - 200, 360, 400, 60)
     
-    def draw_name_input(self):
-        """Draws the name input screen with enhanced graphics."""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        pygame.draw.rect(overlay, (0, 0, 0, 220), overlay.get_rect())
-        self.screen.blit(overlay, (0, 0))
+    def draw_name_input(self, screen: pygame.Surface = None):
+        """Draws the static part of the name input screen (see draw_name_field)."""
+        screen = screen or self.screen
+        overlay = SURFACE_POOL.cached(
+            ('fill', (0, 0, 0, 220)), (SCREEN_WIDTH, SCREEN_HEIGHT),
+            lambda s: s.fill((0, 0, 0, 220))
+        )
+        screen.blit(overlay, (0, 0))
         
         # Congratulations with glow
-        for offset in range(5, 0, -1):
+        for offset in range(GLOW_PASSES[self.quality.level], 0, -1):
             congrats_glow = self.font.render("NEW HIGH SCORE!", True, 
                                            (255 - offset * 30, 215 - offset * 30, 0))
             congrats_glow.set_alpha(50)
-            self.screen.blit(congrats_glow, 
+            screen.blit(congrats_glow, 
                            (SCREEN_WIDTH // 2 - congrats_glow.get_width() // 2, 
                             150 + offset))
         
         congrats = self.font.render("NEW HIGH SCORE!", True, GOLD)
-        self.screen.blit(congrats, 
+        screen.blit(congrats, 
                         (SCREEN_WIDTH // 2 - congrats.get_width() // 2, 150))
         
         score_text = self.font.render(f"Your score: {self.frog.score}", True, WHITE)
-        self.screen.blit(score_text,
+        screen.blit(score_text,
                         (SCREEN_WIDTH // 2 - score_text.get_width() // 2, 220))
         
         # Input field
         prompt = self.font.render("Enter your name:", True, WHITE)
-        self.screen.blit(prompt,
+        screen.blit(prompt,
                         (SCREEN_WIDTH // 2 - prompt.get_width() // 2, 300))
         
         # Text field frame with glow
-        input_rect = pygame.Rect(SCREEN_WIDTH // 2 - 200, 360, 400, 60)
+        input_rect = self.NAME_FIELD
         
         # Glow
         for offset in range(3, 0, -1):
-            pygame.draw.rect(self.screen, (255, 255, 255, 50), 
+            pygame.draw.rect(screen, (255, 255, 255, 50), 
                            input_rect.inflate(offset * 2, offset * 2), offset)
         
         # Main frame
-        pygame.draw.rect(self.screen, WHITE, input_rect, 3)
-        
-        # Text entered by user
-        cursor_visible = (pygame.time.get_ticks() // 500) % 2 == 0
-        name_display = self.player_name + ("|" if cursor_visible and self.input_active else "")
-        name_text = self.input_font.render(name_display, True, YELLOW)
-        self.screen.blit(name_text,
-                        (input_rect.x + 10, input_rect.y + 10))
+        pygame.draw.rect(screen, WHITE, input_rect, 3)
         
         # Instructions
         instructions = [
@@ -1468,21 +5862,33 @@ class Game:
         y_pos = 470
         for instruction in instructions:
             text = self.small_font.render(instruction, True, LIGHT_GREEN)
-            self.screen.blit(text,
+            screen.blit(text,
                            (SCREEN_WIDTH // 2 - text.get_width() // 2, y_pos))
             y_pos += 35
     
-    def draw_game_over(self):
+    def draw_name_field(self, screen: pygame.Surface = None):
+        """Draws the typed name and the blinking cursor."""
+        screen = screen or self.screen
+        cursor_visible = (pygame.time.get_ticks() // 500) % 2 == 0
+        name_display = self.player_name + ("|" if cursor_visible and self.input_active else "")
+        if self._name_text[0] != name_display:
+            self._name_text = (name_display, self.input_font.render(name_display, True, YELLOW))
+        screen.blit(self._name_text[1], (self.NAME_FIELD.x + 10, self.NAME_FIELD.y + 10))
+    
+    def draw_game_over(self, screen: pygame.Surface = None):
         """Draws the game over screen with enhanced graphics."""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        pygame.draw.rect(overlay, (0, 0, 0, 200), overlay.get_rect())
-        self.screen.blit(overlay, (0, 0))
+        screen = screen or self.screen
+        overlay = SURFACE_POOL.cached(
+            ('fill', (0, 0, 0, 200)), (SCREEN_WIDTH, SCREEN_HEIGHT),
+            lambda s: s.fill((0, 0, 0, 200))
+        )
+        screen.blit(overlay, (0, 0))
         
         # Game over text with glow
-        for offset in range(5, 0, -1):
+        for offset in range(GLOW_PASSES[self.quality.level], 0, -1):
             glow = self.font.render("GAME OVER!", True, (255 - offset * 30, 0, 0))
             glow.set_alpha(50)
-            self.screen.blit(glow, 
+            screen.blit(glow, 
                            (SCREEN_WIDTH // 2 - glow.get_width() // 2, 
                             250 + offset))
         
@@ -1493,75 +5899,590 @@ class Game:
             True, WHITE
         )
         
-        self.screen.blit(game_over_text, 
+        screen.blit(game_over_text, 
                        (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 250))
-        self.screen.blit(score_text, 
+        screen.blit(score_text, 
                        (SCREEN_WIDTH // 2 - score_text.get_width() // 2, 310))
-        self.screen.blit(restart_text, 
+        screen.blit(restart_text, 
                        (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, 380))
     
+    def frozen_frame(self) -> pygame.Surface:
+        """
+        Ostatnia klatka rozgrywki z nałożoną statyczną częścią nakładki.
+        
+        W stanach enter_name i game_over świat stoi, więc plansza, cząsteczki,
+        półprzezroczysta nakładka i napisy są składane raz (przy wejściu w
+        stan, zmianie wyniku lub jakości) na powierzchni używanej ponownie;
+        co klatkę jest tylko kopiowana na ekran.
+        """
+        key = (self.state, self.world, self.tick, self.frog.score, self.quality.level)
+        if self._frozen_key != key:
+            self._frozen_key = key
+            if self._frozen is None:
+                self._frozen = self.screen.copy()
+            self.draw_playfield(self._frozen)
+            if self.state == "enter_name":
+                self.draw_name_input(self._frozen)
+            else:
+                self.draw_game_over(self._frozen)
+            self.overlay_builds += 1
+        return self._frozen
+    
     def draw(self):
         """Rysuje wszystkie elementy gry."""
+        quality = self.quality.level
+        
         if self.state == "menu":
+            self.menu.quality = quality
+            self.menu.quality_label = self.quality.label
+            self.menu.difficulty_label = self.difficulty.upper()
             self.menu.draw()
         
         elif self.state == "playing":
-            self.screen.fill(BLACK)
-            self.draw_background()
-            
-            # Rysuj obiekty
-            for vehicle in self.vehicles:
-                vehicle.draw(self.screen)
-            
-            for log in self.logs:
-                log.draw(self.screen)
-            
-            # Rysuj cząsteczki za żabą
-            self.particle_system.draw(self.screen)
-            
-            self.frog.draw(self.screen)
+            self.draw_playfield(self.screen)
+            if self.net:
+                self.draw_net()
             self.draw_ui()
         
         elif self.state == "enter_name":
-            # Rysuj grę w tle
-            self.screen.fill(BLACK)
-            self.draw_background()
-            for vehicle in self.vehicles:
-                vehicle.draw(self.screen)
-            for log in self.logs:
-                log.draw(self.screen)
-            self.particle_system.draw(self.screen)
-            self.frog.draw(self.screen)
-            
-            # Nakładka z wprowadzaniem imienia
-            self.draw_name_input()
+            # Zamrożona gra z nakładką, na niej tylko wpisywane imię
+            self.screen.blit(self.frozen_frame(), (0, 0))
+            self.draw_name_field()
         
         elif self.state == "game_over":
-            # Rysuj grę w tle
-            self.screen.fill(BLACK)
-            self.draw_background()
-            for vehicle in self.vehicles:
-                vehicle.draw(self.screen)
-            for log in self.logs:
-                log.draw(self.screen)
-            self.particle_system.draw(self.screen)
-            self.frog.draw(self.screen)
-            
-            # Nakładka z końcem gry
-            self.draw_game_over()
+            self.screen.blit(self.frozen_frame(), (0, 0))
+        
+        if self.capture:
+            self.capture.capture(self.screen)
+        
+        self.profiler.draw(self.screen, self.small_font)
+        
+        if not self.headless:
+            pygame.display.flip()
+        self.frame_presented(self.tick)
+    
+    def follow_frog(self):
+        """Przesuwa kamerę wysokiej planszy w stronę żaby (w granicach planszy)."""
+        world = self.world
+        target = world.frog.y + GRID_SIZE // 2 - SCREEN_HEIGHT // 2
+        target = max(0, min(target, world.height - SCREEN_HEIGHT))
+        distance = target - self.camera_y
+        if abs(distance) < 1 or abs(distance) > SCREEN_HEIGHT:
+            self.camera_y = float(target)  # Dojechała albo skok (meta, śmierć) - bez przewijania
+        else:
+            self.camera_y += distance * CAMERA_FOLLOW
+    
+    def scene_view(self) -> tuple:
+        """
+        (żaba, pojazdy, kłody, cząsteczki) wysokiej planszy w układzie kamery.
+        
+        Tylko pasy w widoku (World.entity_positions z zakresem) - jako kopie
+        obiektów tworzone raz na grę, którym co klatkę ustawiane są pozycje.
+        """
+        top = int(self.camera_y)
+        views = self._views
+        vehicles, logs = [], []
+        for entity, x in self.world.entity_positions(top, top + SCREEN_HEIGHT):
+            view = views.get(entity)
+            if view is None:
+                view = views[entity] = copy.copy(entity)
+            view.x, view.y = x, entity.y - top
+            (logs if isinstance(entity, Log) else vehicles).append(view)
+        frog = copy.copy(self.frog)
+        frog.y -= top
+        particles = tuple((x, y - top, *rest) for x, y, *rest in self.particle_system.snapshot())
+        return frog, vehicles, logs, particles
+    
+    def draw_playfield(self, screen: pygame.Surface):
+        """Plansza bieżącej gry (na wysokiej planszy - widok kamery)."""
+        if self.world.tall:
+            self.draw_scene(screen, *self.scene_view(), camera=int(self.camera_y))
+        else:
+            self.draw_scene(screen, self.frog, self.vehicles, self.logs)
+    
+    def draw_scene(self, screen: pygame.Surface, frog: Frog, vehicles: List[Vehicle],
+                   logs: List[Log], particles: tuple = None,
+                   water: WaterEffect = None, quality: int = None, camera: int = None):
+        """
+        Rysuje planszę: tło, pojazdy, kłody, cząsteczki i żabę (bez nakładek).
+        
+        particles to ParticleSystem.snapshot() albo None (bieżące cząsteczki).
+        camera (wysoka plansza) to y górnej krawędzi widoku - tło jest
+        rysowane dla widocznych odcinków, obiekty muszą być już przesunięte.
+        """
+        quality = self.quality.level if quality is None else quality
+        screen.fill(BLACK)
+        if camera is None:
+            self.draw_background(screen, water, quality)
+        else:
+            last = (self.world.height - GRID_SIZE) // LEVEL_SECTION - 1
+            for section in range(max(0, (camera - GRID_SIZE) // LEVEL_SECTION),
+                                 min(last, (camera + SCREEN_HEIGHT) // LEVEL_SECTION) + 1):
+                self.draw_background(screen, water, quality, section * LEVEL_SECTION - camera,
+                                     goal=section == 0)
+        
+        for vehicle in vehicles:
+            vehicle.draw(screen, quality)
+        
+        for log in logs:
+            log.draw(screen, quality)
+        
+        # Cząsteczki za żabą
+        if particles is None:
+            self.particle_system.draw(screen)
+        else:
+            ParticleSystem.draw_snapshot(screen, particles)
+        
+        frog.draw(screen, quality)
+    
+    def snapshot(self) -> FrameSnapshot:
+        """Niezmienny stan bieżącej klatki dla RenderPipeline."""
+        layout = (self.world, self.world.layout_version)
+        if self._scene_layout != layout:
+            # Kopie obiektów do rysowania - raz na grę (w trybie 'stream' po
+            # każdej zmianie zbioru obiektów), potem tylko pozycje
+            self._scene_layout = layout
+            self._scene = (copy.copy(self.frog),
+                           tuple(copy.copy(v) for v in self.vehicles),
+                           tuple(copy.copy(log) for log in self.logs))
+        
+        frog = self.frog
+        return FrameSnapshot(
+            self.tick, self._scene,
+            (frog.x, frog.y, frog.direction, frog.hop_height, frog.lives, frog.score),
+            self.world.level,
+            tuple(v.x for v in self.vehicles),
+            tuple(log.x for log in self.logs),
+            self.particle_system.snapshot(),
+            self.water_effect.time,
+            self.quality.level,
+            time.perf_counter(),
+        )
+    
+    def present(self):
+        """Wyświetla ostatnią klatkę narysowaną przez RenderPipeline."""
+        snapshot = self.pipeline.present(self.screen)
+        if snapshot is None:
+            return
+        if self.capture:
+            self.capture.capture(self.screen)
+        if not self.headless:
+            pygame.display.flip()
+        self.frame_presented(snapshot.tick)
+    
+    def frame_presented(self, tick: int):
+        """Zamyka pomiary opóźnienia ruchów widocznych już na ekranie."""
+        now = time.perf_counter()
+        while self.pending_moves and self.pending_moves[0][0] < tick:
+            _, sent = self.pending_moves.popleft()
+            self.input_latency.append((now - sent) * 1000)
+    
+    def latency_stats(self) -> Dict:
+        """Percentyle opóźnień klawisz -> ruch w World i klawisz -> klatka (ms)."""
+        def pct(values, fraction):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+        return {
+            'moves': len(self.input_latency),
+            'sim_p50': pct(self.sim_latency, 0.5),
+            'frame_p50': pct(self.input_latency, 0.5),
+            'frame_p95': pct(self.input_latency, 0.95),
+            'dropped': self.input_dropped,
+        }
+    
+    def latency_summary(self) -> str:
+        """Mediana i 95. percentyl opóźnień klawisz -> ruch żaby."""
+        stats = self.latency_stats()
+        return (f"Input latency: {stats['moves']} moves, "
+                f"key->sim p50 {stats['sim_p50']:.1f} ms, "
+                f"key->frame p50 {stats['frame_p50']:.1f} ms, "
+                f"p95 {stats['frame_p95']:.1f} ms (target {INPUT_LATENCY_TARGET_MS:.0f} ms), "
+                f"{stats['dropped']} dropped")
+    
+    def frame(self):
+        """Jedna klatka: zdarzenia, logika, rysowanie i pomiar czasu."""
+        if self.profile:
+            self.profile.begin_frame(self.state)
+        frame_start = self._frame_start = time.perf_counter()
+        self.handle_events()
+        self.update()
+        piped = self.pipeline is not None and self.state == "playing"
+        if piped:
+            self.pipeline.publish(self.snapshot())
+            self.present()
+        else:
+            if self.pipeline:
+                self.pipeline.wait_idle()
+            self.draw()
+        self.gc.update(self.state, self.world)
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        self.profiler.end_frame(frame_ms)
+        # Jakość steruje czasem rysowania - w potoku mierzy go wątek rysujący
+        self.quality.record(self.pipeline.render_ms if piped else frame_ms)
+        if self.telemetry and frame_ms > self.quality.budget_ms * 1.5:
+            self.telemetry.emit('frame_spike', self.tick, frame_ms, self.quality.budget_ms, self.quality.level)
+        self.particle_system.max_particles = PARTICLE_CAPS[self.quality.level]
+        if self.profile:
+            self.profile.end_frame()
+        if STARTUP_PROBE:
+            print("FROGGER_FIRST_FRAME", flush=True)
+            self.running = False
+    
+    def shutdown(self):
+        """Zamyka nagrywanie, wypisuje profil i zamyka pygame."""
+        if self.pipeline:
+            self.pipeline.close()
+            print(f"Render pipeline: {self.pipeline.rendered} frames rendered, "
+                  f"{self.pipeline.skipped} snapshots skipped")
+            self.pipeline = None
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+        if self.leaderboard:
+            self.leaderboard.close()
+            self.leaderboard = None
+        if self.telemetry:
+            self.telemetry.close()
+            self.telemetry = None
+        if self.trajectory:
+            self.trajectory.close()
+            self.trajectory = None
+        if self.profile:
+            self.profile.save()
+            self.profile = None
+        if self.net:
+            print(self.net.summary())
+            self.net.close()
+            self.net = None
+        print(self.profiler.summary())
+        print(self.gc.summary())
+        if self.input_latency:
+            print(self.latency_summary())
+        self.gc.close()
+        pygame.quit()
+    
+    def idle_timeout(self) -> Optional[int]:
+        """Ile ms pętla może czekać na zdarzenie zamiast rysować (None - pełne tempo)."""
+        if not self.idle_throttle or self.state == "playing":
+            return None
+        if not (self.window_visible and self.window_focused):
+            return IDLE_WAIT_MS
+        if self.state == "enter_name":
+            return 500 - pygame.time.get_ticks() % 500  # Do następnego mignięcia kursora
+        if self.state == "game_over" or self.menu.state != "main":
+            return IDLE_WAIT_MS  # TOP 5, HELP, koniec gry - nic się nie rusza
+        if pygame.time.get_ticks() - self.last_input > MENU_IDLE_MS:
+            return 1000 // IDLE_MENU_FPS
+        return None
+    
+    def _wait_idle(self, timeout: int):
+        """Czeka na zdarzenie najwyżej `timeout` ms; zdarzenie obsługuje od razu."""
+        event = pygame.event.wait(max(1, timeout))
+        if event.type != pygame.NOEVENT:
+            self.dispatch(event)
+        self.clock.tick()
+        self._deadline = time.perf_counter()
+    
+    def pace(self):
+        """Czeka na termin następnej klatki według self.pacing."""
+        self.gc.use_slack((self._frame_start + 1.0 / FPS - time.perf_counter()) * 1000)
+        timeout = self.idle_timeout()
+        if timeout is not None:
+            self._wait_idle(timeout)
+        elif self.pacing == "busy":
+            self.clock.tick_busy_loop(FPS)
+        elif self.pacing == "wake" and self.pipeline is None:
+            self._wait_for_frame()
+        else:
+            self.clock.tick(FPS)
+    
+    def _wait_for_frame(self):
+        """
+        Tryb 'wake': zamiast spać do terminu klatki czeka na zdarzenia.
+        
+        Klawisz odebrany w trakcie czekania jest obsługiwany od razu, a gdy
+        daje ruch żaby, ruch jest wykonywany i klatka rysowana natychmiast
+        (bez kroku symulacji - ten nadal następuje w terminie), zamiast
+        czekać na koniec uśpienia.
+        """
+        frame_time = 1.0 / FPS
+        now = time.perf_counter()
+        self._deadline += frame_time
+        if self._deadline < now - frame_time:
+            self._deadline = now + frame_time  # Spóźnienie - nie nadrabiaj klatek seriami
         
-        pygame.display.flip()
+        while self.running:
+            remaining = self._deadline - time.perf_counter()
+            if remaining * 1000 < 1:
+                if remaining > 0:
+                    time.sleep(remaining)
+                break
+            event = pygame.event.wait(int(remaining * 1000))
+            if event.type == pygame.NOEVENT:
+                continue
+            self.dispatch(event)
+            if self.state == "playing" and self.apply_buffered_move():
+                self.draw()
+                # Ruch z ticka `tick` jest już na ekranie
+                self.frame_presented(self.tick + 1)
+        self.clock.tick()
     
     def run(self):
         """Główna pętla gry."""
+        self._deadline = time.perf_counter()
         while self.running:
-            self.handle_events()
+            self.frame()
+            self.pace()
+        
+        self.shutdown()
+        sys.exit()
+    
+    async def run_async(self):
+        """
+        Pętla gry jako korutyna asyncio.
+        
+        Klatki są taktowane przez pętlę zdarzeń (asyncio.sleep do terminu
+        następnej klatki zamiast blokującego clock.tick), a zapisy plików
+        trafiają do jednowątkowego executora - kolejność zapisów zostaje
+        zachowana, a żaden z nich nie opóźnia klatki. Host asyncio może
+        uruchomić grę jako zadanie: asyncio.create_task(game.run_async());
+        ustawienie game.running = False kończy pętlę bez sys.exit().
+        """
+        # Tylko dla --asyncio - import nie obciąża startu zwykłej pętli
+        import asyncio
+        import concurrent.futures
+        loop = asyncio.get_running_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="frogger-io")
+        self.io_executor = executor
+        self.config_manager.io_executor = executor
+        
+        frame_time = 1.0 / FPS
+        deadline = time.perf_counter()
+        try:
+            while self.running:
+                self.frame()
+                deadline += frame_time
+                delay = deadline - time.perf_counter()
+                if delay < -frame_time:
+                    deadline = time.perf_counter()  # Spóźnienie - nie nadrabiaj klatek seriami
+                idle = self.idle_timeout()
+                if idle is not None:
+                    # Bez pygame.event.wait (zablokowałby pętlę zdarzeń) - krótkie
+                    # uśpienie, żeby klawisz w menu nadal działał szybko
+                    delay = max(delay, min(idle, 1000 // IDLE_MENU_FPS) / 1000)
+                    deadline = time.perf_counter() + delay
+                self.gc.use_slack(delay * 1000)
+                # sleep(0) oddaje sterowanie innym zadaniom hosta także przy spóźnieniu
+                await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+        finally:
+            self.io_executor = None
+            self.config_manager.io_executor = None
+            await loop.run_in_executor(None, executor.shutdown)
+            self.shutdown()
+    
+    def play_replay(self, replay: Replay, tail_frames: int = FPS) -> int:
+        """
+        Odtwarza replay klatka po klatce bez czekania na zegar.
+        
+        Ruchy są wstrzykiwane przed aktualizacją o zapisanym numerze ticka,
+        a każda klatka trafia do self.capture (jeśli ustawione). Po końcu
+        gry renderowane jest jeszcze `tail_frames` klatek ekranu końcowego.
+        Zwraca liczbę wyrenderowanych klatek.
+        """
+        moves = replay.moves_by_tick()
+        self.traffic = replay.traffic
+        self.difficulty = replay.difficulty
+        self.level_screens = replay.screens
+        self.collision_mode = replay.collision_mode
+        self.start_new_game(replay.seed)
+        self.replay = None  # Nie nagrywaj odtwarzanych ruchów ponownie
+        frames = 0
+        
+        while self.state == "playing" and self.tick <= replay.length + FPS * 10:
+            if self.profile:
+                self.profile.begin_frame(self.state)
+            for dx, dy in moves.get(self.tick, ()):
+                self.move_frog(dx, dy)
             self.update()
             self.draw()
-            self.clock.tick(FPS)
+            frames += 1
+            if self.profile:
+                self.profile.end_frame()
         
-        pygame.quit()
-        sys.exit()
+        for _ in range(tail_frames):
+            if self.profile:
+                self.profile.begin_frame(self.state)
+            self.draw()
+            frames += 1
+            if self.profile:
+                self.profile.end_frame()
+        return frames
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Parses command line options."""
+    parser = argparse.ArgumentParser(description="Frogger - Enhanced Graphics Edition")
+    
+    capture = parser.add_argument_group("capture / replay")
+    capture.add_argument("--capture", type=Path, metavar="PATH",
+                         help="capture frames to PATH (directory for png, file for raw)")
+    capture.add_argument("--capture-format", choices=FrameCapture.FORMATS, default="png",
+                         help="frame sink (default: png)")
+    capture.add_argument("--capture-cmd", metavar="CMD",
+                         help="encoder command for --capture-format pipe; "
+                              "{width}, {height} and {fps} are substituted")
+    capture.add_argument("--capture-every", type=int, default=1, metavar="N",
+                         help="keep every N-th frame")
+    capture.add_argument("--capture-scale", type=float, default=1.0, metavar="F",
+                         help="scale captured frames by F")
+    capture.add_argument("--replay", type=Path, metavar="FILE",
+                         help="render a recorded replay offscreen (no window) and exit")
+    capture.add_argument("--save-replay", type=Path, metavar="FILE",
+                         help="write the replay of the last played game to FILE")
+    
+    parser.add_argument("--autoplay", action="store_true",
+                        help="let the built-in planner play every game")
+    leaderboard = parser.add_argument_group("leaderboard")
+    leaderboard.add_argument("--leaderboard-port", type=int, metavar="PORT",
+                             help="serve scores and statistics as JSON over HTTP on PORT")
+    leaderboard.add_argument("--leaderboard-host", default="127.0.0.1", metavar="HOST",
+                             help="address to bind (default: 127.0.0.1; 0.0.0.0 for the venue LAN)")
+    leaderboard.add_argument("--cabinet", metavar="NAME",
+                             help="cabinet name in the export (default: host name)")
+    
+    telemetry = parser.add_argument_group("telemetry")
+    telemetry.add_argument("--telemetry", type=Path, metavar="FILE",
+                           help="append gameplay and frame-spike events to FILE")
+    telemetry.add_argument("--telemetry-format", choices=Telemetry.FORMATS, default="ndjson",
+                           help="event log format (default: ndjson)")
+    telemetry.add_argument("--trajectory", type=Path, metavar="FILE",
+                           help="record every game tick by tick to FILE (fixed-record binary)")
+    telemetry.add_argument("--trajectory-compression", choices=[c for c in Trajectory.COMPRESSIONS if c],
+                           help="compress the trajectory in chunks (smaller, no memory mapping)")
+    
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument("--profile", type=Path, metavar="FILE",
+                           help="profile frames with cProfile; writes pstats to FILE "
+                                "and collapsed stacks (flamegraph) to FILE.collapsed")
+    profiling.add_argument("--trace-alloc", type=Path, metavar="FILE",
+                           help="trace allocations with tracemalloc; writes the top "
+                                "allocation sites to FILE")
+    profiling.add_argument("--profile-frames", type=int, default=0, metavar="N",
+                           help="stop sampling after N frames (default: until exit)")
+    profiling.add_argument("--profile-states", nargs="+", metavar="STATE",
+                           choices=["menu", "playing", "game_over", "enter_name"],
+                           help="sample only frames in these game states")
+    profiling.add_argument("--profile-paused", action="store_true",
+                           help="start with sampling paused (F9 toggles it)")
+    
+    netplay = parser.add_argument_group("netplay (two players, one per machine)")
+    netplay.add_argument("--host", type=int, nargs="?", const=NET_PORT, metavar="PORT",
+                         help=f"host a two-player match on UDP PORT (default: {NET_PORT})")
+    netplay.add_argument("--host-bind", default="0.0.0.0", metavar="ADDRESS",
+                         help="address the host binds to (default: 0.0.0.0)")
+    netplay.add_argument("--join", metavar="HOST[:PORT]",
+                         help="join a match hosted with --host")
+    netplay.add_argument("--net-latency", type=float, default=0.0, metavar="MS",
+                         help="with --join: add MS of one-way delay through a local relay")
+    netplay.add_argument("--net-jitter", type=float, default=0.0, metavar="MS",
+                         help="with --join: random ± MS on top of --net-latency")
+    netplay.add_argument("--net-loss", type=float, default=0.0, metavar="P",
+                         help="with --join: drop each packet with probability P")
+    
+    parser.add_argument("--threaded-render", action="store_true",
+                        help="draw gameplay frames on a separate thread from immutable snapshots")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="run the game loop on asyncio with file I/O in a background executor")
+    parser.add_argument("--no-idle-throttle", action="store_true",
+                        help="redraw menus and static screens at full frame rate")
+    parser.add_argument("--pacing", choices=Game.PACING_MODES, default="sleep",
+                        help="frame pacing: sleep (least CPU), busy (tick_busy_loop) or wake "
+                             "(handle keys during the wait for lower input latency)")
+    parser.add_argument("--gc", choices=GCController.MODES, default="default",
+                        help="garbage collection: default, tuned (thresholds + freeze after "
+                             "loading) or manual (no automatic GC while playing)")
+    parser.add_argument("--collisions", choices=World.COLLISION_MODES, default="poll",
+                        help="collision detection: per-frame polling, analytic events or "
+                             "periodic lane occupancy tables (wrap traffic, single-screen levels)")
+    parser.add_argument("--traffic", choices=World.TRAFFIC_MODES, default="wrap",
+                        help="lane traffic: fixed wraparound objects or spawned streams")
+    parser.add_argument("--level-screens", type=int, default=1, metavar="N",
+                        help="tall scrolling level N screens high (wrap traffic, single player)")
+    
+    return parser.parse_args(argv)
+
+
+def create_capture(args: argparse.Namespace, drop_frames: bool = True) -> FrameCapture:
+    """Creates a FrameCapture from command line options (or None)."""
+    if args.capture is None and args.capture_format != "pipe":
+        return None
+    size = (int(SCREEN_WIDTH * args.capture_scale), int(SCREEN_HEIGHT * args.capture_scale))
+    return FrameCapture(args.capture, args.capture_format, size,
+                        command=args.capture_cmd, every=args.capture_every,
+                        drop_frames=drop_frames)
+
+
+def create_profile(args: argparse.Namespace) -> ProfileSession:
+    """Creates a ProfileSession from command line options (or None)."""
+    if args.profile is None and args.trace_alloc is None:
+        return None
+    return ProfileSession(args.profile, args.trace_alloc, args.profile_frames,
+                          args.profile_states, args.profile_paused)
+
+
+def create_net(args: argparse.Namespace) -> NetPeer:
+    """Creates a NetHost / NetClient from command line options (or None)."""
+    if args.host is not None:
+        net = NetHost(args.host_bind, args.host)
+        print(f"Netplay: hosting on UDP port {net.port}")
+        return net
+    if not args.join:
+        return None
+    address, _, port = args.join.partition(":")
+    target = (address, int(port or NET_PORT))
+    shim = None
+    if args.net_latency or args.net_jitter or args.net_loss:
+        shim = NetShim(target, latency_ms=args.net_latency, jitter_ms=args.net_jitter,
+                       loss=args.net_loss).start()
+        print(f"Netplay: relaying through 127.0.0.1:{shim.port} "
+              f"({args.net_latency:g} ± {args.net_jitter:g} ms, {args.net_loss:.0%} loss)")
+        target = ("127.0.0.1", shim.port)
+    return NetClient(target, shim)
+
+
+def table_fallback(collisions: str, traffic: str, screens: int = 1) -> str:
+    """Collision mode for the given traffic and level height ('table' needs wrap traffic, one screen)."""
+    if collisions == "table" and traffic != "wrap":
+        print("--collisions table needs --traffic wrap; using poll")
+        return "poll"
+    if collisions == "table" and screens > 1:
+        print("--collisions table is not supported on tall levels; using poll")
+        return "poll"
+    return collisions
+
+
+def export_replay(args: argparse.Namespace):
+    """Renders a replay offscreen into the configured capture target (or only profiles it)."""
+    replay = Replay.load(args.replay)
+    game = Game(headless=True)
+    game.capture = create_capture(args, drop_frames=False)
+    game.profile = create_profile(args)
+    if game.capture is None and game.profile is None:
+        print("Nothing to do: --replay requires --capture PATH (or --capture-format pipe), "
+              "--profile FILE or --trace-alloc FILE")
+        return
+    
+    if game.capture:
+        game.capture.start()
+    start = time.perf_counter()
+    frames = game.play_replay(replay)
+    elapsed = time.perf_counter() - start
+    if game.capture:
+        game.capture.close()
+    if game.profile:
+        game.profile.save()
+    print(f"Rendered {frames} frames in {elapsed:.1f}s "
+          f"({frames / max(elapsed, 1e-9):.0f} fps)")
 
 
 def main():
@@ -1570,6 +6491,11 @@ def main():
     
     Displays information about the author and starts Frogger.
     """
+    args = parse_args()
+    if args.replay:
+        export_replay(args)
+        return
+    
     print("=" * 60)
     print("FROGGER - Classic Street Crossing Game (Enhanced Graphics)")
     print("=" * 60)
@@ -1592,6 +6518,10 @@ def main():
     print("\n  GAME:")
     print("    ↑↓←→ - Move frog")
     print("    ESC - Back to menu")
+    print("    F3 - Frame profiler overlay")
+    print("    F4 - Netplay statistics (--host / --join)")
+    print("    F9 - Pause/resume --profile / --trace-alloc sampling")
+    print("    F12 - Start/stop frame capture")
     print("\nObjective:")
     print("  Guide the frog across the road and river to the goal!")
     print("  Avoid cars and jump on logs in the river.")
@@ -1607,6 +6537,44 @@ def main():
     print("\nStarting game...\n")
     
     game = Game()
+    game.replay_path = args.save_replay
+    game.traffic = args.traffic
+    game.pacing = args.pacing
+    game.idle_throttle = not args.no_idle_throttle
+    game.set_gc_mode(args.gc)
+    game.net = create_net(args)
+    if args.level_screens > 1 and (game.net or args.traffic != "wrap"):
+        print("--level-screens needs --traffic wrap and no netplay; using a single screen")
+    else:
+        game.level_screens = max(1, args.level_screens)
+    game.collision_mode = table_fallback(args.collisions, args.traffic, game.level_screens)
+    if args.threaded_render and game.net:
+        print("--threaded-render is not supported in netplay; drawing on the main thread")
+    elif args.threaded_render and game.level_screens > 1:
+        print("--threaded-render is not supported on tall levels; drawing on the main thread")
+    elif args.threaded_render:
+        game.pipeline = RenderPipeline(game).start()
+    if args.telemetry:
+        game.telemetry = Telemetry(args.telemetry, args.telemetry_format).start()
+    if args.trajectory:
+        # Po ustaleniu level_screens - wysoka plansza ma więcej pasów i obiektów
+        game.trajectory = Trajectory.for_level(args.trajectory, args.trajectory_compression,
+                                               game.level_screens).start()
+    if args.leaderboard_port is not None:
+        game.leaderboard = LeaderboardServer(args.leaderboard_host, args.leaderboard_port, args.cabinet)
+        game.leaderboard.publish(game.config_manager)
+        game.leaderboard.start()
+        print(f"Leaderboard: {game.leaderboard.url}/leaderboard")
+    if args.autoplay:
+        game.autoplay = PlannerAgent()
+    game.capture = create_capture(args)
+    if game.capture:
+        game.capture.start()
+    game.profile = create_profile(args)
+    if args.asyncio:
+        import asyncio
+        asyncio.run(game.run_async())
+        sys.exit()
     game.run()
 
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the game-state snapshot / fork API (World.snapshot, restore, fork).
+
+Plays headless planner games (Frogger.World, fixed seeds), takes snapshots
+and forks along the way and reports:
+
+* snapshot buffer size and snapshot, restore and fork throughput per second,
+  compared with copy.deepcopy(world),
+* random rollouts per second from one state, branching with restore() into
+  a single scratch world vs. a fresh fork() per rollout,
+* replay checks: a world restored from a snapshot and a fork taken at the
+  same tick, stepped with the recorded moves, must reproduce the original
+  game tick by tick, and stepping a fork must not touch the original
+  (exits with status 1 otherwise).
+
+Usage:
+    python tools/bench_fork.py --games 4
+    python tools/bench_fork.py --difficulty hard --collisions table
+    python tools/bench_fork.py --level-screens 5
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+MOVES = [None, (0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>12,.0f}/s"
+
+
+def make_world(seed: int, args) -> Frogger.World:
+    level = Frogger.tall_level(args.level_screens) if args.level_screens > 1 else {}
+    return Frogger.World(seed, collision_mode=args.collisions, difficulty=args.difficulty, **level)
+
+
+def fingerprint(world: Frogger.World, events: list) -> tuple:
+    frog = world.frog
+    return (world.tick, world.level, world.game_over, frog.x, frog.y, frog.lives, frog.score,
+            frog.direction, frog.hop_height, tuple(x for _, x in world.entity_positions()),
+            tuple(events))
+
+
+def replay(world: Frogger.World, moves: list, start: int, expected: list) -> int:
+    """Steps world with moves[start:], returns the number of ticks that differ from expected."""
+    errors = 0
+    for tick in range(start, len(moves)):
+        if moves[tick]:
+            world.move_frog(*moves[tick])
+        events = world.step()
+        errors += fingerprint(world, events) != expected[tick]
+    return errors
+
+
+def check_game(seed: int, args) -> tuple:
+    """One planner game with snapshots and forks every --every ticks; returns (ticks, errors)."""
+    world = make_world(seed, args)
+    agent = Frogger.PlannerAgent(seed)
+    moves, expected, checkpoints = [], [], []
+    while not world.game_over and world.tick < args.max_seconds * Frogger.FPS:
+        if world.tick % args.every == 0:
+            checkpoints.append((world.tick, world.snapshot(), world.fork()))
+        move = agent.act(world)
+        moves.append(move)
+        if move:
+            world.move_frog(*move)
+        events = world.step()
+        expected.append(fingerprint(world, events))
+
+    errors = 0
+    for tick, snapshot, fork in checkpoints:
+        # Fork stepped alone must follow the original; original must be unchanged
+        before = fingerprint(world, world.events)
+        errors += replay(fork, moves, tick, expected)
+        errors += fingerprint(world, world.events) != before
+        # Restore into the finished world (later tick, maybe other level)
+        world.restore(snapshot)
+        errors += replay(world, moves, tick, expected)
+    return len(moves), errors
+
+
+def throughput(args) -> None:
+    world = make_world(args.seed, args)
+    agent = Frogger.PlannerAgent(args.seed)
+    while world.tick < Frogger.FPS * 10 and not world.game_over:
+        move = agent.act(world)
+        if move:
+            world.move_frog(*move)
+        world.step()
+    n = args.iterations
+
+    t = time.perf_counter()
+    for _ in range(n):
+        snapshot = world.snapshot()
+    snapshot_s = time.perf_counter() - t
+    t = time.perf_counter()
+    for _ in range(n):
+        world.restore(snapshot)
+    restore_s = time.perf_counter() - t
+    t = time.perf_counter()
+    for _ in range(n):
+        world.fork()
+    fork_s = time.perf_counter() - t
+    deep = max(1, n // 20)
+    t = time.perf_counter()
+    for _ in range(deep):
+        copy.deepcopy(world)
+    deep_s = time.perf_counter() - t
+
+    print(f"snapshot: {len(snapshot)} values, {len(snapshot) * snapshot.itemsize} B")
+    print(f"snapshot {rate(n, snapshot_s)}")
+    print(f"restore  {rate(n, restore_s)}")
+    print(f"fork     {rate(n, fork_s)}")
+    print(f"deepcopy {rate(deep, deep_s)}   (fork {deep_s / deep / (fork_s / n):.0f}x faster)")
+
+    rng = random.Random(args.seed)
+    plans = [[rng.choice(MOVES) for _ in range(args.depth)] for _ in range(args.rollouts)]
+    for name, branch in (("restore", None), ("fork", True)):
+        scratch = world.fork()
+        t = time.perf_counter()
+        for plan in plans:
+            if branch:
+                sim = world.fork()
+            else:
+                scratch.restore(snapshot)
+                sim = scratch
+            for move in plan:
+                if move:
+                    sim.move_frog(*move)
+                sim.step()
+        elapsed = time.perf_counter() - t
+        print(f"rollouts of {args.depth} ticks via {name:<7} {rate(len(plans), elapsed)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot / restore / fork throughput")
+    parser.add_argument("--games", type=int, default=4, help="planner games for the replay checks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=int, default=60, help="game time limit")
+    parser.add_argument("--every", type=int, default=300, help="ticks between checkpoints")
+    parser.add_argument("--iterations", type=int, default=20000, help="timed snapshot/restore/fork calls")
+    parser.add_argument("--rollouts", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=30, help="ticks per rollout")
+    parser.add_argument("--difficulty", choices=sorted(Frogger.DIFFICULTIES))
+    parser.add_argument("--collisions", choices=Frogger.World.COLLISION_MODES, default="poll")
+    parser.add_argument("--level-screens", type=int, default=1, help="tall level height in screens")
+    args = parser.parse_args()
+    if args.collisions == "table" and args.level_screens > 1:
+        parser.error("--collisions table is not supported on tall levels")
+
+    throughput(args)
+    ticks = errors = 0
+    for seed in range(args.seed, args.seed + args.games):
+        played, wrong = check_game(seed, args)
+        ticks += played
+        errors += wrong
+    print(f"\n{args.games} games, {ticks} ticks, checkpoints every {args.every} ticks, "
+          f"replay mismatches {errors}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
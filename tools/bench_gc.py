@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Garbage-collector pause benchmark for the game loop.
+
+Plays the same autoplayed games (PlannerAgent, fixed seed) through the real
+loop (Game.frame() + Game.pace(), dummy video driver) once per GC mode
+(Frogger.GCController.MODES) and reports:
+
+* frame time percentiles and frames over the frame budget,
+* collections and pauses that landed inside frames (the 5-15 ms spikes),
+* collections moved into frame slack by the 'manual' mode.
+
+Pauses are measured with gc.callbacks, so automatic collections are
+counted as well as explicit ones.
+
+Usage:
+    python tools/bench_gc.py --frames 1800
+    python tools/bench_gc.py --mode default --mode manual --quality low
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_mode(mode: str, frames: int, seed: int, quality: str) -> dict:
+    game = Frogger.Game()
+    game.quality.set_preset(quality)
+    game.set_gc_mode(mode)
+    game.autoplay = Frogger.PlannerAgent(seed)
+    game.start_new_game(seed)
+    game._deadline = time.perf_counter()
+
+    frame_ms, gc_frames, in_frame = [], 0, []
+    for _ in range(frames):
+        if game.state != "playing":
+            game.start_new_game(seed)
+        collections, paused = game.gc.total, game.gc.pause_ms
+        t = time.perf_counter()
+        game.frame()
+        frame_ms.append((time.perf_counter() - t) * 1000)
+        if game.gc.total != collections:
+            gc_frames += 1
+            in_frame.append(game.gc.pause_ms - paused)
+        game.pace()
+
+    gc = game.gc
+    result = {
+        'p50': percentile(frame_ms, 0.5),
+        'p99': percentile(frame_ms, 0.99),
+        'max': max(frame_ms),
+        'over': sum(1 for ms in frame_ms if ms > game.quality.budget_ms),
+        'gc_frames': gc_frames,
+        'gc_in_frame_max': max(in_frame, default=0.0),
+        'collections': gc.total,
+        'scheduled': gc.scheduled,
+        'forced': gc.forced,
+        'max_pause': gc.max_pause_ms,
+    }
+    gc.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GC pauses in the game loop per GC mode")
+    parser.add_argument("--frames", type=int, default=1800, help="frames per mode (at 60 FPS)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=Frogger.GCController.MODES, action="append",
+                        help="GC mode(s) to run (default: all)")
+    parser.add_argument("--quality", choices=Frogger.QUALITY_PRESETS, default="auto")
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'mode':<9}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}{'over':>6}"
+          f"{'GC in frame':>13}{'max in frame':>14}{'in slack':>10}{'forced':>8}{'collections':>13}")
+    for mode in args.mode or Frogger.GCController.MODES:
+        r = run_mode(mode, args.frames, args.seed, args.quality)
+        print(f"{mode:<9}{r['p50']:>8.2f}{r['p99']:>8.2f}{r['max']:>8.2f}{r['over']:>6}"
+              f"{r['gc_frames']:>13}{r['gc_in_frame_max']:>12.2f}ms{r['scheduled']:>10}"
+              f"{r['forced']:>8}{r['collections']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Idle throttling benchmark for menus and static screens.
+
+Runs the real game loop (Game.frame() + Game.pace()) with the dummy video
+driver on each screen a cabinet can sit on for hours, once at the full
+frame rate (--no-idle-throttle) and once with idle throttling, and reports
+frames per minute and CPU use (process time / wall time, % of one core):
+
+* menu:       untouched main menu (animated, drops to IDLE_MENU_FPS),
+* top5/help:  static menu screens (wait for input),
+* game_over:  static end screen,
+* enter_name: name entry (redrawn only when the cursor blinks),
+* hidden:     main menu in a hidden window (WINDOWHIDDEN event).
+
+Finally a key is posted into a throttled static screen to show the loop
+wakes up and handles it without waiting for the idle timeout.
+
+Usage:
+    python tools/bench_idle.py --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+SCREENS = ["menu", "top5", "help", "game_over", "enter_name", "hidden"]
+
+
+def setup(game, screen: str):
+    """Puts the game on the given screen, as if the player walked away."""
+    game.last_input = pygame.time.get_ticks() - Frogger.MENU_IDLE_MS - 1
+    if screen in ("top5", "help"):
+        game.menu.state = screen
+    elif screen in ("game_over", "enter_name"):
+        game.start_new_game(0)
+        game.state = screen
+        game.input_active = screen == "enter_name"
+    elif screen == "hidden":
+        game.dispatch(pygame.event.Event(pygame.WINDOWHIDDEN))
+
+
+def run_screen(screen: str, throttle: bool, seconds: float) -> dict:
+    game = Frogger.Game()
+    game.idle_throttle = throttle
+    setup(game, screen)
+    frames = 0
+    cpu = time.process_time()
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game.frame()
+        game.pace()
+        frames += 1
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    return {'fpm': frames / wall * 60, 'cpu': cpu / wall * 100}
+
+
+def wake_latency(seconds: float) -> float:
+    """Ms from posting a key in the idle TOP 5 screen until the loop handled it."""
+    game = Frogger.Game()
+    setup(game, "top5")
+    sent = {}
+
+    def post():
+        time.sleep(seconds)
+        sent['t'] = time.perf_counter()
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE, mod=0, unicode=''))
+    poster = threading.Thread(target=post, daemon=True)
+    poster.start()
+    while game.menu.state == "top5":
+        game.frame()
+        game.pace()
+    handled = time.perf_counter()
+    poster.join()
+    return (handled - sent['t']) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menu idle throttling: frames and CPU saved")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    parser.add_argument("--screen", choices=SCREENS, action="append", help="screen(s) to run")
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'screen':<12}{'full fpm':>10}{'full CPU':>10}{'idle fpm':>10}{'idle CPU':>10}"
+          f"{'frames saved':>14}{'CPU saved':>11}")
+    for screen in args.screen or SCREENS:
+        full = run_screen(screen, False, args.seconds)
+        idle = run_screen(screen, True, args.seconds)
+        print(f"{screen:<12}{full['fpm']:>10.0f}{full['cpu']:>9.1f}%{idle['fpm']:>10.0f}{idle['cpu']:>9.1f}%"
+              f"{1 - idle['fpm'] / full['fpm']:>14.1%}{full['cpu'] - idle['cpu']:>10.1f}%")
+    print(f"wake on key in an idle screen: {wake_latency(min(args.seconds, 1.5)):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
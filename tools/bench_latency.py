@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keypress -> frog movement latency benchmark.
+
+Runs the real game loop (Game.frame() + Game.pace()) with the dummy video
+driver for every frame pacing mode (sleep / busy / wake), drawing
+sequentially, and with the threaded RenderPipeline. A helper thread posts
+arrow-key KEYDOWN events at random moments, stamped with the time they
+were sent, and the game reports:
+
+* key -> sim:   until World.move_frog() was applied,
+* key -> frame: until the first presented frame showing the move.
+
+--draw-load adds a busy loop (holding the GIL, like real drawing code) to
+every gameplay frame draw, to emulate a slow machine or a heavy scene.
+
+--check exits with status 1 if the p95 key -> frame latency of a sequential
+mode exceeds Frogger.INPUT_LATENCY_TARGET_MS (two frames; the target holds
+without --draw-load).
+
+Usage:
+    python tools/bench_latency.py --seconds 10 --check
+    python tools/bench_latency.py --seconds 10 --draw-load 25 --pacing wake
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+
+def post_keys(stop: threading.Event, rng: random.Random, mean_gap: float):
+    """Posts left/right presses (the frog stays on the safe start row)."""
+    keys = [pygame.K_LEFT, pygame.K_RIGHT]
+    while not stop.wait(rng.uniform(0.5, 1.5) * mean_gap):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(keys), mod=0,
+                                             unicode='', sent=time.perf_counter()))
+
+
+def run_mode(threaded: bool, pacing: str, seconds: float, draw_load_ms: float, seed: int) -> dict:
+    game = Frogger.Game()
+    game.pacing = pacing
+    game.last_input = float('inf')  # No attract mode during the run
+    if draw_load_ms:
+        draw_scene = game.draw_scene
+
+        def loaded_draw_scene(*args, **kwargs):
+            end = time.perf_counter() + draw_load_ms / 1000
+            while time.perf_counter() < end:
+                pass
+            draw_scene(*args, **kwargs)
+        game.draw_scene = loaded_draw_scene
+    if threaded:
+        game.pipeline = Frogger.RenderPipeline(game).start()
+    game.start_new_game(seed)
+
+    stop = threading.Event()
+    poster = threading.Thread(target=post_keys, args=(stop, random.Random(seed), 0.25), daemon=True)
+    poster.start()
+    frames = 0
+    start = time.perf_counter()
+    game._deadline = start
+    while time.perf_counter() - start < seconds:
+        game.frame()
+        game.pace()
+        frames += 1
+    elapsed = time.perf_counter() - start
+    stop.set()
+    poster.join()
+
+    result = {
+        'mode': ("threaded" if threaded else "sequential") + f"/{pacing}",
+        'ticks_per_s': game.tick / elapsed,
+        'fps': (game.pipeline.rendered if threaded else frames) / elapsed,
+        'summary': game.latency_summary(),
+        'stats': game.latency_stats(),
+        'threaded': threaded,
+    }
+    if game.pipeline:
+        game.pipeline.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keypress to frog movement latency")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each mode")
+    parser.add_argument("--draw-load", type=float, default=0.0, metavar="MS",
+                        help="extra busy time per gameplay frame draw")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--pacing", choices=Frogger.Game.PACING_MODES, action="append",
+                        help="pacing mode(s) to run (default: all)")
+    parser.add_argument("--no-threaded", action="store_true", help="skip the threaded pipeline run")
+    parser.add_argument("--check", action="store_true",
+                        help="fail if a sequential mode misses the latency target")
+    args = parser.parse_args()
+
+    pygame.init()
+    runs = [(False, pacing) for pacing in args.pacing or Frogger.Game.PACING_MODES]
+    if not args.no_threaded:
+        runs.append((True, "sleep"))
+    failed = []
+    for threaded, pacing in runs:
+        r = run_mode(threaded, pacing, args.seconds, args.draw_load, args.seed)
+        print(f"{r['mode']:<18} sim {r['ticks_per_s']:5.1f} ticks/s, drawn {r['fps']:5.1f} fps | "
+              f"{r['summary']}")
+        if not threaded and r['stats']['frame_p95'] > Frogger.INPUT_LATENCY_TARGET_MS:
+            failed.append(r['mode'])
+
+    if args.check:
+        if failed:
+            print(f"FAIL: p95 key->frame above {Frogger.INPUT_LATENCY_TARGET_MS:.1f} ms in {', '.join(failed)}")
+            sys.exit(1)
+        print(f"OK: p95 key->frame within {Frogger.INPUT_LATENCY_TARGET_MS:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the NumPy pixel-observation renderer (Frogger.ObservationRenderer).
+
+Plays an autoplayed game (PlannerAgent, fixed seed) and times, per frame:
+
+* Game.draw() followed by a downscale to the observation size and a copy
+  into a NumPy array (what a vision bot does without the renderer),
+* ObservationRenderer.render() of the same world,
+* ObservationRenderer.render_batch() of --batch worlds at once,
+
+and checks that every observation shows the frog where Frog.get_rect()
+puts it and that batch and single renders agree (exits with status 1
+otherwise). --save writes a strip of sample observations as a PNG.
+
+Usage:
+    python tools/bench_observation.py --frames 600
+    python tools/bench_observation.py --size 64 --grayscale --batch 256
+    python tools/bench_observation.py --level-screens 5 --save /tmp/observations.png
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy  # noqa: E402
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>10,.0f} frames/s"
+
+
+def frog_visible(renderer: Frogger.ObservationRenderer, world: Frogger.World, image) -> bool:
+    """The output pixel at the centre of Frog.get_rect() has the frog colour."""
+    rect = world.frog.get_rect()
+    col = int(rect.centerx * renderer.width / Frogger.SCREEN_WIDTH)
+    row = int((rect.centery - renderer.view_top(world)) * renderer.height / Frogger.SCREEN_HEIGHT)
+    return (image[row, col] == renderer._palette([renderer.FROG])[0]).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy observation renderer vs. Game.draw capture")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=84, help="observation width and height")
+    parser.add_argument("--grayscale", action="store_true")
+    parser.add_argument("--batch", type=int, default=64, help="worlds per render_batch() call")
+    parser.add_argument("--quality", choices=Frogger.QUALITY_PRESETS, default="low")
+    parser.add_argument("--level-screens", type=int, default=1, help="tall level height in screens")
+    parser.add_argument("--save", type=Path, help="PNG with sample observations")
+    args = parser.parse_args()
+
+    pygame.init()
+    game = Frogger.Game()
+    game.quality.set_preset(args.quality)
+    game.level_screens = args.level_screens
+    game.autoplay = Frogger.PlannerAgent(args.seed)
+    game.start_new_game(args.seed)
+    renderer = Frogger.ObservationRenderer(args.size, args.size, args.grayscale)
+    size = (args.size, args.size)
+
+    draw_s = render_s = 0.0
+    errors = 0
+    samples = []
+    for frame in range(args.frames):
+        if game.state != "playing":
+            game.start_new_game(args.seed)
+        game.handle_events()
+        game.update()
+        t = time.perf_counter()
+        game.draw()
+        small = pygame.transform.smoothscale(game.screen, size)
+        captured = pygame.surfarray.array3d(small).transpose(1, 0, 2).copy()
+        t1 = time.perf_counter()
+        image = renderer.render(game.world)
+        t2 = time.perf_counter()
+        draw_s += t1 - t
+        render_s += t2 - t1
+        errors += not frog_visible(renderer, game.world, image)
+        if frame % max(1, args.frames // 8) == 0:
+            samples.append((captured, image))
+
+    worlds = []
+    for seed in range(args.seed, args.seed + args.batch):
+        level = Frogger.tall_level(args.level_screens) if args.level_screens > 1 else {}
+        world = Frogger.World(seed, **level)
+        agent = Frogger.PlannerAgent(seed)
+        for _ in range(seed % 300):
+            move = agent.act(world)
+            if move:
+                world.move_frog(*move)
+            world.step()
+        worlds.append(world)
+    out = numpy.empty((len(worlds), args.size, args.size, renderer.channels), dtype=numpy.uint8)
+    repeats = max(1, args.frames // len(worlds))
+    t = time.perf_counter()
+    for _ in range(repeats):
+        renderer.render_batch(worlds, out)
+    batch_s = time.perf_counter() - t
+    for i, world in enumerate(worlds):
+        errors += not (out[i] == renderer.render(world)).all()
+        errors += not frog_visible(renderer, world, out[i])
+
+    print(f"observation {args.size}x{args.size}x{renderer.channels}, quality {args.quality}, "
+          f"level {game.world.height} px")
+    print(f"Game.draw + scale + copy {rate(args.frames, draw_s)}")
+    print(f"render                   {rate(args.frames, render_s)}   "
+          f"({draw_s / render_s:.0f}x faster)")
+    print(f"render_batch ({len(worlds):>4})      {rate(repeats * len(worlds), batch_s)}")
+    print(f"frog / batch mismatches {errors}")
+
+    if args.save:
+        tiles = []
+        for captured, image in samples:
+            if image.shape[2] == 1:
+                image = image.repeat(3, axis=2)
+            tiles.append(numpy.concatenate([captured, image], axis=0))
+        strip = numpy.concatenate(tiles, axis=1)
+        pygame.image.save(pygame.surfarray.make_surface(strip.transpose(1, 0, 2)), str(args.save))
+        print(f"saved {len(samples)} samples (top: Game.draw, bottom: renderer) to {args.save}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the periodic lane occupancy tables (Frogger.OccupancyTable).
+
+Builds the tables for a fresh world (optionally at a higher level) and
+reports:
+
+* per lane: transient and period in ticks, table rows, build time,
+* "is cell (col, row) deadly at tick t" lookups per second from the table
+  vs. the same answer from predict_x + rectangle overlap over every object
+  of the row (what a bot does without the table), checked to agree,
+* headless planner games per second with each World collision mode.
+
+Usage:
+    python tools/bench_occupancy.py
+    python tools/bench_occupancy.py --difficulty hard --level 5 --queries 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+
+def deadly_predicted(world, col: int, row: int, tick: int) -> bool:
+    """Reference answer: predict_x for every object of the row (World.check_collisions rules)."""
+    x, y, size = col * Frogger.GRID_SIZE, row * Frogger.GRID_SIZE, Frogger.GRID_SIZE
+    hit = False
+    for entity in world.vehicles + world.logs:
+        if entity.y != y:
+            continue
+        ex = int(Frogger.predict_x(entity.x, entity.width, entity.speed, entity.direction,
+                                   tick - world.tick))
+        if ex < x + size and x < ex + entity.width:
+            hit = True
+            break
+    return hit != world.in_water(y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Periodic lane occupancy table benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--difficulty", choices=sorted(Frogger.DIFFICULTIES))
+    parser.add_argument("--level", type=int, default=1, help="level to build the tables at")
+    parser.add_argument("--queries", type=int, default=100000, help="cell lookups to time")
+    parser.add_argument("--games", type=int, default=4, help="planner games per collision mode")
+    args = parser.parse_args()
+
+    world = Frogger.World(args.seed, difficulty=args.difficulty)
+    if args.difficulty:
+        world.set_level(args.level)
+
+    table = Frogger.OccupancyTable.from_world(world)
+    print(f"{'lane y':>7}{'objects':>9}{'transient':>11}{'period':>8}{'rows':>7}{'build ms':>10}")
+    total = 0.0
+    for y in sorted(table._sources):
+        t = time.perf_counter()
+        lane, _ = table.lane(y)
+        ms = (time.perf_counter() - t) * 1000
+        total += ms
+        print(f"{y:>7}{len(lane.objects):>9}{lane.transient:>11}{lane.period:>8}"
+              f"{lane.length:>7}{ms:>10.2f}")
+    print(f"{'all':>7}{'':>35}{total:>10.2f}")
+
+    rng = random.Random(args.seed)
+    rows = Frogger.SCREEN_HEIGHT // Frogger.GRID_SIZE
+    columns = (Frogger.SCREEN_WIDTH - Frogger.GRID_SIZE) // Frogger.GRID_SIZE + 1
+    queries = [(rng.randrange(columns), rng.randrange(rows), rng.randrange(100000))
+               for _ in range(args.queries)]
+    t = time.perf_counter()
+    fast = [table.deadly(col, row, tick) for col, row, tick in queries]
+    table_s = time.perf_counter() - t
+    t = time.perf_counter()
+    slow = [deadly_predicted(world, col, row, tick) for col, row, tick in queries]
+    predicted_s = time.perf_counter() - t
+    disagree = sum(a != b for a, b in zip(fast, slow))
+    print(f"\ncell lookups: table {args.queries / table_s:,.0f}/s, "
+          f"predict_x {args.queries / predicted_s:,.0f}/s "
+          f"({predicted_s / table_s:.1f}x), disagreements {disagree}")
+
+    print()
+    for mode in Frogger.World.COLLISION_MODES:
+        t = time.perf_counter()
+        ticks = 0
+        for seed in range(args.seed, args.seed + args.games):
+            result = Frogger.simulate_game(Frogger.PlannerAgent(seed), seed, max_ticks=Frogger.FPS * 60,
+                                           collision_mode=mode, difficulty=args.difficulty)
+            ticks += result['ticks']
+        elapsed = time.perf_counter() - t
+        print(f"planner games, collisions {mode:<6} {args.games / elapsed:6.2f} games/s "
+              f"({ticks / elapsed:,.0f} ticks/s)")
+    sys.exit(1 if disagree else 0)
+
+
+if __name__ == "__main__":
+    main()
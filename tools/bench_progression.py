@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Level transition hitch check for the difficulty progression.
+
+Plays headless games with the PlannerAgent and level progression enabled
+(World(difficulty=...)) and compares the ticks/frames on which the level
+changed against all the others:
+
+* simulation:  World.step() time per tick, in both traffic modes,
+* frames:      Game.update() + Game.draw() time per frame (offscreen),
+* the level change itself (World.set_level) against rebuilding the world
+  (a new World with the next level's lanes), which is what avoiding
+  "no rebuild of all entities" saves.
+
+Exits with status 1 if a transition frame is slower than both the frame
+budget and the p99 of ordinary frames (a hitch caused by the level change).
+
+Usage:
+    python tools/bench_progression.py
+    python tools/bench_progression.py --difficulty hard --games 10 --frames 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def describe(values: list) -> str:
+    return (f"n={len(values):<6} p50 {percentile(values, 0.5):7.3f} ms  "
+            f"p99 {percentile(values, 0.99):7.3f} ms  max {max(values, default=0):7.3f} ms")
+
+
+def bench_steps(traffic: str, difficulty: str, games: int, max_ticks: int) -> tuple:
+    """World.step() times split into (ordinary, transition) ticks; highest level reached."""
+    ordinary, transition = [], []
+    top_level = 1
+    for seed in range(games):
+        world = Frogger.World(seed, traffic=traffic, difficulty=difficulty)
+        agent = Frogger.PlannerAgent(seed)
+        while not world.game_over and world.tick < max_ticks:
+            move = agent.act(world)
+            if move:
+                world.move_frog(*move)
+            level = world.level
+            t = time.perf_counter()
+            world.step()
+            elapsed = (time.perf_counter() - t) * 1000
+            (transition if world.level != level else ordinary).append(elapsed)
+        top_level = max(top_level, world.level)
+    return ordinary, transition, top_level
+
+
+def bench_set_level(traffic: str, difficulty: str, repeats: int) -> tuple:
+    """Mean ms of an in-place level change and of rebuilding the world instead."""
+    world = Frogger.World(0, traffic=traffic, difficulty=difficulty)
+    t = time.perf_counter()
+    for i in range(repeats):
+        world.set_level(i % Frogger.MAX_LEVEL + 1)
+    in_place = (time.perf_counter() - t) * 1000 / repeats
+
+    progression = world.progression
+    t = time.perf_counter()
+    for i in range(repeats):
+        # The alternative: fresh entities built with the next level's lanes
+        params = progression.lanes(i % Frogger.MAX_LEVEL + 1)
+        lanes = Frogger.VEHICLE_LANES + Frogger.LOG_LANES
+        scaled = [dict(lane, speed=speed) for lane, (speed, _) in zip(lanes, params)]
+        Frogger.World(i, scaled[:len(Frogger.VEHICLE_LANES)], scaled[len(Frogger.VEHICLE_LANES):],
+                      traffic=traffic)
+    rebuild = (time.perf_counter() - t) * 1000 / repeats
+    return in_place, rebuild
+
+
+def bench_frames(difficulty: str, frames: int, seed: int) -> tuple:
+    """Offscreen frame times split into (ordinary, transition) frames; highest level."""
+    game = Frogger.Game(headless=True)
+    game.difficulty = difficulty
+    game.autoplay = Frogger.PlannerAgent(seed)
+    game.start_new_game(seed)
+    ordinary, transition = [], []
+    top_level = 1
+    for _ in range(frames):
+        if game.state != "playing":
+            game.start_new_game(seed)
+        level = game.world.level
+        t = time.perf_counter()
+        game.update()
+        game.draw()
+        elapsed = (time.perf_counter() - t) * 1000
+        (transition if game.world.level != level else ordinary).append(elapsed)
+        top_level = max(top_level, game.world.level)
+    return ordinary, transition, top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that level transitions cause no frame hitch")
+    parser.add_argument("--difficulty", choices=sorted(Frogger.DIFFICULTIES), default="normal")
+    parser.add_argument("--games", type=int, default=5, help="simulated games per traffic mode")
+    parser.add_argument("--max-seconds", type=int, default=300, help="game time limit")
+    parser.add_argument("--frames", type=int, default=3000, help="rendered frames")
+    parser.add_argument("--repeats", type=int, default=2000, help="set_level/rebuild repetitions")
+    args = parser.parse_args()
+
+    for traffic in Frogger.World.TRAFFIC_MODES:
+        ordinary, transition, top = bench_steps(traffic, args.difficulty, args.games,
+                                                args.max_seconds * Frogger.FPS)
+        in_place, rebuild = bench_set_level(traffic, args.difficulty, args.repeats)
+        print(f"[{traffic}] step() up to level {top}")
+        print(f"  ordinary tick    {describe(ordinary)}")
+        print(f"  level change     {describe(transition)}")
+        print(f"  set_level        {in_place * 1000:.1f} us in place, "
+              f"{rebuild * 1000:.1f} us rebuilding the world ({rebuild / in_place:.0f}x)")
+
+    budget = 1000 / Frogger.FPS
+    ordinary, transition, top = bench_frames(args.difficulty, args.frames, 0)
+    print(f"[frames] update()+draw() up to level {top}, budget {budget:.1f} ms")
+    print(f"  ordinary frame   {describe(ordinary)}")
+    print(f"  level change     {describe(transition)}")
+
+    if not transition:
+        print("no level transition happened - raise --frames")
+        sys.exit(1)
+    limit = max(budget, percentile(ordinary, 0.99))
+    hitch = max(transition) > limit
+    print(f"HITCH: a level change took {max(transition):.1f} ms (limit {limit:.1f} ms)" if hitch
+          else f"no hitch on level changes (limit {limit:.1f} ms)")
+    sys.exit(1 if hitch else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frame cost benchmark for tall scrolling levels (--level-screens).
+
+Plays the same autoplayed game (PlannerAgent, fixed seed) on levels of
+increasing height through Game.update() + Game.draw() (dummy video driver)
+and reports per level height:
+
+* update and draw time percentiles per frame, with update split into the
+  autopilot's planning (PlannerAgent.act) and the rest (world step, effects),
+* lanes simulated per tick vs. lanes in the level (off-screen lanes are
+  only caught up analytically when they come near the frog),
+* rows climbed, to show the camera actually scrolled.
+
+Cost per frame, planning included, should stay flat as the level grows.
+
+Usage:
+    python tools/bench_scrolling.py --frames 1800
+    python tools/bench_scrolling.py --screens 1 --screens 50 --quality low
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_level(screens: int, frames: int, seed: int, quality: str) -> dict:
+    game = Frogger.Game()
+    game.quality.set_preset(quality)
+    game.level_screens = screens
+    agent = game.autoplay = Frogger.PlannerAgent(seed)
+    game.start_new_game(seed)
+
+    act_ms = []
+    act = agent.act
+
+    def timed_act(world):
+        t = time.perf_counter()
+        move = act(world)
+        act_ms[-1] += (time.perf_counter() - t) * 1000
+        return move
+
+    agent.act = timed_act
+
+    update_ms, draw_ms, lanes, climbed = [], [], [], 0
+    for _ in range(frames):
+        act_ms.append(0.0)
+        if game.state != "playing":
+            game.start_new_game(seed)
+        world = game.world
+        y = world.frog.y
+        t = time.perf_counter()
+        game.handle_events()
+        game.update()
+        t1 = time.perf_counter()
+        game.draw()
+        t2 = time.perf_counter()
+        update_ms.append((t1 - t) * 1000 - act_ms[-1])
+        draw_ms.append((t2 - t1) * 1000)
+        if world.tall:
+            lanes.append(world.lanes_updated)
+        climbed = max(climbed, (world.height - Frogger.GRID_SIZE - min(y, world.frog.y)) // Frogger.GRID_SIZE)
+
+    world = game.world
+    total = len(world.vehicle_lanes) + len(world.log_lanes)
+    return {
+        'height': world.height,
+        'act_p50': percentile(act_ms, 0.5),
+        'act_p99': percentile(act_ms, 0.99),
+        'act_max': max(act_ms),
+        'update_p50': percentile(update_ms, 0.5),
+        'update_p99': percentile(update_ms, 0.99),
+        'draw_p50': percentile(draw_ms, 0.5),
+        'draw_p99': percentile(draw_ms, 0.99),
+        'lanes': sum(lanes) / len(lanes) if lanes else total,
+        'total_lanes': total,
+        'catchups': world.lane_catchups if world.tall else 0,
+        'climbed': climbed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost of tall scrolling levels")
+    parser.add_argument("--frames", type=int, default=1800, help="frames per level height")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--screens", type=int, action="append",
+                        help="level height(s) in screens (default: 1 5 20 100)")
+    parser.add_argument("--quality", choices=Frogger.QUALITY_PRESETS, default="low")
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'screens':>7}{'height':>8}{'update p50':>12}{'p99':>8}{'act p50':>9}{'p99':>8}{'max':>8}"
+          f"{'draw p50':>10}{'p99':>8}{'lanes/tick':>12}{'catch-ups':>11}{'rows climbed':>14}")
+    for screens in args.screens or (1, 5, 20, 100):
+        r = run_level(screens, args.frames, args.seed, args.quality)
+        print(f"{screens:>7}{r['height']:>8}{r['update_p50']:>10.2f}ms{r['update_p99']:>6.2f}ms"
+              f"{r['act_p50']:>7.2f}ms{r['act_p99']:>6.2f}ms{r['act_max']:>6.1f}ms"
+              f"{r['draw_p50']:>8.2f}ms{r['draw_p99']:>6.2f}ms"
+              f"{r['lanes']:>6.1f} / {r['total_lanes']:<4}{r['catchups']:>11}{r['climbed']:>14}")
+
+
+if __name__ == "__main__":
+    main()
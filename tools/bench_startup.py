@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark for packaged Frogger builds.
+
+Measures the time from process launch until the first frame has been
+presented (the game prints ``FROGGER_FIRST_FRAME`` and exits when
+``FROGGER_STARTUP_PROBE=1`` is set) for:
+
+* the plain script (``python Frogger.py``) as the baseline,
+* a PyInstaller onefile executable,
+* a PyInstaller onedir executable (Frogger-linux.spec).
+
+Cold launches drop the page cache first (requires root, otherwise the
+cold numbers are reported as approximated); a onefile build additionally
+re-extracts itself on every launch, which is exactly what this compares.
+
+Usage:
+    pyinstaller --noconfirm Frogger-linux.spec
+    pyinstaller --noconfirm --onefile --name Frogger-onefile Frogger.py
+    python tools/bench_startup.py --onefile dist/Frogger-onefile \\
+        --onedir dist/Frogger/Frogger --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MARKER = b"FROGGER_FIRST_FRAME"
+
+
+def drop_caches() -> bool:
+    """Drops the Linux page cache. Returns False if not permitted."""
+    try:
+        subprocess.run(["sync"], check=False)
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def launch(cmd, timeout: float) -> float:
+    """Launches the game once and returns seconds until the first frame."""
+    env = dict(os.environ)
+    env["FROGGER_STARTUP_PROBE"] = "1"
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, env=env)
+    try:
+        for line in proc.stdout:
+            if line.startswith(MARKER):
+                elapsed = time.perf_counter() - start
+                break
+        else:
+            raise RuntimeError(f"{cmd[0]} exited without rendering a frame")
+        proc.wait(timeout=timeout)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    return elapsed
+
+
+def bench(name: str, cmd, runs: int, timeout: float) -> dict:
+    """Runs one cold launch followed by `runs` warm launches."""
+    cache_dropped = drop_caches()
+    cold = launch(cmd, timeout)
+    warm = [launch(cmd, timeout) for _ in range(runs)]
+    return {
+        'name': name,
+        'cold': cold,
+        'cold_exact': cache_dropped,
+        'warm_median': statistics.median(warm),
+        'warm_min': min(warm),
+        'warm_max': max(warm),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--onefile", type=Path, help="PyInstaller onefile executable")
+    parser.add_argument("--onedir", type=Path, help="PyInstaller onedir executable")
+    parser.add_argument("--no-script", action="store_true",
+                        help="skip the `python Frogger.py` baseline")
+    parser.add_argument("--runs", type=int, default=5, help="warm launches per target")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    targets = []
+    if not args.no_script:
+        targets.append(("script", [sys.executable, str(PROJECT_DIR / "Frogger.py")]))
+    if args.onefile:
+        targets.append(("onefile", [str(args.onefile.resolve())]))
+    if args.onedir:
+        targets.append(("onedir", [str(args.onedir.resolve())]))
+    if not targets:
+        parser.error("nothing to benchmark")
+
+    results = [bench(name, cmd, args.runs, args.timeout) for name, cmd in targets]
+
+    print(f"{'target':<10}{'cold ms':>12}{'warm med ms':>14}{'warm min ms':>14}{'warm max ms':>14}")
+    for r in results:
+        cold = f"{r['cold'] * 1000:.0f}" + ("" if r['cold_exact'] else "*")
+        print(f"{r['name']:<10}{cold:>12}{r['warm_median'] * 1000:>14.0f}"
+              f"{r['warm_min'] * 1000:>14.0f}{r['warm_max'] * 1000:>14.0f}")
+    if not all(r['cold_exact'] for r in results):
+        print("* page cache could not be dropped (run as root for true cold launches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the bitboard game-state encoding (Frogger.StateCodec).
+
+Plays headless planner games (Frogger.World, fixed seeds), encodes the
+state after every tick and reports:
+
+* code width in bits / packed bytes,
+* encode, decode and pack throughput in states per second,
+* round-trip checks: decode() matches the world fields and
+  encode_state(decode(code)) == code (exits with status 1 otherwise),
+* distinct states vs. ticks (how much a transposition table or a
+  deduplicated dataset saves) and set/dict lookups per second.
+
+Usage:
+    python tools/bench_state_codec.py --games 10
+    python tools/bench_state_codec.py --phase-bits 3 --difficulty hard
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>12,.0f}/s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bitboard state encoding throughput")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=int, default=60, help="game time limit")
+    parser.add_argument("--phase-bits", type=int, default=5, help="bits per lane phase")
+    parser.add_argument("--difficulty", choices=sorted(Frogger.DIFFICULTIES))
+    args = parser.parse_args()
+
+    codes, errors = [], 0
+    encode_s = 0.0
+    codec = None
+    for seed in range(args.seed, args.seed + args.games):
+        world = Frogger.World(seed, difficulty=args.difficulty)
+        codec = codec or Frogger.StateCodec(world, args.phase_bits)
+        agent = Frogger.PlannerAgent(seed)
+        while not world.game_over and world.tick < args.max_seconds * Frogger.FPS:
+            move = agent.act(world)
+            if move:
+                world.move_frog(*move)
+            world.step()
+            t = time.perf_counter()
+            code = codec.encode(world)
+            encode_s += time.perf_counter() - t
+            codes.append(code)
+
+            state = codec.decode(code)
+            frog = world.frog
+            if (state.row != frog.y // Frogger.GRID_SIZE or state.lives != frog.lives
+                    or state.level != min(world.level, 15)
+                    or state.score != min(frog.score // codec.SCORE_BUCKET, 255)
+                    or codec.encode_state(state) != code):
+                errors += 1
+
+    t = time.perf_counter()
+    states = [codec.decode(code) for code in codes]
+    decode_s = time.perf_counter() - t
+    t = time.perf_counter()
+    packed = [codec.pack(code) for code in codes]
+    pack_s = time.perf_counter() - t
+    t = time.perf_counter()
+    distinct = set(codes)
+    set_s = time.perf_counter() - t
+    t = time.perf_counter()
+    hits = sum(1 for code in codes if code in distinct)
+    lookup_s = time.perf_counter() - t
+
+    print(f"code: {codec.bits} bits ({codec.size} B packed), "
+          f"{len(codec.lanes)} lanes x {codec.phase_bits} phase bits")
+    print(f"encode {rate(len(codes), encode_s)}")
+    print(f"decode {rate(len(states), decode_s)}")
+    print(f"pack   {rate(len(packed), pack_s)}")
+    print(f"set    {rate(len(codes), set_s)}   lookups {rate(hits, lookup_s)}")
+    print(f"{len(codes)} ticks, {len(distinct)} distinct states "
+          f"({1 - len(distinct) / max(1, len(codes)):.1%} duplicates), round-trip errors {errors}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
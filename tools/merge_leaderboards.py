@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Merges leaderboards of several Frogger cabinets into one.
+
+Sources can be:
+* URLs of running cabinets (``python Frogger.py --leaderboard-port 8765``),
+  e.g. http://cabinet-1:8765 (``/leaderboard`` is appended if no path given),
+* saved exports (JSON fetched from ``/leaderboard``),
+* raw ``Frogger.json`` configuration files copied from the machines
+  (the cabinet is then named after the file).
+
+Scores are tagged with their cabinet, de-duplicated (the same export
+imported twice counts once), sorted and cut to --top; statistics are
+summed per venue and kept per cabinet.
+
+Usage:
+    python tools/merge_leaderboards.py http://127.0.0.1:8765 exports/*.json
+    python tools/merge_leaderboards.py cab1/Frogger.json cab2/Frogger.json \\
+        --top 20 --output venue.json
+"""
+
+import argparse
+import json
+import sys
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+FORMAT = "frogger-leaderboard"
+
+
+def load_source(source: str, timeout: float) -> dict:
+    """Loads one cabinet export (URL, export file or Frogger.json)."""
+    if source.startswith(("http://", "https://")):
+        parts = urllib.parse.urlsplit(source)
+        if parts.path in ("", "/"):
+            source = urllib.parse.urlunsplit(parts._replace(path="/leaderboard"))
+        with urllib.request.urlopen(source, timeout=timeout) as response:
+            data = json.load(response)
+        default_name = parts.netloc
+    else:
+        path = Path(source)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        default_name = path.parent.name if path.name == "Frogger.json" else path.stem
+
+    if data.get('format') == FORMAT:
+        return data
+    if 'scores' in data:
+        # Surowy plik konfiguracji gry
+        return {'cabinet': default_name, 'scores': data.get('scores', []),
+                'statistics': data.get('statistics', {})}
+    raise ValueError(f"{source}: not a Frogger export or configuration file")
+
+
+def merge(exports: list, top: int) -> dict:
+    """Combines cabinet exports into one venue leaderboard."""
+    seen = set()
+    scores = []
+    cabinets = {}
+    for export in exports:
+        cabinet = export.get('cabinet', '?')
+        for entry in export.get('scores', []):
+            key = (cabinet, entry.get('name'), entry.get('score'), entry.get('date'))
+            if key in seen:
+                continue
+            seen.add(key)
+            scores.append(dict(entry, cabinet=cabinet))
+        # Ten sam automat podany dwa razy (np. URL i kopia pliku) liczony raz
+        cabinets[cabinet] = export.get('statistics', {})
+
+    scores.sort(key=lambda e: (-e.get('score', 0), e.get('date') or ''))
+    totals = {'total_games': 0, 'total_score': 0, 'highest_score': 0}
+    for stats in cabinets.values():
+        totals['total_games'] += stats.get('total_games', 0)
+        totals['total_score'] += stats.get('total_score', 0)
+        totals['highest_score'] = max(totals['highest_score'], stats.get('highest_score', 0))
+
+    return {
+        'format': FORMAT + "-venue",
+        'scores': scores[:top],
+        'statistics': totals,
+        'cabinets': cabinets,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge leaderboards of several Frogger cabinets")
+    parser.add_argument("sources", nargs="+", help="cabinet URLs, export files or Frogger.json files")
+    parser.add_argument("--top", type=int, default=10, help="scores kept in the merged board")
+    parser.add_argument("--output", type=Path, help="write the merged JSON here (default: stdout)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="HTTP timeout in seconds")
+    args = parser.parse_args()
+
+    exports = []
+    for source in args.sources:
+        try:
+            exports.append(load_source(source, args.timeout))
+        except (OSError, ValueError) as e:
+            print(f"skipped {source}: {e}", file=sys.stderr)
+    if not exports:
+        sys.exit("no usable sources")
+
+    merged = merge(exports, args.top)
+    text = json.dumps(merged, indent=4, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text + "\n", encoding='utf-8')
+        for rank, entry in enumerate(merged['scores'], 1):
+            print(f"{rank:>3}. {entry['name']:<16}{entry['score']:>8}  {entry['cabinet']}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Two-process netplay test on localhost through a simulated-latency relay.
+
+Starts a host and a client as separate processes, each running the real
+game loop (Game.frame() + Game.pace(), dummy video driver) with the
+planner playing its frog. The client connects through a Frogger.NetShim
+relay in this process that delays, jitters and drops packets. At the end
+both sides report their netplay statistics:
+
+* RTT, bandwidth and average delta snapshot size vs. a full snapshot,
+* client rollbacks (snapshots that disagreed with its prediction) and
+  resimulated ticks, host late inputs,
+* desyncs - lane positions that differed between host and client (must be 0).
+
+Exits with status 1 when the client never joined or the lanes desynced.
+
+Usage:
+    python tools/netplay_loopback.py --seconds 20 --latency 40 --jitter 10 --loss 0.02
+    python tools/netplay_loopback.py --role host --port 47800     # one side by hand
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+import Frogger  # noqa: E402
+
+
+def run_role(args) -> dict:
+    """Plays one side of the match for args.seconds and returns its statistics."""
+    pygame.init()
+    game = Frogger.Game()
+    game.quality.set_preset(args.quality)
+    if args.role == "host":
+        game.net = Frogger.NetHost("127.0.0.1", args.port)
+        print(json.dumps({'port': game.net.port}), flush=True)
+    else:
+        game.net = Frogger.NetClient(("127.0.0.1", args.port))
+    game.autoplay = Frogger.PlannerAgent(args.seed)
+    game.start_new_game(args.seed)
+    game._deadline = time.perf_counter()
+
+    net = game.net
+    joined = None
+    # Gospodarz gra dłużej, żeby klient do końca dostawał migawki
+    deadline = time.perf_counter() + args.seconds + (2.0 if args.role == "host" else 0.0)
+    while time.perf_counter() < deadline:
+        if game.state != "playing":
+            break  # Obie żaby straciły życia
+        game.frame()
+        game.pace()
+        if joined is None and not net.waiting:
+            joined = time.perf_counter()
+
+    stats = net.stats()
+    stats['joined'] = joined is not None
+    game.shutdown()
+    return stats
+
+
+def read_json(stream) -> dict:
+    """Last JSON object line printed by a role process."""
+    result = {}
+    for line in stream.splitlines():
+        if line.startswith("{"):
+            result = json.loads(line)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Two-process netplay test through a latency relay")
+    parser.add_argument("--seconds", type=float, default=20.0, help="match length")
+    parser.add_argument("--latency", type=float, default=40.0, help="one-way delay in ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="random ± ms on the delay")
+    parser.add_argument("--loss", type=float, default=0.02, help="packet loss probability")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quality", choices=Frogger.QUALITY_PRESETS, default="low")
+    parser.add_argument("--role", choices=["host", "client"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role:
+        print(json.dumps(run_role(args)), flush=True)
+        return
+
+    command = [sys.executable, __file__, "--seconds", str(args.seconds),
+               "--seed", str(args.seed), "--quality", args.quality]
+    host = subprocess.Popen(command + ["--role", "host"], stdout=subprocess.PIPE, text=True)
+    line = host.stdout.readline()
+    while line and not line.startswith("{"):
+        line = host.stdout.readline()  # Komunikaty Game() przed numerem portu
+    port = json.loads(line)['port']
+    shim = Frogger.NetShim(("127.0.0.1", port), latency_ms=args.latency, jitter_ms=args.jitter,
+                           loss=args.loss, seed=args.seed).start()
+    client = subprocess.Popen(command + ["--role", "client", "--port", str(shim.port)],
+                              stdout=subprocess.PIPE, text=True)
+    client_stats = read_json(client.communicate()[0])
+    host_stats = read_json(host.communicate()[0])
+    shim.close()
+
+    print(f"relay: {args.latency:g} ± {args.jitter:g} ms one-way, {args.loss:.0%} loss, "
+          f"{shim.forwarded} packets forwarded, {shim.dropped} dropped")
+    for name, stats in (("host", host_stats), ("client", client_stats)):
+        if not stats:
+            print(f"{name}: no statistics (process failed)")
+            continue
+        print(f"{name:<7} ticks {stats['tick']:>5}  RTT {stats['rtt_ms']:6.1f} ms  "
+              f"up {stats['up_Bps'] / 1024:5.2f} KiB/s  down {stats['down_Bps'] / 1024:5.2f} KiB/s  "
+              f"loss {stats['loss']:.1%}  snapshots {stats['snapshots']} "
+              f"(avg {stats['snapshot_bytes']:.0f} B of {stats['full_bytes']} B)")
+    if host_stats:
+        print(f"host    late inputs {host_stats['late_inputs']}, input slack {host_stats['input_slack']} ticks")
+    if client_stats:
+        rate = client_stats['rollbacks'] / max(1, client_stats['snapshots'])
+        print(f"client  lead {client_stats['lead']} ticks, rollbacks {client_stats['rollbacks']} "
+              f"({rate:.1%} of snapshots, {client_stats['resimulated']} ticks resimulated), "
+              f"lead changes {client_stats['lead_changes']}, desyncs {client_stats['desyncs']}")
+
+    ok = bool(client_stats.get('joined') and client_stats.get('snapshots')
+              and client_stats.get('desyncs') == 0)
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
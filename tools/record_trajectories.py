@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless trajectory recorder for bot training and analytics.
+
+Plays back-to-back games with a built-in agent and records every tick
+(frog state, lane offsets, entity positions, events) to a Frogger.Trajectory
+file, then reopens it with Frogger.TrajectoryReader and reports:
+
+* recording throughput and the per-tick cost of Trajectory.record(),
+* bytes per tick and the compression ratio,
+* random single-tick access and a full column scan (frog_x) time.
+
+Uncompressed files are memory-mapped (numpy.memmap) and sliced without
+parsing; compressed ones (zlib / lzma / bz2) trade random access speed
+for size and are meant for cold storage.
+
+Usage:
+    python tools/record_trajectories.py --games 20 --output runs/planner.ftr
+    python tools/record_trajectories.py --games 20 --compression lzma --output runs/planner.ftrz
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record headless games to a trajectory file")
+    parser.add_argument("--output", type=Path, default=Path("trajectory.ftr"))
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--agent", choices=sorted(Frogger.AGENTS), default="planner")
+    parser.add_argument("--max-seconds", type=int, default=300, help="game time limit")
+    parser.add_argument("--traffic", choices=Frogger.World.TRAFFIC_MODES, default="wrap")
+    parser.add_argument("--difficulty", choices=sorted(Frogger.DIFFICULTIES),
+                        help="enable level progression")
+    parser.add_argument("--compression", choices=[c for c in Frogger.Trajectory.COMPRESSIONS if c])
+    parser.add_argument("--chunk", type=int, default=4096, help="records per write/compression chunk")
+    parser.add_argument("--samples", type=int, default=10000, help="random reads in the access test")
+    args = parser.parse_args()
+
+    trajectory = Frogger.Trajectory(args.output, args.compression, chunk=args.chunk).start()
+    record = trajectory.record
+    record_time = 0.0
+
+    def timed_record(world, move):
+        nonlocal record_time
+        t = time.perf_counter()
+        record(world, move)
+        record_time += time.perf_counter() - t
+    trajectory.record = timed_record
+
+    start = time.perf_counter()
+    for seed in range(args.first_seed, args.first_seed + args.games):
+        world = Frogger.World(seed, traffic=args.traffic, difficulty=args.difficulty)
+        world.trajectory = trajectory
+        agent = Frogger.AGENTS[args.agent](seed)
+        while not world.game_over and world.tick < args.max_seconds * Frogger.FPS:
+            move = agent.act(world)
+            if move:
+                world.move_frog(*move)
+            world.step()
+    trajectory.close()
+    elapsed = time.perf_counter() - start
+
+    ticks = trajectory.records
+    size = args.output.stat().st_size
+    raw = ticks * trajectory.record_struct.size
+    print(f"recorded:       {args.games} games, {ticks} ticks in {elapsed:.1f}s "
+          f"({ticks / elapsed:.0f} ticks/s incl. agent)")
+    print(f"record():       {record_time / max(ticks, 1) * 1e6:.2f} us/tick, "
+          f"{trajectory.truncated} ticks truncated to the slot limit")
+    print(f"size:           {size / 1024:.0f} KiB, {size / max(ticks, 1):.1f} B/tick "
+          f"(record {trajectory.record_struct.size} B, ratio {raw / max(size, 1):.2f}x)")
+
+    reader = Frogger.TrajectoryReader(args.output)
+    rng = random.Random(0)
+    indices = [rng.randrange(len(reader)) for _ in range(args.samples)]
+    t = time.perf_counter()
+    for index in indices:
+        reader[index]
+    access = (time.perf_counter() - t) / len(indices)
+    t = time.perf_counter()
+    frog_x = reader.column('frog_x')
+    mean_x = float(frog_x.mean())
+    scan = time.perf_counter() - t
+    print(f"random access:  {access * 1e6:.1f} us/tick ({'memmap' if reader.records is not None else 'chunked'})")
+    print(f"column scan:    frog_x over {len(reader)} ticks in {scan * 1000:.1f} ms (mean {mean_x:.1f})")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Soak test for the Frogger simulation core.
+
+Plays back-to-back headless games driven by the built-in PlannerAgent
+(the reference workload) for a given wall-clock duration and reports
+simulation throughput, per-decision planning time percentiles and
+memory growth (tracemalloc) between the first and the last minute.
+
+Usage:
+    python tools/soak.py --minutes 10
+    python tools/soak.py --minutes 1 --agent greedy
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def agent_interval(agent) -> int:
+    return getattr(agent, 'interval', Frogger.AGENT_MOVE_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless soak test with the built-in autoplayer")
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--agent", choices=sorted(Frogger.AGENTS), default="planner")
+    parser.add_argument("--max-seconds", type=int, default=600, help="game time limit per game")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    deadline = time.perf_counter() + args.minutes * 60
+    baseline = None
+    baseline_at = time.perf_counter() + min(60.0, args.minutes * 60 / 4)
+
+    games = ticks = crossings = deaths = 0
+    decision_ms = []
+    start = time.perf_counter()
+    seed = 0
+
+    while time.perf_counter() < deadline:
+        agent = Frogger.AGENTS[args.agent](seed)
+        world = Frogger.World(seed)
+        while not world.game_over and world.tick < args.max_seconds * Frogger.FPS:
+            t = time.perf_counter()
+            move = agent.act(world)
+            if world.tick % agent_interval(agent) == 0:
+                decision_ms.append((time.perf_counter() - t) * 1000)
+            if move:
+                world.move_frog(*move)
+            for kind, _, _ in world.step():
+                if kind == 'goal':
+                    crossings += 1
+                else:
+                    deaths += 1
+        games += 1
+        ticks += world.tick
+        seed += 1
+
+        if baseline is None and time.perf_counter() >= baseline_at:
+            baseline = tracemalloc.get_traced_memory()[0]
+
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"agent:          {args.agent}")
+    print(f"games:          {games} ({ticks} ticks, {ticks / elapsed:.0f} ticks/s, "
+          f"{ticks / Frogger.FPS / elapsed:.0f}x real time)")
+    print(f"crossings:      {crossings}, deaths: {deaths}")
+    print(f"decision time:  p50 {percentile(decision_ms, 0.5):.3f} ms, "
+          f"p99 {percentile(decision_ms, 0.99):.3f} ms, max {max(decision_ms, default=0):.3f} ms, "
+          f"mean {statistics.fmean(decision_ms) if decision_ms else 0:.3f} ms")
+    print(f"memory:         {current / 1024:.0f} KiB now, peak {peak / 1024:.0f} KiB"
+          + (f", growth since warm-up {(current - baseline) / 1024:+.0f} KiB" if baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lane balance tuner for Frogger.
+
+Plays thousands of headless games (Frogger.World + a scripted or random
+agent) for every lane parameter set, spread over a multiprocessing pool,
+and reports survival, mean score and crossing time per configuration.
+
+Parameters are multipliers/counts applied to VEHICLE_LANES / LOG_LANES:
+
+    vehicle_speed, vehicle_width, vehicles_per_lane,
+    log_speed, log_width, logs_per_lane
+
+Search modes:
+    grid    - every combination of the values given with --param; other
+              parameters stay at their defaults
+    random  - --samples configurations drawn from the range of each --param
+              (PARAM_SPACE range for parameters not given)
+
+Results are appended to a JSON-lines cache as soon as a configuration is
+finished; re-running the same command skips cached configurations, so an
+interrupted search resumes where it stopped.
+
+Usage:
+    python tools/tune_balance.py grid --games 2000 --policy greedy \\
+        --param vehicle_speed=1.0,1.25,1.5 --param vehicles_per_lane=3,4
+    python tools/tune_balance.py random --samples 50 --games 500
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+from pathlib import Path
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# SDL turns SIGTERM into a quit event, which would make Pool workers unkillable
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Frogger  # noqa: E402
+
+CACHE_VERSION = 1
+
+# Values of each parameter; random mode draws from their range when --param does not give one
+PARAM_SPACE = {
+    'vehicle_speed': [0.75, 1.0, 1.25, 1.5],
+    'vehicle_width': [0.8, 1.0, 1.2],
+    'vehicles_per_lane': [2, 3, 4],
+    'log_speed': [0.75, 1.0, 1.25],
+    'log_width': [0.8, 1.0, 1.2],
+    'logs_per_lane': [2, 3],
+}
+DEFAULTS = {
+    'vehicle_speed': 1.0,
+    'vehicle_width': 1.0,
+    'vehicles_per_lane': Frogger.VEHICLES_PER_LANE,
+    'log_speed': 1.0,
+    'log_width': 1.0,
+    'logs_per_lane': Frogger.LOGS_PER_LANE,
+}
+INT_PARAMS = {'vehicles_per_lane', 'logs_per_lane'}
+
+# Checkpoints of the survival curve, in seconds of game time
+SURVIVAL_POINTS = [10, 30, 60, 120, 300]
+
+
+def world_options(params: dict) -> dict:
+    """Turns a parameter set into keyword arguments for Frogger.World."""
+    vehicle_lanes = [dict(lane, speed=lane['speed'] * params['vehicle_speed'],
+                          width=round(lane['width'] * params['vehicle_width']))
+                     for lane in Frogger.VEHICLE_LANES]
+    log_lanes = [dict(lane, speed=lane['speed'] * params['log_speed'],
+                      width=round(lane['width'] * params['log_width']))
+                 for lane in Frogger.LOG_LANES]
+    return {
+        'vehicle_lanes': vehicle_lanes,
+        'log_lanes': log_lanes,
+        'vehicles_per_lane': int(params['vehicles_per_lane']),
+        'logs_per_lane': int(params['logs_per_lane']),
+    }
+
+
+def run_chunk(task: tuple) -> tuple:
+    """Pool worker: plays `count` games of one configuration."""
+    key, params, policy, first_seed, count, max_ticks = task
+    options = world_options(params)
+    agent_class = Frogger.AGENTS[policy]
+    games = []
+    for seed in range(first_seed, first_seed + count):
+        result = Frogger.simulate_game(agent_class(seed), seed, max_ticks, **options)
+        games.append((result['score'], result['ticks'], result['game_over'],
+                      result['deaths'][0] if result['deaths'] else None,
+                      sum(result['crossings']), len(result['crossings'])))
+    return key, games
+
+
+def summarize(games: list, max_ticks: int) -> dict:
+    """Aggregates per-game tuples into the reported statistics."""
+    n = len(games)
+    scores = [g[0] for g in games]
+    crossing_ticks = sum(g[4] for g in games)
+    crossings = sum(g[5] for g in games)
+    first_deaths = [g[3] if g[3] is not None else max_ticks for g in games]
+
+    survival = {}
+    for seconds in SURVIVAL_POINTS:
+        tick = seconds * Frogger.FPS
+        if tick > max_ticks:
+            break
+        # A game is "alive" at t if it was not over yet (cut-off games count as alive)
+        survival[str(seconds)] = sum(1 for g in games if not g[2] or g[1] > tick) / n
+
+    return {
+        'games': n,
+        'mean_score': statistics.fmean(scores),
+        'median_score': statistics.median(scores),
+        'mean_crossing_s': crossing_ticks / crossings / Frogger.FPS if crossings else None,
+        'crossings_per_game': crossings / n,
+        'median_first_death_s': statistics.median(first_deaths) / Frogger.FPS,
+        'survival': survival,
+    }
+
+
+def config_key(params: dict, policy: str, games: int, seed: int, max_ticks: int) -> str:
+    """Cache key of one configuration run."""
+    blob = json.dumps({'params': params, 'policy': policy, 'games': games, 'seed': seed,
+                       'max_ticks': max_ticks, 'cache': CACHE_VERSION,
+                       'version': Frogger.__version__}, sort_keys=True)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+
+def load_cache(path: Path) -> dict:
+    """Loads finished configurations (key -> record) from the cache file."""
+    cache = {}
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated last line after an interrupted run
+                cache[record['key']] = record
+    return cache
+
+
+def parse_param(text: str) -> tuple:
+    name, _, values = text.partition('=')
+    if name not in PARAM_SPACE or not values:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=v1,v2,... with NAME one of {', '.join(PARAM_SPACE)}")
+    convert = int if name in INT_PARAMS else float
+    return name, [convert(v) for v in values.split(',')]
+
+
+def build_configs(args) -> list:
+    """Generates parameter sets for the chosen search mode."""
+    if args.mode == 'grid':
+        # Only the parameters given with --param are searched
+        space = {name: [DEFAULTS[name]] for name in PARAM_SPACE}
+        space.update(dict(args.param))
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+    space = dict(PARAM_SPACE)
+    space.update(dict(args.param))
+    rng = random.Random(args.search_seed)
+    configs = []
+    for _ in range(args.samples):
+        params = {}
+        for name, values in space.items():
+            low, high = min(values), max(values)
+            if name in INT_PARAMS:
+                params[name] = rng.randint(low, high)
+            else:
+                params[name] = round(rng.uniform(low, high), 3)
+        configs.append(params)
+    return configs
+
+
+def print_report(records: list, sort: str):
+    sort_keys = {
+        'score': lambda r: -r['result']['mean_score'],
+        'survival': lambda r: -r['result']['median_first_death_s'],
+        'crossing': lambda r: r['result']['mean_crossing_s'] or float('inf'),
+    }
+    records = sorted(records, key=sort_keys[sort])
+
+    names = list(PARAM_SPACE)
+    points = [str(p) for p in SURVIVAL_POINTS]
+    header = " ".join(f"{n[:12]:>12}" for n in names)
+    header += f" {'score':>8} {'cross s':>8} {'1st death':>9} "
+    header += " ".join(f"{'S@' + p + 's':>7}" for p in points)
+    print(header)
+    for record in records:
+        params, result = record['params'], record['result']
+        line = " ".join(f"{params[n]:>12}" for n in names)
+        cross = result['mean_crossing_s']
+        line += f" {result['mean_score']:>8.0f} {cross if cross is not None else float('nan'):>8.1f}"
+        line += f" {result['median_first_death_s']:>9.1f} "
+        line += " ".join(f"{result['survival'][p]:>7.2f}" if p in result['survival'] else f"{'-':>7}"
+                         for p in points)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless lane balance tuner for Frogger")
+    parser.add_argument("mode", choices=["grid", "random"], help="search mode")
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        metavar="NAME=v1,v2", help="values (grid, others stay at defaults) or range (random) of a parameter")
+    parser.add_argument("--games", type=int, default=1000, help="games per configuration")
+    parser.add_argument("--policy", choices=sorted(Frogger.AGENTS), default="greedy")
+    parser.add_argument("--max-seconds", type=int, default=300, help="game time limit")
+    parser.add_argument("--samples", type=int, default=20, help="configurations in random mode")
+    parser.add_argument("--seed", type=int, default=0, help="first world seed")
+    parser.add_argument("--search-seed", type=int, default=0, help="seed of the random search")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=50, help="games per pool task")
+    parser.add_argument("--cache", type=Path, default=Path("tune_results.jsonl"))
+    parser.add_argument("--sort", choices=["score", "survival", "crossing"], default="score")
+    args = parser.parse_args()
+
+    max_ticks = args.max_seconds * Frogger.FPS
+    configs = build_configs(args)
+    cache = load_cache(args.cache)
+
+    records = {}
+    pending = {}
+    for params in configs:
+        full = dict(DEFAULTS, **params)
+        key = config_key(full, args.policy, args.games, args.seed, max_ticks)
+        if key in cache:
+            records[key] = cache[key]
+        else:
+            pending[key] = full
+
+    print(f"{len(configs)} configurations, {len(records)} cached, {len(pending)} to run "
+          f"({len(pending) * args.games} games on {args.workers} workers)")
+
+    tasks = []
+    for key, params in pending.items():
+        for first in range(0, args.games, args.chunk):
+            count = min(args.chunk, args.games - first)
+            tasks.append((key, params, args.policy, args.seed + first, count, max_ticks))
+
+    games = {key: [] for key in pending}
+    if tasks:
+        pool = multiprocessing.Pool(args.workers)
+        with open(args.cache, 'a', encoding='utf-8') as out:
+            for key, chunk in pool.imap_unordered(run_chunk, tasks):
+                games[key].extend(chunk)
+                if len(games[key]) < args.games:
+                    continue
+                record = {'key': key, 'params': pending[key], 'policy': args.policy,
+                          'games': args.games, 'seed': args.seed, 'max_ticks': max_ticks,
+                          'result': summarize(games.pop(key), max_ticks)}
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                records[key] = record
+                print(f"  done {len(records)}/{len(configs)}: {record['params']}")
+        pool.close()
+        pool.join()
+
+    print_report(list(records.values()), args.sort)
+
+
+if __name__ == "__main__":
+    main()